@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of the JSON codecs (`tradingview_screener.codec`) on captured response bodies:
+decoding with each installed backend, incremental decoding of a streamed body, and encoding of
+the BSE announcements cache.
+
+Pass the paths of captured responses (i.e. the body of a `.limit(20000)` scan, saved with
+`open(path, 'wb').write(r.content)`), otherwise synthetic ones are used.
+
+Usage:
+    python benchmarks/bench_codec.py [response.json ...]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+from tradingview_screener.codec import BACKENDS, Codec, iter_json_array
+
+REPEAT = 5
+CHUNK_SIZE = 1 << 16
+
+
+def scanner_fixture(n_rows: int = 20_000, n_columns: int = 30) -> bytes:
+    rng = random.Random(0)
+    makers = [
+        lambda: rng.random() * 1000,
+        lambda: rng.choice([rng.random(), None]),
+        lambda: rng.randint(0, 10**9),
+        lambda: rng.choice(['Finance', 'Energy', 'Technology Services', None]),
+        lambda: rng.random() > 0.5,
+    ]
+    kinds = [makers[i % len(makers)] for i in range(n_columns)]
+    data = [{'s': f'NSE:SYM{i}', 'd': [make() for make in kinds]} for i in range(n_rows)]
+    return json.dumps({'totalCount': n_rows, 'data': data}).encode()
+
+
+def bse_fixture(n_rows: int = 5_000) -> bytes:
+    rng = random.Random(0)
+    table = [
+        {
+            'NEWSID': f'{rng.getrandbits(64):x}',
+            'SCRIP_CD': rng.randint(500000, 544000),
+            'SLONGNAME': f'Company {i} Limited',
+            'NEWSSUB': 'Announcement under Regulation 30 (LODR)-Newspaper Publication ' * 2,
+            'CATEGORYNAME': rng.choice(['Company Update', 'Result', 'Board Meeting']),
+            'DT_TM': f'2026-10-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:15:00',
+            'ATTACHMENTNAME': f'{rng.getrandbits(128):x}.pdf',
+        }
+        for i in range(n_rows)
+    ]
+    return json.dumps({'timestamp': '2026-10-17T12:00:00', 'data': table}).encode()
+
+
+def available_codecs() -> list[Codec]:
+    codecs = []
+    for name in BACKENDS:
+        try:
+            codecs.append(Codec(name))
+        except ImportError:
+            print(f'({name} is not installed)')
+    return codecs
+
+
+def bench(label: str, func) -> None:
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT)) * 1000
+    print(f'  {label:<26} {best:8.2f}ms')
+
+
+def stream(body: bytes) -> None:
+    header = {}
+    for _ in iter_json_array(
+        (body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)), 'data', header
+    ):
+        pass
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        fixtures = {path: Path(path).read_bytes() for path in sys.argv[1:]}
+    else:
+        fixtures = {'scanner (synthetic)': scanner_fixture(), 'bse cache (synthetic)': bse_fixture()}
+    codecs = available_codecs()
+
+    for label, body in fixtures.items():
+        obj = json.loads(body)
+        print(f'{label}: {len(body) / 1e6:.1f} MB, best of {REPEAT}')
+        for codec in codecs:
+            bench(f'loads ({codec.name})', lambda: codec.loads(body))
+        bench('iter_json_array (json)', lambda: stream(body))
+        for codec in codecs:
+            bench(f'dumps ({codec.name})', lambda: codec.dumps(obj, default=str))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of the DataFrame construction in `Query.get_scanner_data()`: the old row-based
+path vs the columnar `decode_scanner_data()` (and its pyarrow engine, if installed), and the memory
+of the frame with the inferred dtypes vs a `FieldSchema`-like map (categoricals, nullable bools).
+
+Usage:
+    python benchmarks/bench_decode.py [n_rows] [n_columns]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import timeit
+
+import pandas as pd
+
+from tradingview_screener.decoder import decode_scanner_data, loads
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+N_COLUMNS = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+REPEAT = 5
+
+
+def make_response() -> tuple[bytes, list[str]]:
+    rng = random.Random(0)
+    # roughly the mix of a Custom Scanner scan: mostly floats, some ints/strings/bools, and nulls
+    makers = [
+        lambda: rng.random() * 1000,
+        lambda: rng.choice([rng.random(), None]),
+        lambda: rng.randint(0, 10**9),
+        lambda: rng.choice(['Finance', 'Energy', 'Technology Services', None]),
+        lambda: rng.random() > 0.5,
+    ]
+    columns = [f'field_{i}' for i in range(N_COLUMNS)]
+    kinds = [makers[i % len(makers)] for i in range(N_COLUMNS)]
+    data = [{'s': f'NSE:SYM{i}', 'd': [make() for make in kinds]} for i in range(N_ROWS)]
+    return json.dumps({'totalCount': N_ROWS, 'data': data}).encode(), columns
+
+
+def row_based(data: list, columns: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(data=([row['s'], *row['d']] for row in data), columns=['ticker', *columns])
+
+
+def bench(label: str, func) -> None:
+    best = min(timeit.repeat(func, number=1, repeat=REPEAT)) * 1000
+    print(f'{label:<28} {best:8.2f}ms')
+
+
+def main() -> None:
+    body, columns = make_response()
+    data = loads(body)['data']
+    print(f'{N_ROWS} rows x {N_COLUMNS} columns ({len(body) / 1e6:.1f} MB of JSON), best of {REPEAT}')
+
+    bench('json.loads', lambda: json.loads(body))
+    if loads is not json.loads:
+        bench('orjson.loads', lambda: loads(body))
+    bench('row-based DataFrame', lambda: row_based(data, columns))
+    bench('decode_scanner_data', lambda: decode_scanner_data(data, columns))
+    kinds = ['float', 'float', 'int', 'string', 'bool']
+    dtypes = {column: kinds[i % len(kinds)] for i, column in enumerate(columns)}
+    bench('decode_scanner_data[dtypes]', lambda: decode_scanner_data(data, columns, dtypes))
+    kinds = ['float', 'float', 'Int64', 'category', 'boolean']
+    schema = {column: kinds[i % len(kinds)] for i, column in enumerate(columns)}
+    bench('decode_scanner_data[schema]', lambda: decode_scanner_data(data, columns, schema))
+
+    for label, dtype_map in [('inferred', None), ('schema', schema)]:
+        df = decode_scanner_data(data, columns, dtype_map)
+        print(f'memory ({label}): {df.memory_usage(deep=True).sum() / 1e6:8.2f} MB')
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print('(pyarrow is not installed, skipping the pyarrow engine)')
+    else:
+        bench('decode_scanner_data[arrow]', lambda: decode_scanner_data(data, columns, engine='pyarrow'))
+
+
+if __name__ == '__main__':
+    main()
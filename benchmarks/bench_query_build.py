@@ -0,0 +1,95 @@
+"""
+Micro-benchmark of building and serializing a large filter tree (like the Custom Scanner does on
+every Streamlit rerun): plain dicts (the old `Column` operators and `And()/Or()`) vs the frozen
+`FilterNode`s, which are memoized and cache their JSON.
+
+Building the nodes costs more than writing dict literals, but a rerun serializes the same
+filters again (for the cache key and the request body), and that's where the nodes win.
+
+Usage:
+    python benchmarks/bench_query_build.py [n_filters]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+
+from tradingview_screener import And, Or, Query, col
+
+N_FILTERS = int(sys.argv[1]) if __name__ == '__main__' and len(sys.argv) > 1 else 200
+REPEAT = 5
+NUMBER = 20
+
+
+def dumps(obj) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def plain_expression(left: str, operation: str, right) -> dict:
+    return {'left': left, 'operation': operation, 'right': right}
+
+
+def plain_chain(expressions, operator: str) -> dict:
+    lst = [{'expression': e} if 'left' in e else e for e in expressions]
+    return {'operation': {'operator': operator, 'operands': lst}}
+
+
+def build_plain() -> dict:
+    groups = []
+    for i in range(0, N_FILTERS, 4):
+        groups.append(
+            plain_chain(
+                [
+                    plain_expression(f'EMA{i}', 'greater', f'EMA{i + 1}'),
+                    plain_expression('close', 'in_range', [i, i + 10]),
+                    plain_chain(
+                        [
+                            plain_expression('sector', 'in_range', ['Finance', 'Energy']),
+                            plain_expression('volume', 'egreater', i * 1000),
+                        ],
+                        'or',
+                    ),
+                ],
+                'and',
+            )
+        )
+    return {'columns': ['name', 'close'], 'filter2': plain_chain(groups, 'or')['operation']}
+
+
+def build_nodes() -> Query:
+    groups = []
+    for i in range(0, N_FILTERS, 4):
+        groups.append(
+            And(
+                col(f'EMA{i}') > col(f'EMA{i + 1}'),
+                col('close').between(i, i + 10),
+                Or(col('sector').isin(['Finance', 'Energy']), col('volume') >= i * 1000),
+            )
+        )
+    return Query().select('name', 'close').where2(Or(*groups))
+
+
+def bench(label: str, func) -> None:
+    best = min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+    print(f'{label:<30} {best:8.3f}ms')
+
+
+def main() -> None:
+    print(f'{N_FILTERS} filters, best of {REPEAT}')
+    plain = build_plain()
+    query = build_nodes()
+    assert json.loads(query.to_json())['filter2'] == plain['filter2']
+
+    bench('build (dicts)', build_plain)
+    bench('build (nodes)', build_nodes)
+    bench('serialize (dicts)', lambda: dumps(plain))
+    bench('serialize (nodes)', lambda: query.to_json())
+    # a rerun builds the query, then serializes it twice: for the cache key, and for the body
+    bench('rerun (dicts)', lambda: (dumps(plain := build_plain()), dumps(plain)))
+    bench('rerun (nodes)', lambda: ((query := build_nodes()).fingerprint(), query.to_json()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the latency of back-to-back scans with and without the pooled `Transport`.
+
+Both runs hit a local stub of the scanner endpoint, so the numbers only measure the client
+side (connection setup, request serialization, response decoding).
+
+Usage:
+    python benchmarks/bench_transport.py [n_scans]
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from tradingview_screener import Query, Transport
+
+N_SCANS = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+N_ROWS = 50
+
+BODY = json.dumps(
+    {
+        'totalCount': 18060,
+        'data': [
+            {'s': f'NSE:SYM{i}', 'd': [f'SYM{i}', 100.0 + i, 1_000_000 + i, 1e10 + i]}
+            for i in range(N_ROWS)
+        ],
+    }
+).encode()
+
+
+class StubScannerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # required for keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class UnpooledTransport:
+    """The behaviour before `Transport` existed: one `requests.post()` per scan."""
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return requests.post(url, **kwargs)
+
+
+def run(transport, url: str) -> list[float]:
+    query = Query(transport=transport).select('name', 'close', 'volume', 'market_cap_basic')
+    query.url = url
+    timings = []
+    for _ in range(N_SCANS):
+        start = time.perf_counter()
+        query.get_scanner_data_raw()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    q = statistics.quantiles(timings, n=100)
+    print(f'{label:<10} p50={q[49]:7.3f}ms  p95={q[94]:7.3f}ms  total={sum(timings):8.1f}ms')
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubScannerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/india/scan'
+    try:
+        print(f'{N_SCANS} back-to-back scans against {url}')
+        report('unpooled', run(UnpooledTransport(), url))
+        with Transport() as transport:
+            report('pooled', run(transport, url))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Fixtures of the benchmark suite. Every request is served from a cassette (see `tests/replay.py`),
+the recorded ones in `benchmarks/cassettes/` if there are any (`benchmarks/record.py`), otherwise
+synthetic ones, so the timings don't depend on the network.
+
+Usage:
+    PYTHONPATH=src python -m pytest benchmarks/
+    # compare with the last saved run, failing on a regression of the median
+    PYTHONPATH=src python -m pytest benchmarks/ --benchmark-autosave \\
+        --benchmark-compare --benchmark-compare-fail=median:15%
+
+Each benchmark also has an absolute budget (the median, in ms), which can be scaled for slower
+machines with `BENCHMARK_BUDGET_SCALE=2`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'tests'))  # for `replay`
+
+from replay import Cassette, replay  # noqa: E402
+from workloads import CASSETTES, synthetic_cassette  # noqa: E402
+
+BUDGET_SCALE = float(os.environ.get('BENCHMARK_BUDGET_SCALE', 1))
+
+
+@pytest.fixture(scope='session')
+def cassette() -> Cassette:
+    recorded = sorted(CASSETTES.glob('*.json'))
+    if not recorded:
+        return synthetic_cassette()
+    return Cassette([i for path in recorded for i in Cassette.load(path).interactions])
+
+
+@pytest.fixture(scope='session')
+def replay_server(cassette: Cassette):
+    with replay(cassette) as server:
+        yield server
+    assert not server.misses, f'requests missing from the cassettes: {server.misses}'
+
+
+@pytest.fixture
+def budget(benchmark):
+    """Fail the benchmark if its median is over `ms` milliseconds."""
+
+    def check(ms: float) -> None:
+        if benchmark.disabled or benchmark.stats is None:
+            return
+        median = benchmark.stats.stats.median * 1000
+        limit = ms * BUDGET_SCALE
+        assert median <= limit, f'median of {median:.2f}ms is over the budget of {limit:.2f}ms'
+
+    return check
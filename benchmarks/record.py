@@ -0,0 +1,41 @@
+"""
+Capture the real responses of the benchmark workloads (scanner, BSE announcements, news feed) to
+`benchmarks/cassettes/`, so `pytest benchmarks/` replays them instead of the synthetic ones.
+
+Run it from the root of the repo (it talks to the live APIs):
+    PYTHONPATH=src:tests:. python benchmarks/record.py
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+from replay import record
+from tradingview_screener.transport import get_default_transport
+from workloads import BSE_FROM_DATE, BSE_TO_DATE, CASSETTES, NEWS_API_URL, scan_query
+
+
+def main() -> None:
+    with record(CASSETTES / 'scanner.json') as cassette:
+        scan_query().get_scanner_data()
+    print(f'scanner: {len(cassette)} requests')
+
+    with record(CASSETTES / 'news.json') as cassette:
+        get_default_transport().get(NEWS_API_URL, timeout=10).raise_for_status()
+    print(f'news: {len(cassette)} requests')
+
+    from utils.bse_announcements_utils import BSEAnnouncements
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, record(CASSETTES / 'bse.json') as cassette:
+        os.chdir(tmp)  # so its file cache is empty
+        try:
+            BSEAnnouncements().fetch_all_announcements_api(BSE_FROM_DATE, BSE_TO_DATE)
+        finally:
+            os.chdir(cwd)
+    print(f'bse: {len(cassette)} requests')
+
+
+if __name__ == '__main__':
+    main()
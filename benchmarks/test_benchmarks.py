@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from bench_query_build import build_nodes  # noqa: E402
+from tradingview_screener import Transport, ratelimit  # noqa: E402
+from tradingview_screener.codec import loads  # noqa: E402
+from tradingview_screener.decoder import decode_scanner_data  # noqa: E402
+from tradingview_screener.local import scan_local  # noqa: E402
+from tradingview_screener.ratelimit import RateLimiter  # noqa: E402
+from workloads import (  # noqa: E402
+    BSE_FROM_DATE,
+    BSE_TO_DATE,
+    NEWS_API_URL,
+    news_prep,
+    results_season,
+    scan_query,
+)
+
+
+@pytest.fixture
+def transport() -> Transport:
+    return Transport(rate_limiter=RateLimiter({}))
+
+
+@pytest.fixture(scope='module')
+def scan_body(cassette) -> bytes:
+    query = scan_query()
+    return cassette.match('POST', query.url, query.to_json())['body'].encode()
+
+
+@pytest.fixture(scope='module')
+def scan_data(scan_body: bytes) -> list:
+    return loads(scan_body)['data']
+
+
+# --- query building and request serialization
+
+
+def test_query_build(benchmark, budget):
+    benchmark(build_nodes)
+    budget(20)
+
+
+def test_request_serialization(benchmark, budget):
+    query = build_nodes()
+    benchmark(lambda: (query.fingerprint(), query.to_json()))
+    budget(2)
+
+
+# --- response decoding and DataFrame construction
+
+
+def test_response_decode(benchmark, budget, scan_body: bytes):
+    benchmark(loads, scan_body)
+    budget(100)
+
+
+def test_dataframe_construction(benchmark, budget, scan_data: list):
+    columns = scan_query().query['columns']
+    df = benchmark(decode_scanner_data, scan_data, columns)
+    assert len(df) == len(scan_data)
+    budget(60)
+
+
+def test_scan_end_to_end(benchmark, budget, replay_server, transport: Transport):
+    # the request goes through the real `Transport` and HTTP stack, to the replay server
+    count, df = benchmark(lambda: scan_query(transport).get_scanner_data())
+    assert count > 0 and not df.empty
+    budget(300)
+
+
+# --- local filter evaluation
+
+
+def test_local_filter_evaluation(benchmark, budget, scan_data: list):
+    columns = scan_query().query['columns']
+    universe = decode_scanner_data(scan_data, columns)
+    query = {
+        'columns': columns,
+        'filter': [
+            {'left': 'close', 'operation': 'greater', 'right': 10},
+            {'left': 'sector', 'operation': 'in_range', 'right': ['Finance', 'Energy']},
+        ],
+        'sort': {'sortBy': 'volume', 'sortOrder': 'desc'},
+        'range': [0, 500],
+    }
+    count, df = benchmark(scan_local, universe, query)
+    assert 0 < len(df) <= 500
+    budget(30)
+
+
+# --- page-level data prep
+
+
+def test_news_feed_prep(benchmark, budget, replay_server, transport: Transport):
+    def run() -> list:
+        r = transport.get(NEWS_API_URL, timeout=10)
+        r.raise_for_status()
+        return news_prep(loads(r.content))
+
+    assert benchmark(run)
+    budget(100)
+
+
+def test_bse_announcements_prep(benchmark, budget, replay_server, tmp_path, monkeypatch):
+    pytest.importorskip('bs4')
+    from utils.bse_announcements_utils import BSEAnnouncements
+
+    monkeypatch.setattr(ratelimit, '_default_rate_limiter', RateLimiter({}))
+    monkeypatch.chdir(tmp_path)
+    bse = BSEAnnouncements()
+
+    def cold_cache() -> None:
+        bse.store.clear()
+
+    def run():
+        df = bse.fetch_all_announcements_api(BSE_FROM_DATE, BSE_TO_DATE)
+        return bse.parse_datetime_column(df, 'DT_TM')
+
+    df = benchmark.pedantic(run, setup=cold_cache, rounds=5)
+    assert not df.empty
+    budget(500)
+
+
+def test_post_earnings_moves(benchmark, budget, tmp_path_factory):
+    from utils.ohlcv_store import OhlcvStore
+    from utils.post_earnings import compute_post_earnings_moves
+
+    data_dir = tmp_path_factory.mktemp('daily')
+    candidates, dates = results_season(data_dir)
+    store = OhlcvStore(str(data_dir), cache_dir=str(tmp_path_factory.mktemp('ohlcv')))
+    store.refresh()
+
+    moves = benchmark(compute_post_earnings_moves, store, candidates, dates)
+    assert moves['Move 30d %'].notna().sum() > len(candidates) / 2
+    budget(150)
@@ -0,0 +1,183 @@
+"""
+The workloads of the benchmark suite (`benchmarks/test_benchmarks.py`), shared with
+`benchmarks/record.py`, which captures their real responses to `benchmarks/cassettes/`.
+
+Without recorded cassettes, `synthetic_cassette()` builds deterministic stand-ins with the same
+shape (and size) as the real responses, so the suite always runs offline.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import random
+from pathlib import Path
+from urllib.parse import urlencode
+
+from tradingview_screener import Query, col
+
+CASSETTES = Path(__file__).parent / 'cassettes'
+
+SCAN_ROWS = 5000
+SCAN_COLUMNS = [
+    'name', 'description', 'type', 'exchange', 'sector', 'industry', 'is_primary',
+    'close', 'change', 'volume', 'relative_volume_10d_calc', 'average_volume_10d_calc',
+    'market_cap_basic', 'price_earnings_ttm', 'earnings_per_share_diluted_ttm', 'RSI',
+    'EMA20', 'EMA50', 'EMA200', 'Perf.W', 'Perf.1M', 'Perf.3M', 'Perf.Y', 'High.All', 'Low.All',
+    'price_52_week_high', 'price_52_week_low', 'dividends_yield_current',
+    'earnings_release_date', 'earnings_release_next_date',
+]  # fmt: skip
+STRING_COLUMNS = {'name', 'description', 'type', 'exchange', 'sector', 'industry'}
+TIME_COLUMNS = {'earnings_release_date', 'earnings_release_next_date'}
+
+BSE_API_URL = 'https://api.bseindia.com/BseIndiaAPI/api/AnnSubCategoryGetData/w'
+BSE_FROM_DATE, BSE_TO_DATE = '01/10/2026', '10/10/2026'
+BSE_PAGES = 10
+BSE_PAGE_SIZE = 50
+
+# a results season: every symbol reports once, with 3 years of daily bars
+SEASON_SYMBOLS = 2000
+SEASON_DAYS = 750
+
+NEWS_API_URL = (
+    'https://news-mediator.tradingview.com/news-flow/v2/news?filter=lang%3Aen_IN'
+    '&filter=market%3Astock&filter=market_country%3AIN&client=screener&streaming=true'
+)
+
+
+def scan_query(transport=None) -> Query:
+    """A Custom Scanner-like scan: 30 columns of the whole Indian market."""
+    return (
+        Query(transport=transport)
+        .set_markets('india')
+        .select(*SCAN_COLUMNS)
+        .where(col('volume') > 0, col('is_primary') == True)  # noqa: E712
+        .order_by('market_cap_basic', ascending=False)
+        .limit(SCAN_ROWS)
+    )
+
+
+def bse_page_url(page: int) -> str:
+    # the request `BSEAnnouncements.fetch_announcements_api()` sends for `BSE_FROM/TO_DATE`
+    def to_bse_date(date: str) -> str:
+        return datetime.datetime.strptime(date, '%d/%m/%Y').strftime('%Y%m%d')
+
+    params = {
+        'pageno': page,
+        'strCat': '-1',
+        'strPrevDate': to_bse_date(BSE_FROM_DATE),
+        'strScrip': '',
+        'strSearch': 'P',
+        'strToDate': to_bse_date(BSE_TO_DATE),
+        'strType': 'C',
+        'subcategory': '-1',
+    }
+    return f'{BSE_API_URL}?{urlencode(params)}'
+
+
+def news_prep(data: dict, since: datetime.datetime | None = None) -> list[dict]:
+    """The data prep of the news feed page: keep the stories published after `since`."""
+    new_items = []
+    for item in data.get('items', []):
+        try:
+            published = datetime.datetime.strptime(item.get('published'), '%Y-%m-%dT%H:%M:%SZ')
+        except (TypeError, ValueError):
+            continue
+        if since is None or published > since:
+            new_items.append(item)
+    return new_items
+
+
+def results_season(data_dir: Path) -> tuple[list[tuple], list[datetime.date]]:
+    """
+    The daily CSVs of `SEASON_SYMBOLS` symbols in `data_dir`, and the `(candidates, dates)` of
+    their results announcements (some on weekends, some for symbols without bars), for
+    `compute_post_earnings_moves()`.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2023-11-01', periods=SEASON_DAYS)
+    for i in range(SEASON_SYMBOLS):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, SEASON_DAYS)))
+        pd.DataFrame({
+            'Date': dates.strftime('%Y-%m-%d'),
+            'Open': close * (1 + rng.normal(0, 0.01, SEASON_DAYS)),
+            'High': close * 1.01,
+            'Low': close * 0.99,
+            'Close': close,
+            'Volume': rng.integers(1_000, 1_000_000, SEASON_DAYS),
+        }).to_csv(data_dir / f'sym{i}.csv', index=False)
+
+    season = pd.date_range(dates[-90], periods=45)  # the announcements of the last ~quarter
+    candidates = [(f'SYM{i}', 500000 + i) for i in range(SEASON_SYMBOLS + SEASON_SYMBOLS // 20)]
+    days = [season[rng.integers(len(season))].date() for _ in candidates]
+    return candidates, days
+
+
+def _scan_body(rng: random.Random) -> bytes:
+    sectors = ['Finance', 'Energy', 'Technology Services', 'Health Technology', 'Utilities']
+
+    def value(column: str, i: int):
+        if column in STRING_COLUMNS:
+            return rng.choice(sectors) if column in ('sector', 'industry') else f'{column} {i}'
+        if column == 'is_primary':
+            return True
+        if column in TIME_COLUMNS:
+            return rng.choice([1_790_000_000 + rng.randint(0, 10**7), None])
+        return rng.choice([rng.random() * 1000, rng.random(), None, rng.randint(0, 10**7)])
+
+    data = [
+        {'s': f'NSE:SYM{i}', 'd': [value(column, i) for column in SCAN_COLUMNS]}
+        for i in range(SCAN_ROWS)
+    ]
+    return json.dumps({'totalCount': SCAN_ROWS * 2, 'data': data}).encode()
+
+
+def _bse_body(rng: random.Random, page: int) -> bytes:
+    table = [
+        {
+            'NEWSID': f'{rng.getrandbits(64):x}',
+            'SCRIP_CD': rng.randint(500000, 544000),
+            'SLONGNAME': f'Company {page}-{i} Limited',
+            'NEWSSUB': 'Announcement under Regulation 30 (LODR)-Newspaper Publication',
+            'CATEGORYNAME': rng.choice(['Company Update', 'Result', 'Board Meeting']),
+            'DT_TM': f'2026-10-{rng.randint(1, 10):02d}T{rng.randint(0, 23):02d}:15:00.37',
+            'ATTACHMENTNAME': f'{rng.getrandbits(128):x}.pdf',
+            'TotalPageCnt': BSE_PAGES,
+        }
+        for i in range(BSE_PAGE_SIZE)
+    ]
+    return json.dumps({'Table': table, 'Table1': [{'ROWCNT': BSE_PAGES * BSE_PAGE_SIZE}]}).encode()
+
+
+def _news_body(rng: random.Random) -> bytes:
+    items = [
+        {
+            'id': f'tag:reuters.com,2026:newsml_{rng.getrandbits(48):x}',
+            'title': f'Story {i} about the markets',
+            'provider': rng.choice(['reuters', 'moneycontrol', 'tradingview']),
+            'published': f'2026-10-{rng.randint(1, 17):02d}T{rng.randint(0, 23):02d}:00:00Z',
+            'urgency': 2,
+            'storyPath': f'/news/story-{i}/',
+            'relatedSymbols': [{'symbol': f'NSE:SYM{rng.randint(0, 999)}'}],
+        }
+        for i in range(1000)
+    ]
+    return json.dumps({'items': items}).encode()
+
+
+def synthetic_cassette():
+    """A cassette with deterministic responses for every workload."""
+    from replay import Cassette
+
+    rng = random.Random(0)
+    cassette = Cassette()
+    headers = {'Content-Type': 'application/json'}
+    query = scan_query()
+    cassette.add('POST', query.url, query.to_json(), 200, _scan_body(rng), headers)
+    for page in range(1, BSE_PAGES + 1):
+        cassette.add('GET', bse_page_url(page), None, 200, _bse_body(rng, page), headers)
+    cassette.add('GET', NEWS_API_URL, None, 200, _news_body(rng), headers)
+    return cassette
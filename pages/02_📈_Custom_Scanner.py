@@ -14,30 +14,22 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from utils.news_modal import show_news_for_symbol
 import pandas as pd
-from tradingview_screener import Query, Column, col
+from tradingview_screener import Query, Column, col, gather_scans, get_universe_snapshot
 from utils.listing_dates import get_listing_date_map_cached
+from src.price_bands import PriceBandTable, get_price_bands
 import plotly.express as px
 import plotly.graph_objects as go
 from streamlit.components.v1 import html
 import time
 import logging
+import asyncio
 
 # --- Ensure session state variables are initialized ---
-if 'price_bands_loading' not in st.session_state:
-    st.session_state.price_bands_loading = False
-if 'price_bands_df' not in st.session_state:
-    st.session_state.price_bands_df = pd.DataFrame()
 if 'bands_last_update' not in st.session_state:
     st.session_state.bands_last_update = None
 
 # Page Configuration
 
-# Initialize price bands in session state if not present
-if 'price_bands_df' not in st.session_state:
-    st.session_state.price_bands_df = pd.DataFrame()
-    st.session_state.bands_last_update = None
-    st.session_state.price_bands_loading = False
-
 # Remove top padding and menu
 st.markdown("""
     <style>
@@ -1089,43 +1081,24 @@ with st.container():
     st.markdown('<div class="filter-card">', unsafe_allow_html=True)
     st.markdown('<h3 class="filter-title">Price Band</h3>', unsafe_allow_html=True)
 
-    # Fetch price bands in background after page loads
-    if not st.session_state.price_bands_loading and st.session_state.price_bands_df.empty:
-        st.session_state.price_bands_loading = True
+    # The price bands table is shared by all the sessions (downloaded once per TTL)
+    try:
         with st.spinner("Loading price bands..."):
-            try:
-                import importlib.util
-                import sys
-                fetch_price_bands = None
-                price_bands_module_path = 'pages/09_💹_Price_Bands.py'
-                spec = importlib.util.spec_from_file_location('price_bands_mod', price_bands_module_path)
-                if spec is not None:
-                    price_bands_mod = importlib.util.module_from_spec(spec)
-                    sys.modules['price_bands_mod'] = price_bands_mod
-                    try:
-                        spec.loader.exec_module(price_bands_mod)
-                        fetch_price_bands = getattr(price_bands_mod, 'fetch_price_bands', None)
-                    except Exception:
-                        fetch_price_bands = None
-                if fetch_price_bands is None:
-                    from pages.price_bands import fetch_price_bands
-            except ImportError:
-                from pages.price_bands import fetch_price_bands
-            st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands()
-            st.session_state.price_bands_loading = False
-            st.rerun()
-
-    if not st.session_state.price_bands_df.empty:
-        band_options = sorted(st.session_state.price_bands_df['Band'].dropna().unique().tolist())
-        band_options = [f"{int(b)}%" for b in band_options]
+            price_bands = get_price_bands()
+    except Exception as e:
+        st.error(f"Error fetching price bands: {str(e)}")
+        price_bands = PriceBandTable.empty()
+    st.session_state.bands_last_update = price_bands.last_update
+
+    if len(price_bands):
+        band_options = [f"{int(b)}%" for b in price_bands.band_values]
         band_options.append("No Band")  # Add 'No Band' option for 'no band'
         # Default should include 5%, 10%, 20%, and No Band
         default_selected_bands = [x for x in band_options if x in ["10%", "20%", "5%", "No Band"]]
         selected_bands = st.multiselect("Select Price Band(s) (optional)", band_options, default=default_selected_bands, key="price_band", disabled=disable_all_filters)
     else:
         selected_bands = []
-        if not st.session_state.price_bands_loading:
-            st.info("Price bands will be loaded when you start scanning.")
+        st.info("Price bands are not available, the price band filter is disabled.")
     st.markdown('</div>', unsafe_allow_html=True)
 
     # --- Centrally map listing_dates.txt ---
@@ -1229,17 +1202,10 @@ with st.container():
     if selected_exchanges:
         other_filters.append(Column("exchange").isin(selected_exchanges))
     # Price Band filter
-    if selected_bands and not st.session_state.price_bands_df.empty:
-        allowed_symbols = []
-        # Add symbols for selected numeric bands
+    if selected_bands and len(price_bands):
+        # Symbols of the selected numeric bands, plus those without a band for 'No Band'
         band_values = [float(b.replace('%','')) for b in selected_bands if b != "No Band"]
-        if band_values:
-            allowed_symbols += st.session_state.price_bands_df[st.session_state.price_bands_df['Band'].isin(band_values)]['Symbol'].tolist()
-        # Add symbols for 'No Band' selection
-        if "No Band" in selected_bands:
-            allowed_symbols += st.session_state.price_bands_df[st.session_state.price_bands_df['Band'].isna()]['Symbol'].tolist()
-        # Remove duplicates, if any
-        allowed_symbols = list(set(allowed_symbols))
+        allowed_symbols = price_bands.symbols(band_values, no_band="No Band" in selected_bands)
         if allowed_symbols:
             other_filters.append(Column("name").isin(allowed_symbols))
         else:
@@ -1289,25 +1255,20 @@ with st.container():
     # --- Run Query Button ---
     st.markdown('<div style="margin-top: 1rem;">', unsafe_allow_html=True)
 
-    # Check if price bands are still loading
-    if st.session_state.price_bands_loading:
-        st.warning("⌛ Please wait while price bands are loading...")
-        st.button("🚀 Run Query", type="primary", disabled=True, help="Button is disabled while price bands are loading")
-    else:
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            run_query_button = st.button(
-                "🚀 Run Query",
-                type="primary",
-                help="Execute the query and fetch results",
-                key="run_query_button",
-                disabled=disable_all_filters and not allow_exchange_select_only
-            )
-        # Removed '📊 View Charts' button and logic as requested.
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        run_query_button = st.button(
+            "🚀 Run Query",
+            type="primary",
+            help="Execute the query and fetch results",
+            key="run_query_button",
+            disabled=disable_all_filters and not allow_exchange_select_only
+        )
+    # Removed '📊 View Charts' button and logic as requested.
 
     st.markdown('</div>', unsafe_allow_html=True)
 
-    if run_query_button and not st.session_state.price_bands_loading:
+    if run_query_button:
         if contradictory_emas:
             st.error("Cannot run scan with contradictory EMA selections. Please fix your selection.")
         else:
@@ -1331,11 +1292,12 @@ with st.container():
                 ):
                     # Only fetch required columns (use 'name' instead of 'ticker' for TradingView India)
                     exchange_choices = ["NSE", "BSE"]
-                    dfs = []
-                    for exch in exchange_choices:
-                        q = Query().set_markets('india').where(col('type') == 'fund').where(col('exchange') == exch).select('name', 'exchange', 'type').offset(0).limit(20000)
-                        count, df_exch = q.get_scanner_data()
-                        dfs.append(df_exch)
+                    exchange_queries = [
+                        Query().set_markets('india').where(col('type') == 'fund', col('exchange') == exch).select('name', 'exchange', 'type').offset(0).limit(20000)
+                        for exch in exchange_choices
+                    ]
+                    # Fetch all exchanges concurrently (results come back in input order)
+                    dfs = [df_exch for _, df_exch in asyncio.run(gather_scans(exchange_queries, max_concurrency=len(exchange_queries)))]
                     df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
 
                     # Rename 'name' to 'ticker' for display
@@ -1346,13 +1308,8 @@ with st.container():
                         df.rename(columns={'name': 'ticker'}, inplace=True)
 
                     # Merge Price Band if available
-                    if not df.empty and not st.session_state.price_bands_df.empty:
-                        df = df.merge(
-                            st.session_state.price_bands_df.rename(columns={'Symbol': 'ticker'}),
-                            on='ticker', how='left'
-                        )
-                        df['Price Band'] = df['Band'].apply(lambda x: f"{int(x)}%" if pd.notnull(x) else "No Band")
-                        df.drop(columns=['Band'], inplace=True, errors='ignore')
+                    if not df.empty and len(price_bands):
+                        df = price_bands.join(df, on='ticker', column='Price Band')
                     else:
                         df['Price Band'] = ""
 
@@ -1394,7 +1351,7 @@ with st.container():
                     q = q.where(*query_filters)
                     # Set row limit to 20000
                     q = q.limit(20000)
-                    count, df = q.get_scanner_data()
+                    count, df = get_universe_snapshot(q.query['markets'][0]).get_scanner_data(q)
                 
                 # Update loading indicator with success message
                 loading_container.markdown(f"""
@@ -1471,7 +1428,7 @@ if 'scan_df' in st.session_state and not st.session_state['scan_df'].empty:
     st.write(f"Total Results: {len(df)}")
     # --- Unified toggle: Sector / Industry / Search Results / Live News ---
     # Only set the radio index for redirect, otherwise let Streamlit manage the selection
-    if run_query_button and not st.session_state.price_bands_loading:
+    if run_query_button:
         st.session_state['scan_redirect'] = True
     summary_options = ["Sector", "Industry", "Search Results", "Live News"]
     if st.session_state.get('scan_redirect', False):
@@ -1508,7 +1465,7 @@ if 'scan_df' in st.session_state and not st.session_state['scan_df'].empty:
         with copy_format_tab2:
             # Industry-wise categorized format
             if not df.empty and 'industry' in df.columns:
-                industry_groups = df.groupby('industry')['name'].agg(list).reset_index()
+                industry_groups = df.groupby('industry', observed=True)['name'].agg(list).reset_index()
                 industry_groups['count'] = industry_groups['name'].apply(len)
                 industry_groups = industry_groups.sort_values('count', ascending=False)
                 
@@ -1529,7 +1486,7 @@ if 'scan_df' in st.session_state and not st.session_state['scan_df'].empty:
         with copy_format_tab3:
             # Sector-wise categorized format
             if not df.empty and 'sector' in df.columns:
-                sector_groups = df.groupby('sector')['name'].agg(list).reset_index()
+                sector_groups = df.groupby('sector', observed=True)['name'].agg(list).reset_index()
                 sector_groups['count'] = sector_groups['name'].apply(len)
                 sector_groups = sector_groups.sort_values('count', ascending=False)
                 
@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
-from tradingview_screener import Query, col, Column
+from tradingview_screener import Query, col, Column, get_universe_snapshot
 import plotly.express as px
-import importlib.util
-import sys
-import os
 from scipy.stats import zscore
+from src.price_bands import get_price_bands
 
 st.set_page_config(
     page_title="Industry Visualization",
@@ -98,15 +96,6 @@ body, .stApp {
 </div>
 """, unsafe_allow_html=True)
 
-# Dynamically import fetch_price_bands from 09_💹_Price_Bands.py
-module_name = "price_bands_dynamic"
-file_path = os.path.join(os.path.dirname(__file__), "09_💹_Price_Bands.py")
-spec = importlib.util.spec_from_file_location(module_name, file_path)
-price_bands = importlib.util.module_from_spec(spec)
-sys.modules[module_name] = price_bands
-spec.loader.exec_module(price_bands)
-fetch_price_bands = price_bands.fetch_price_bands
-
 with st.container():
     st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
     col1, col2, col3, col4 = st.columns([1.1, 1.1, 1.1, 1])
@@ -147,17 +136,12 @@ with st.spinner("Fetching all NSE stocks via TradingView API..."):
             )
             .limit(20000)
         )
-        count, df = q.get_scanner_data()
+        count, df = get_universe_snapshot(q.query['markets'][0]).get_scanner_data(q)
 
         # --- Apply price band filter (only 10%, 20%, 5%, No Band) ---
-        price_bands_df, _ = fetch_price_bands()
-        allowed_bands = [10.0, 20.0, 5.0]
-        allowed_symbols = price_bands_df[price_bands_df['Band'].isin(allowed_bands)]['Symbol'].tolist()
-        no_band_symbols = price_bands_df[price_bands_df['Band'].isna()]['Symbol'].tolist()
-        allowed_symbols += no_band_symbols
-        df = df[df['name'].isin(allowed_symbols)]
-        df = df.merge(price_bands_df.rename(columns={'Symbol': 'name'}), on='name', how='left')
-        df['Band'] = df['Band'].apply(lambda x: f"{int(x)}%" if pd.notnull(x) else "No Band")
+        price_bands = get_price_bands()
+        df = df[price_bands.mask(df['name'], [10.0, 20.0, 5.0], no_band=True)]
+        df = price_bands.join(df, on='name', column='Band')
     except Exception as e:
         st.error(f"Failed to fetch data: {e}")
         df = pd.DataFrame()
@@ -252,7 +236,8 @@ if not df.empty:
     </div>
     """, unsafe_allow_html=True)
 
-    hist_df = df[[group_col, 'name', returns_col]].copy()
+    # plain labels (not categoricals), they're grouped, concatenated and mapped below
+    hist_df = df[[group_col, 'name', returns_col]].astype({group_col: object})
     hist_df = hist_df.rename(columns={group_col: group_label, 'name': 'Stock', returns_col: 'Return'})
     # Find max return per group
     max_per_group = hist_df.groupby(group_label).apply(lambda x: x.loc[x['Return'].idxmax()]).reset_index(drop=True)
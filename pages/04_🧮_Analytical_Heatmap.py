@@ -1,8 +1,9 @@
 import streamlit as st
-from tradingview_screener import Query, Column
+from tradingview_screener import Query, Column, get_universe_snapshot
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from src.performance_monitor import render_debug_panel, set_page, stage
 
 st.set_page_config(
     page_title="NSE Stocks Analytical Treemap",
@@ -185,9 +186,13 @@ query = (
     .limit(20000)
 )
 
-# Get data from TradingView
-with st.spinner("Loading NSE stock data..."):
-    count, df = query.get_scanner_data()
+set_page("Analytical Heatmap")
+
+# Get data from TradingView (evaluated locally on the universe snapshot). The whole scan is timed
+# as `scan` (it can include downloading the snapshot), and a remote fallback by its own stages
+with st.spinner("Loading NSE stock data..."), stage("scan"):
+    snapshot = get_universe_snapshot(query.query['markets'][0])
+    count, df = snapshot.get_scanner_data(query.set_timer(stage))
 
 # Rename columns for easier access
 # Use correct mapping for market cap and other columns
@@ -236,9 +241,8 @@ elif group_by == "Industry" and 'industry' in filtered_df.columns:
 else:
     treemap_path = ['Stock Name']
 
-# Drop NA and ensure numeric for perf field
+# Drop NA (the perf fields are already floats, decoded with the snapshot's schema)
 filtered_df = filtered_df.dropna(subset=[field, 'Market Cap', 'Stock Name'])
-filtered_df = filtered_df[pd.to_numeric(filtered_df[field], errors='coerce').notnull()]
 
 # Gainers/Losers logic
 if show_gainers == "Top Gainers":
@@ -258,50 +262,52 @@ else:
     }
 
 # Create treemap with improved styling
-fig = px.treemap(
-    filtered_df,
-    path=treemap_path,
-    values=box_sizes,  # Use abs value for losers
-    color=field,
-    hover_data={
-        'Stock Name': True,
-        'Close Price': True,
-        field: True,
-        'Market Cap': True,
-        'sector': True,
-        'industry': True
-    },
-    title=f'NSE Stocks Treemap: {selected_perf}',
-    height=900,
-    **color_args
-)
-    
-# Enhanced treemap styling
-fig.update_layout(
-    margin=dict(l=0, r=0, t=40, b=0),
-    paper_bgcolor='#181A20',
-    plot_bgcolor='#181A20',
-    font=dict(color='#fff', family='Inter, sans-serif'),
-    treemapcolorway=["#d62728", "#2ca02c", "#ff7f0e", "#1f77b4", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"],
-    hoverlabel=dict(
-        bgcolor="#181A20",
-        font_size=14,
-        font_family="Inter, sans-serif"
+with stage("figure"):
+    fig = px.treemap(
+        filtered_df,
+        path=treemap_path,
+        values=box_sizes,  # Use abs value for losers
+        color=field,
+        hover_data={
+            'Stock Name': True,
+            'Close Price': True,
+            field: True,
+            'Market Cap': True,
+            'sector': True,
+            'industry': True
+        },
+        title=f'NSE Stocks Treemap: {selected_perf}',
+        height=900,
+        **color_args
     )
-)
     
-# Custom hover template
-fig.data[0].texttemplate = "%{label}<br>%{customdata[2]:+.2f}%"
-fig.data[0].hovertemplate = (
-    "<b>%{label}</b><br>" +
-    "Close Price: ₹%{customdata[1]:,.2f}<br>" +
-    f"{selected_perf}: %{{customdata[2]:+.2f}}%<br>" +
-    "Market Cap: ₹%{customdata[3]:,.0f} Cr<br>" +
-    "Sector: %{customdata[4]}<br>" +
-    "Industry: %{customdata[5]}<extra></extra>"
-)
+    # Enhanced treemap styling
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=40, b=0),
+        paper_bgcolor='#181A20',
+        plot_bgcolor='#181A20',
+        font=dict(color='#fff', family='Inter, sans-serif'),
+        treemapcolorway=["#d62728", "#2ca02c", "#ff7f0e", "#1f77b4", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"],
+        hoverlabel=dict(
+            bgcolor="#181A20",
+            font_size=14,
+            font_family="Inter, sans-serif"
+        )
+    )
     
-st.plotly_chart(fig, use_container_width=True)
+    # Custom hover template
+    fig.data[0].texttemplate = "%{label}<br>%{customdata[2]:+.2f}%"
+    fig.data[0].hovertemplate = (
+        "<b>%{label}</b><br>" +
+        "Close Price: ₹%{customdata[1]:,.2f}<br>" +
+        f"{selected_perf}: %{{customdata[2]:+.2f}}%<br>" +
+        "Market Cap: ₹%{customdata[3]:,.0f} Cr<br>" +
+        "Sector: %{customdata[4]}<br>" +
+        "Industry: %{customdata[5]}<extra></extra>"
+    )
+
+with stage("render"):
+    st.plotly_chart(fig, use_container_width=True)
     
 # Add summary statistics
 st.markdown('<div class="filter-card">', unsafe_allow_html=True)
@@ -328,3 +334,5 @@ st.download_button(
     file_name="nse_filtered_data.csv",
     mime="text/csv"
 )
+
+render_debug_panel()
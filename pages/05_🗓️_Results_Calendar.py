@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 import time
 import threading
+import logging
+from src.cache_registry import get_registry
 
 # Date parsing helper for export
 def parse_date(date_str):
@@ -43,54 +45,56 @@ def sort_dates(dates):
     return sorted(dates, key=parse_date_inner)
 
 # Add results data fetching
-@st.cache_data(ttl=21600)  # Cache for 6 hours
+RESULTS_TTL = 21600  # 6 hours
+
+
 def fetch_results():
-    """Fetch results data from Google Sheets. If unavailable, return cached data if possible."""
+    """Fetch results data from Google Sheets"""
+    url = "https://docs.google.com/spreadsheets/d/1xig6-dQ8PuPdeCxozcYdm15nOFUKMMZFm_p8VvRFDaE/gviz/tq?tqx=out:csv&gid=948182834"
+    df = pd.read_csv(url)
+    df = df[['Scrip Code', 'Short Name', 'Long Name', 'Meeting Date']]
+    # Ensure Scrip Code is numeric
+    df['Scrip Code'] = pd.to_numeric(df['Scrip Code'])
+    df['Last Updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    # Use the latest timestamp as version
+    latest_update = df['Last Updated'].iloc[0] if not df.empty else str(time.time())
+    return df, latest_update
+
+
+def refresh_results():
+    """Fetch the results and replace the copy shared by all the sessions"""
+    df, latest_update = fetch_results()
+    registry.put('results_calendar', 'latest', (df, latest_update, time.time()))
+
+
+def _refresh_results_bg():
     try:
-        url = "https://docs.google.com/spreadsheets/d/1xig6-dQ8PuPdeCxozcYdm15nOFUKMMZFm_p8VvRFDaE/gviz/tq?tqx=out:csv&gid=948182834"
-        df = pd.read_csv(url)
-        df = df[['Scrip Code', 'Short Name', 'Long Name', 'Meeting Date']]
-        # Ensure Scrip Code is numeric
-        df['Scrip Code'] = pd.to_numeric(df['Scrip Code'])
-        df['Last Updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-        # Use the latest timestamp as version
-        latest_update = df['Last Updated'].iloc[0] if not df.empty else str(time.time())
-        return df, latest_update
+        refresh_results()
+    except Exception:
+        # keep showing the cached data, the next stale page load tries again
+        logging.getLogger(__name__).exception("Error refreshing results")
+
+
+# --- INTELLIGENT CACHING: a single copy of the results, shared by all the sessions (and bounded
+# by the cache budget). It's shown instantly, and refreshed in the background once it's stale.
+registry = get_registry()
+cached = registry.get('results_calendar', 'latest')
+if cached is None:
+    try:
+        refresh_results()
     except Exception as e:
         st.error(f"Error fetching results: {str(e)}")
-        # Try to load from cache if available
-        cache = st.session_state.get('results_cache')
-        if cache is not None:
-            st.warning("Showing cached results data. Data may be outdated.")
-            return cache['df'], cache['last_update']
-        # Fallback to empty
-        return pd.DataFrame(columns=['Scrip Code', 'Short Name', 'Long Name', 'Meeting Date', 'Last Updated']), str(time.time())
-
-# --- INTELLIGENT CACHING: ensure user always sees data instantly if possible ---
-# On first load, try to show cached data from session state immediately, and update in background.
-if 'results_cache' in st.session_state and st.session_state['results_cache']['df'] is not None and not st.session_state['results_cache']['df'].empty:
-    results_df = st.session_state['results_cache']['df']
-    results_last_update = st.session_state['results_cache']['last_update']
+    cached = registry.get('results_calendar', 'latest')
+elif time.time() - cached[2] > RESULTS_TTL:
+    # bump the timestamp so the other sessions don't start their own refresh
+    registry.put('results_calendar', 'latest', (cached[0], cached[1], time.time()))
+    threading.Thread(target=_refresh_results_bg, daemon=True).start()
+
+if cached is not None:
+    results_df, results_last_update, _ = cached
 else:
-    # Try to fetch from cache_data (Streamlit's persistent cache) if session cache is empty
-    try:
-        results_df, results_last_update = fetch_results()
-        # Save to session state for instant access on next load
-        if results_df is not None and not results_df.empty:
-            st.session_state['results_cache'] = {'df': results_df, 'last_update': results_last_update}
-    except Exception:
-        results_df, results_last_update = pd.DataFrame(), None
-
-# Start background fetch for fresh data (will update session cache for next reload)
-def _load_results_bg():
-    global results_df, results_last_update
-    new_df, new_last_update = fetch_results()
-    if new_df is not None and not new_df.empty:
-        st.session_state['results_cache'] = {'df': new_df, 'last_update': new_last_update}
-        # Optionally, trigger a rerun if new data is fresher
-        if results_last_update != new_last_update:
-            st.experimental_rerun()
-threading.Thread(target=_load_results_bg).start()
+    results_df = pd.DataFrame(columns=['Scrip Code', 'Short Name', 'Long Name', 'Meeting Date', 'Last Updated'])
+    results_last_update = None
 
 # Page Header with modern SVG (Material: Insert Chart Rounded)
 st.markdown("""
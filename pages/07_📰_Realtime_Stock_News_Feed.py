@@ -6,6 +6,9 @@ import datetime
 import re
 import concurrent.futures
 import pytz
+from tradingview_screener import get_default_transport
+from tradingview_screener.codec import loads
+from src.performance_monitor import render_debug_panel, set_page, stage
 
 st.set_page_config(page_title="Stock News", layout="centered", initial_sidebar_state="auto")
 st.write('Streamlit version:', st.__version__)
@@ -47,6 +50,8 @@ div[data-testid="stTextInput"] input {
 """, unsafe_allow_html=True)
 
 
+set_page("News Feed")
+
 # Fetch news from TradingView API with caching
 @st.cache_data(show_spinner=False)
 def fetch_news():
@@ -58,9 +63,12 @@ def fetch_news():
         "Connection": "keep-alive",
         "Upgrade-Insecure-Requests": "1"
     }
-    resp = requests.get(NEWS_API_URL, headers=headers, timeout=10)
-    resp.raise_for_status()
-    return resp.json()
+    with stage("http") as span:
+        resp = get_default_transport().get(NEWS_API_URL, headers=headers, timeout=10)
+        resp.raise_for_status()
+        span.nbytes = len(resp.content)
+    with stage("decode", nbytes=span.nbytes):
+        return loads(resp.content)
 
 # --- Fetch only new news based on latest timestamp ---
 if 'latest_news_time' not in st.session_state:
@@ -394,4 +402,6 @@ if stories:
     except Exception as e:
         st.error(f"Failed to fetch news: {e}")
 else:
-    st.warning("No news headlines found in the 'items' array. .")
\ No newline at end of file
+    st.warning("No news headlines found in the 'items' array. .")
+
+render_debug_panel()
@@ -7,10 +7,14 @@ st.set_page_config(
 )
 from sidebar import custom_sidebar
 import pandas as pd
+from streamlit_autorefresh import st_autorefresh
+from utils.bse_announcements_utils import AnnouncementTail, BSEAnnouncements
 import io
 import time
 import pytz
 
+LIVE_REFRESH_SECONDS = 10
+
 # Initialize session state for news data
 if 'news_df' not in st.session_state:
     st.session_state.news_df = pd.DataFrame()
@@ -71,6 +75,28 @@ def fetch_stock_news():
         st.error(f"Error fetching news data: {str(e)}")
         return pd.DataFrame(), ''
 
+@st.cache_resource
+def get_bse_announcements():
+    return BSEAnnouncements()
+
+def to_news_rows(df):
+    """Map announcements of the BSE API to the columns of the news sheet"""
+    def pdf_url(name):
+        return f"https://www.bseindia.com/xml-data/corpfiling/AttachLive/{name}" if isinstance(name, str) and name else ''
+
+    def column(name, default=''):
+        return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
+    return pd.DataFrame({
+        'NEWS_DT': pd.to_datetime(column('DT_TM', None), errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'SLONGNAME': column('SLONGNAME'),
+        'CATEGORYNAME': column('CATEGORYNAME'),
+        'SUBCATNAME': column('SUBCATNAME'),
+        'HEADLINE': column('HEADLINE') if 'HEADLINE' in df.columns else column('NEWSSUB'),
+        'PDF': column('ATTACHMENTNAME').map(pdf_url),
+        'SOURCE': 'BSE Live',
+    })
+
 # --- Redesigned UI Layout ---
 # Header Card
 st.markdown("""
@@ -188,8 +214,30 @@ st.markdown('<div class="narrow-search-bar"></div>', unsafe_allow_html=True)
 if st.button("🔄 Refresh Now", key="refresh_now_connected"):
     fetch_stock_news.clear()
     st.session_state.news_df, st.session_state.news_last_update = fetch_stock_news()
+    st.session_state.pop('bse_tail', None)  # the live filings are merged again into the new data
     st.rerun()
 
+# --- LIVE BSE FILINGS ---
+# Tails the BSE API: each refresh only polls for the filings newer than the last one seen,
+# and only those are added to the news
+live = st.checkbox(f"⚡ Live BSE filings (every {LIVE_REFRESH_SECONDS}s)", key="live_bse_filings")
+if live:
+    st_autorefresh(interval=LIVE_REFRESH_SECONDS * 1000, key="live_filings_refresh")
+    if 'bse_tail' not in st.session_state:
+        st.session_state.bse_tail = AnnouncementTail()
+    try:
+        new_filings = get_bse_announcements().poll_new_announcements(st.session_state.bse_tail)
+    except Exception as e:
+        st.warning(f"Error polling BSE filings: {str(e)}")
+        new_filings = pd.DataFrame()
+    if not new_filings.empty:
+        live_rows = to_news_rows(new_filings)
+        if 'HEADLINE' in st.session_state.news_df.columns:
+            live_rows = live_rows[~live_rows['HEADLINE'].isin(st.session_state.news_df['HEADLINE'])]
+        if not live_rows.empty:
+            st.session_state.news_df = pd.concat([live_rows, st.session_state.news_df], ignore_index=True)
+            st.success(f"📢 {len(live_rows)} new filing(s)")
+
 # --- FILTER THE NEWS DATAFRAME BASED ON UI ---
 filtered_df = st.session_state.news_df.copy() if not st.session_state.news_df.empty else pd.DataFrame()
 
@@ -305,15 +353,16 @@ else:
     if not st.session_state.news_loading:
         st.warning("Unable to fetch news data. Please try again later.")
 
-# Add auto-refresh script
-st.markdown("""
-<script>
-    function reload() {
-        window.location.reload();
-    }
-    setTimeout(reload, 300000);
-</script>
-""", unsafe_allow_html=True)
+# Add auto-refresh script (not in live mode, where a full reload would restart the tail)
+if not live:
+    st.markdown("""
+    <script>
+        function reload() {
+            window.location.reload();
+        }
+        setTimeout(reload, 300000);
+    </script>
+    """, unsafe_allow_html=True)
 
 # Footer
 st.markdown("---")
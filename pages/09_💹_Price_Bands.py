@@ -3,28 +3,11 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import time
+from src.price_bands import fetch_price_bands
 
-# --- Price Bands Data Fetch with Smart Cache ---
-@st.cache_data(ttl=21600)
-def fetch_price_bands():
-    try:
-        url = "https://docs.google.com/spreadsheets/d/1xig6-dQ8PuPdeCxozcYdm15nOFUKMMZFm_p8VvRFDaE/gviz/tq?tqx=out:csv&gid=364491472"
-        df = pd.read_csv(url)
-        df = df[['Symbol', 'Series', 'Security Name', 'Band']]
-        df['Band'] = pd.to_numeric(df['Band'], errors='coerce')
-        df['Last Updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-        # Use the latest timestamp as version
-        latest_update = df['Last Updated'].iloc[0] if not df.empty else str(time.time())
-        return df, latest_update
-    except Exception as e:
-        st.error(f"Error fetching price bands: {str(e)}")
-        return pd.DataFrame(columns=['Symbol', 'Series', 'Security Name', 'Band', 'Last Updated']), str(time.time())
-
-# Initialize session state for price bands data
-if 'price_bands_df' not in st.session_state:
-    # Always load from cache for instant page load
-    st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands()
+# Price bands data: a view of the table shared by all the sessions (downloaded once per TTL),
+# so re-reading it on every run is a lookup rather than a copy
+st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands()
 
 if __name__ == "__main__":
     # Load custom CSS
@@ -59,8 +42,7 @@ if __name__ == "__main__":
     # Add a refresh button to clear cache and reload
     refresh = st.button("🔄 Refresh Price Bands", help="Clear cache and fetch fresh data")
     if refresh:
-        st.cache_data.clear()
-        st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands()
+        st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands(refresh=True)
         st.rerun()
 
     if not st.session_state.price_bands_df.empty:
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from tradingview_screener import Query, Column
+from tradingview_screener import Query, Column, get_universe_snapshot
 import yfinance as yf
 
 st.set_page_config(
@@ -349,7 +349,7 @@ with st.spinner("Running fundamental scan..."):
     for col in REQUIRED_COLUMNS:
         if col not in current_cols:
             query.query['columns'].append(col)
-    count, df = query.get_scanner_data()
+    count, df = get_universe_snapshot(query.query['markets'][0]).get_scanner_data(query)
 
 # Post-fetch filters for complex conditions
 if not df.empty:
@@ -77,7 +77,7 @@ HTML_FILES = {
     # Add more mappings here for other companies if you download their HTML
 }
 
-import requests
+from tradingview_screener import get_default_transport
 
 def load_html(symbol, consolidated=False):
     symbol = symbol.upper()
@@ -85,7 +85,7 @@ def load_html(symbol, consolidated=False):
     if consolidated:
         url += "consolidated/"
     try:
-        response = requests.get(url, timeout=10)
+        response = get_default_transport().get(url, timeout=10)
         if response.status_code == 200:
             return response.text
         else:
@@ -364,7 +364,6 @@ if symbol:
 
         # --- TradingView logo integration ---
         import re
-        import requests
         @st.cache_data(show_spinner=False)
         def tradingview_logo_url(company_name):
             # Group mapping for conglomerates
@@ -406,13 +405,10 @@ if symbol:
                     'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
                     'Accept-Language': 'en-US,en;q=0.9',
                 }
-                resp = requests.get(url, timeout=5, stream=True, headers=headers)
-                ok = resp.status_code == 200
-                print(f"LOGO CHECK: {url} status={resp.status_code} ok={ok}")
-                resp.close()
-                return ok
-            except Exception as e:
-                print(f"Logo fetch exception: {url} ({e})")
+                # only the status is needed, so the body isn't downloaded
+                with get_default_transport().get(url, timeout=5, stream=True, headers=headers) as resp:
+                    return resp.status_code == 200
+            except Exception:
                 return False
 
         # Overview section
@@ -495,7 +491,7 @@ if symbol:
                 peer_api_url = f"https://www.screener.in/api/company/{company_id}/peers/"
                 # Try both JSON and HTML responses
                 try:
-                    response = requests.get(peer_api_url, timeout=10)
+                    response = get_default_transport().get(peer_api_url, timeout=10)
                     if response.status_code == 200:
                         content_type = response.headers.get('Content-Type', '')
                         if 'application/json' in content_type:
@@ -368,7 +368,7 @@ if show_returns:
                 else:
                     # Fallback to TradingView or other logic for non-NSEI indices
                     try:
-                        q = Query().select('close').where('ticker', idx_symbol)
+                        q = Query().set_schema().select('close').where('ticker', idx_symbol)
                         q.query['range'] = {'from': f'{year}-01-01', 'to': f'{year}-12-31'}
                         count, df = q.get_scanner_data()
                         if df.empty or 'close' not in df.columns:
@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from tradingview_screener import Query, Column
+from tradingview_screener import Query, Column, get_universe_snapshot
 import plotly.express as px
 
 st.set_page_config(
@@ -109,9 +109,9 @@ query = (
     .limit(20000)
 )
 
-@st.cache_data(show_spinner=False)
-def fetch_stock_data(_query):
-    return _query.get_scanner_data()
+def fetch_stock_data(query):
+    # Answered locally from the shared market snapshot (or the shared scan cache as a fallback)
+    return get_universe_snapshot(query.query['markets'][0]).get_scanner_data(query)
 
 with st.spinner("Loading stock data..."):
     count, df = fetch_stock_data(query)
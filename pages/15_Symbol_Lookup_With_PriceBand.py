@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 import re
-import os
-from pages.price_bands import fetch_price_bands
+from src.price_bands import PriceBandTable, get_price_bands
+from utils.ohlcv_store import get_ohlcv_store
 
 st.set_page_config(
     page_title="Symbol Lookup with Price Band",
@@ -92,37 +92,28 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Ensure price bands are loaded in session state ---
-if 'price_bands_df' not in st.session_state or st.session_state.price_bands_df is None or st.session_state.price_bands_df.empty:
-    st.session_state.price_bands_df, st.session_state.bands_last_update = fetch_price_bands()
-price_bands_df = st.session_state.price_bands_df
+# The price bands table is shared by all the sessions (downloaded once per TTL)
+try:
+    price_bands = get_price_bands()
+except Exception as e:
+    st.error(f"Error fetching price bands: {str(e)}")
+    price_bands = PriceBandTable.empty()
 
 # --- EMA Calculation Utility ---
 @st.cache_data(show_spinner=True)
 def compute_emas_for_all_symbols(eod_folder, ema_periods=[20, 50, 200], symbols=None):
+    # The closes come from the OHLCV store (the CSVs are parsed once, not on every call)
+    store = get_ohlcv_store(eod_folder)
     ema_data = []
-    files = os.listdir(eod_folder)
-    if symbols is not None:
-        symbol_set = set(s.lower() for s in symbols)
-        files = [f for f in files if f.lower().endswith('.csv') and f[:-4].lower() in symbol_set]
-    for fname in files:
-        if not fname.lower().endswith('.csv'):
+    for symbol in (symbols if symbols is not None else store.symbols):
+        bars = store.get(symbol)
+        if bars is None or len(bars) == 0:
             continue
-        symbol = fname[:-4].upper()
-        fpath = os.path.join(eod_folder, fname)
-        try:
-            df = pd.read_csv(fpath)
-            if 'Close' not in df.columns or df.empty:
-                continue
-            df = df.sort_values('Date')
-            latest = df.iloc[-1]
-            ema_row = {'Symbol': symbol, 'Close': latest['Close']}
-            for period in ema_periods:
-                ema_col = f'EMA{period}'
-                df[ema_col] = df['Close'].ewm(span=period, adjust=False).mean()
-                ema_row[ema_col] = df[ema_col].iloc[-1]
-            ema_data.append(ema_row)
-        except Exception as e:
-            print(f'Error processing {fname}: {e}')
+        closes = pd.Series(bars.close)
+        ema_row = {'Symbol': str(symbol).upper(), 'Close': closes.iloc[-1]}
+        for period in ema_periods:
+            ema_row[f'EMA{period}'] = closes.ewm(span=period, adjust=False).mean().iloc[-1]
+        ema_data.append(ema_row)
     return pd.DataFrame(ema_data)
 
 # --- FILTERS CARD ---
@@ -141,9 +132,8 @@ compute_only_input = st.checkbox(
     help="If checked, only compute EMAs for the symbols you input above. If unchecked, computes for all symbols in the folder."
 )
 band_options = []
-if price_bands_df is not None and not price_bands_df.empty:
-    band_options = sorted(price_bands_df['Band'].dropna().unique().tolist())
-    band_options = [f"{int(b)}%" for b in band_options]
+if len(price_bands):
+    band_options = [f"{int(b)}%" for b in price_bands.band_values]
     band_options.append("No Band")
 selected_bands = st.multiselect(
     "Filter by Price Band (optional):",
@@ -183,13 +173,10 @@ if symbol_input.strip():
     if not symbols:
         st.warning("Please enter at least one valid symbol.")
         st.stop()
-    # Filter price_bands_df for these symbols
-    df = price_bands_df.copy()
-    df['Symbol'] = df['Symbol'].astype(str).str.upper().str.strip()
+    # Look the symbols up in the price bands table (its symbols are already normalized)
     all_input_symbols = set(symbols)
-    all_valid_symbols = set(df['Symbol'])
-    valid_symbols = all_input_symbols & all_valid_symbols
-    invalid_symbols = all_input_symbols - all_valid_symbols
+    valid_symbols = {s for s in all_input_symbols if s in price_bands}
+    invalid_symbols = all_input_symbols - valid_symbols
     st.markdown(f"""
     <span class='badge'>Symbols entered: {len(all_input_symbols)}</span>
     <span class='badge badge-success'>Valid: {len(valid_symbols)}</span>
@@ -197,19 +184,13 @@ if symbol_input.strip():
     """, unsafe_allow_html=True)
     if invalid_symbols:
         st.markdown(f"<span class='badge badge-warn'>Invalid symbols (not found): {', '.join(list(invalid_symbols)[:10])}{'...' if len(invalid_symbols) > 10 else ''}</span>", unsafe_allow_html=True)
+    df = price_bands.frame
     filtered_df = df[df['Symbol'].isin(symbols)]
     # Only apply price band filter if a specific band is selected
     if band_options and ('All Bands' not in selected_bands):
-        band_map = {f"{int(b)}%": b for b in df['Band'].dropna().unique()}
-        allowed_bands = set()
-        for band in selected_bands:
-            if band == 'No Band':
-                allowed_bands.add(None)
-            elif band in band_map:
-                allowed_bands.add(band_map[band])
+        band_values = [float(b.replace('%', '')) for b in selected_bands if b != 'No Band']
         filtered_df = filtered_df[
-            (filtered_df['Band'].isna() & ('No Band' in selected_bands)) |
-            (filtered_df['Band'].isin([b for b in allowed_bands if b is not None]))
+            price_bands.mask(filtered_df['Symbol'], band_values, no_band='No Band' in selected_bands)
         ]
     # --- EMA Calculation and Merge ---
     eod_folder = r'C:\TradingView-Screener-master\eod2\src\eod2_data\daily'
@@ -232,7 +213,7 @@ if symbol_input.strip():
     if filtered_df.empty:
         st.warning("No data found for the entered symbols and selected price band(s)/EMA filter.")
         st.stop()
-    filtered_df['Price Band'] = filtered_df['Band'].apply(lambda x: f"{int(x)}%" if pd.notnull(x) else "No Band")
+    filtered_df['Price Band'] = price_bands.labels(filtered_df['Band'])
     display_cols = [col for col in ['Symbol', 'Security Name', 'Series', 'Price Band', 'Close', 'EMA20', 'EMA50', 'EMA200'] if col in filtered_df.columns]
     st.dataframe(filtered_df[display_cols], use_container_width=True)
     st.markdown(f"<span class='badge badge-success'>Symbols in final results: {filtered_df['Symbol'].nunique()}</span>", unsafe_allow_html=True)
@@ -25,7 +25,7 @@ st.markdown("""
 <p style='text-align:center;margin-top:-0.75em;margin-bottom:2em;color:#aaa;font-size:1.1rem;'>Identify stocks in a strong uptrend based on 200EMA</p>
 """, unsafe_allow_html=True)
 
-from src.tradingview_screener import Query, Column as col, And, Or
+from src.tradingview_screener import Query, Column as col, And, Or, get_universe_snapshot
 from src.tradingview_screener.markets_list import MARKETS
 
 # Only allow Indian market
@@ -95,7 +95,7 @@ with st.spinner("Running TradingView scan..."):
         .order_by('relative_volume_10d_calc', ascending=False)
         .limit(100)
     )
-    count, df = query.get_scanner_data()
+    count, df = get_universe_snapshot(query.query['markets'][0]).get_scanner_data(query)
 
 if df is not None and not df.empty:
     st.success(f"Found {count} {exchange_input} stocks with 200 {ma_type} uptrend!")
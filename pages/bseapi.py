@@ -2,12 +2,13 @@ import streamlit as st
 import datetime
 import pandas as pd
 import io
-from utils.bse_announcements_utils import BSEAnnouncements
+from utils.bse_announcements_utils import IST, AnnouncementTail, BSEAnnouncements
+from utils.ohlcv_store import get_ohlcv_store
+from utils.post_earnings import compute_post_earnings_moves
+from streamlit_autorefresh import st_autorefresh
 import traceback
 from datetime import time
 import pytz
-import os
-import concurrent.futures
 from fpdf import FPDF
 import calendar
 
@@ -22,6 +23,8 @@ st.set_page_config(
 MARKET_OPEN = time(9, 7)  # 9:07 AM
 MARKET_CLOSE = time(15, 30)  # 15:30 PM
 
+LIVE_REFRESH_SECONDS = 10
+
 # Load equity.csv and create Security Code to Security Id mapping
 try:
     equity_df = pd.read_csv('equity.csv')
@@ -108,40 +111,78 @@ if 'volume_max' not in st.session_state:
 
 global_move_results = []  # Collect all move_results from all sections
 
-def fetch_all_bse_announcements(bse, from_date, to_date, category, scrip, subcategory):
-    """Fetch all announcements from BSE"""
+def prepare_announcements(df):
+    """Parse DT_TM, classify the announcement times, and sort the newest first"""
+    if not df.empty:
+        # Robustly parse all possible BSE datetime formats for DT_TM
+        dt_col = 'DT_TM'
+        if dt_col in df.columns:
+            # Try ISO/mixed first
+            df[dt_col] = pd.to_datetime(df[dt_col], format='mixed', errors='coerce')
+            # Try '%d-%m-%Y %H:%M:%S' for any NaT
+            mask_nat = df[dt_col].isna() & df[dt_col].notnull()
+            if mask_nat.any():
+                df.loc[mask_nat, dt_col] = pd.to_datetime(df.loc[mask_nat, dt_col], format='%d-%m-%Y %H:%M:%S', errors='coerce')
+            # Try '%d/%m/%Y %H:%M:%S' for any remaining NaT
+            mask_nat = df[dt_col].isna() & df[dt_col].notnull()
+            if mask_nat.any():
+                df.loc[mask_nat, dt_col] = pd.to_datetime(df.loc[mask_nat, dt_col], format='%d/%m/%Y %H:%M:%S', errors='coerce')
+        # Add time classification (using IST time directly)
+        df['Time_Classification'] = df['DT_TM'].apply(classify_time)
+        # Sort by date and time
+        df = df.sort_values('DT_TM', ascending=False)
+    return df
+
+def fetch_all_bse_announcements(bse, from_date, to_date, category, scrip, subcategory, live=False):
+    """Fetch all announcements from BSE (with `live`, only the new ones after the first run)"""
+    key = (from_date, to_date, category, scrip, subcategory)
+    if live and st.session_state.get('bse_live_key') == key:
+        # Tailing: only page 1 (and the next pages while they're all new) is polled
+        try:
+            new = bse.poll_new_announcements(st.session_state['bse_tail'])
+        except Exception as e:
+            st.warning(f"Error polling new announcements: {str(e)}")
+            new = pd.DataFrame()
+        df = st.session_state['bse_live_df']
+        if not new.empty:
+            st.success(f"📢 {len(new)} new announcement(s)")
+            df = pd.concat([prepare_announcements(new), df], ignore_index=True)
+            st.session_state['bse_live_df'] = df
+        return df
+
+    # The pages are fetched concurrently: show the count as they come in
+    fetched = st.empty()
+    rows = [0]
+
+    def on_page(page_df):
+        rows[0] += len(page_df)
+        fetched.caption(f"Fetched {rows[0]} announcements...")
+
     try:
         df = bse.fetch_all_announcements_api(
             from_date=from_date,
             to_date=to_date,
             category=category,
             scrip=scrip,
-            subcategory=subcategory
+            subcategory=subcategory,
+            on_page=on_page
         )
-        
-        if not df.empty:
-            # Robustly parse all possible BSE datetime formats for DT_TM
-            dt_col = 'DT_TM'
-            if dt_col in df.columns:
-                # Try ISO/mixed first
-                df[dt_col] = pd.to_datetime(df[dt_col], format='mixed', errors='coerce')
-                # Try '%d-%m-%Y %H:%M:%S' for any NaT
-                mask_nat = df[dt_col].isna() & df[dt_col].notnull()
-                if mask_nat.any():
-                    df.loc[mask_nat, dt_col] = pd.to_datetime(df.loc[mask_nat, dt_col], format='%d-%m-%Y %H:%M:%S', errors='coerce')
-                # Try '%d/%m/%Y %H:%M:%S' for any remaining NaT
-                mask_nat = df[dt_col].isna() & df[dt_col].notnull()
-                if mask_nat.any():
-                    df.loc[mask_nat, dt_col] = pd.to_datetime(df.loc[mask_nat, dt_col], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-            # Add time classification (using IST time directly)
-            df['Time_Classification'] = df['DT_TM'].apply(classify_time)
-            # Sort by date and time
-            df = df.sort_values('DT_TM', ascending=False)
-        return df
+        fetched.empty()
+        df = prepare_announcements(df)
     except Exception as e:
         st.error(f"Error fetching announcements: {str(e)}")
         return pd.DataFrame()
 
+    if live:
+        # The high-water mark of the tail: everything fetched so far is already seen
+        tail = AnnouncementTail(category, scrip, subcategory)
+        tail.reset(datetime.datetime.now(IST).date())
+        tail.add(df)
+        st.session_state['bse_tail'] = tail
+        st.session_state['bse_live_df'] = df
+        st.session_state['bse_live_key'] = key
+    return df
+
 def classify_time(dt):
     """Classify announcement time as during market hours or after hours (IST)"""
     try:
@@ -173,223 +214,64 @@ def get_pdf_link(row):
             return None  # Optionally handle this case
     return None
 
-def calc_post_earnings_move(security_id, ann_date, data_dir="eod2/src/eod2_data/daily", csv_path=None):
-    import os
-    try:
-        if not security_id or pd.isna(security_id):
-            return None, None, None, None, None, None, None
-        # Use provided csv_path if available
-        if csv_path is None:
-            sec_id_clean = str(security_id).strip().lower()
-            csv_path = os.path.join(data_dir, f"{sec_id_clean}.csv")
-            if not os.path.exists(csv_path):
-                alt_csv_path = os.path.join(data_dir, f"{sec_id_clean.replace(' ', '')}.csv")
-                if os.path.exists(alt_csv_path):
-                    csv_path = alt_csv_path
-                else:
-                    return None, None, None, None, None, None, None
-        try:
-            df = pd.read_csv(csv_path, parse_dates=['Date'])
-        except Exception:
-            return None, None, None, None, None, None, None
-        # Clean Date column
-        df['Date'] = pd.to_datetime(df['Date'].astype(str).str.strip(), format='%Y-%m-%d', errors='coerce')
-        df = df.sort_values('Date').reset_index(drop=True)
-        # Validate announcement date
-        ann_date_parsed = pd.to_datetime(str(ann_date).strip(), format='%Y-%m-%d', errors='coerce')
-        if pd.isna(ann_date_parsed):
-            return None, None, None, None, None, None, None
-        # Find all trading days on or after the announcement date
-        future_days = df[df['Date'] >= ann_date_parsed].reset_index(drop=True)
-        if len(future_days) == 0:
-            return None, None, None, None, None, None, None
-        # Get announcement day close (or next trading day if announcement was on holiday)
-        close_0 = None
-        if not future_days.empty and pd.notna(future_days.loc[0, 'Close']):
-            close_0 = future_days.loc[0, 'Close']
-        # Get 30-day and 60-day closes (use max available if not enough days)
-        close_30 = None
-        close_60 = None
-        days_30 = None
-        days_60 = None
-        if len(future_days) > 1:
-            idx_30 = min(30, len(future_days) - 1)
-            idx_60 = min(60, len(future_days) - 1)
-            if pd.notna(future_days.loc[idx_30, 'Close']):
-                close_30 = future_days.loc[idx_30, 'Close']
-                days_30 = idx_30
-            if pd.notna(future_days.loc[idx_60, 'Close']):
-                close_60 = future_days.loc[idx_60, 'Close']
-                days_60 = idx_60
-        # Calculate pre-announcement moves
-        pre_10 = None
-        pre_20 = None
-        idx = df[df['Date'] >= ann_date_parsed].index
-        if len(idx) > 0:
-            idx = idx[0]
-        idx_10 = idx - 10 if idx - 10 >= 0 else None
-        idx_20 = idx - 20 if idx - 20 >= 0 else None
-        if idx_10 is not None and pd.notna(df.loc[idx_10, 'Close']) and close_0 is not None:
-            pre_10 = (close_0 - df.loc[idx_10, 'Close']) / df.loc[idx_10, 'Close'] * 100
-        if idx_20 is not None and pd.notna(df.loc[idx_20, 'Close']) and close_0 is not None:
-            pre_20 = (close_0 - df.loc[idx_20, 'Close']) / df.loc[idx_20, 'Close'] * 100
-        # Calculate post-announcement moves
-        move_30 = None
-        move_60 = None
-        peak_move = None
-        if close_0 is not None and close_0 != 0:
-            if close_30 is not None:
-                move_30 = (close_30 - close_0) / close_0 * 100
-            if close_60 is not None:
-                move_60 = (close_60 - close_0) / close_0 * 100
-            # Peak move: max % move from close_0 to any close in future_days
-            closes = future_days['Close'].dropna()
-            if not closes.empty:
-                peak_move = ((closes - close_0) / close_0 * 100).max()
-        return pre_10, pre_20, move_30, move_60, days_30, days_60, peak_move
-    except Exception:
-        return None, None, None, None, None, None, None
-
-def find_ohlcv_csv(code, security_id, data_dir="eod2/src/eod2_data/daily"):
-    import os
-    # Use current working directory as base
-    data_dir_abs = os.path.abspath(data_dir)
-    candidates = set()
-    for val in [code, security_id]:
-        if not val or pd.isna(val):
-            continue
-        val = str(val).strip()
-        candidates.add(val.lower())
-        candidates.add(val.upper())
-        candidates.add(val.replace(' ', '').lower())
-        candidates.add(val.replace(' ', '').upper())
-    for candidate in candidates:
-        csv_path = os.path.join(data_dir_abs, f"{candidate}.csv")
-        if os.path.exists(csv_path):
-            return csv_path
-    return None
-
-def process_announcement_row(args):
-    row, section_key = args
-    import os
-    code = row.get('SCRIP_CD')
-    security_id = scrip_to_securityid.get(code, code)
-    security_id = symbol_aliases.get(str(security_id).upper(), security_id)
-    data_dir = "eod2/src/eod2_data/daily"
-    csv_path = find_ohlcv_csv(code, security_id, data_dir)
-    ann_date_raw = row.get('DT_TM')
-    ann_date = pd.to_datetime(ann_date_raw).date() if ann_date_raw else None
-    
-    if not csv_path or not os.path.exists(csv_path):
-        return None
-        
-    try:
-        df_ohlc = pd.read_csv(csv_path, parse_dates=['Date'])
-        df_ohlc['Date'] = pd.to_datetime(df_ohlc['Date'].astype(str).str.strip(), errors='coerce')
-        df_ohlc = df_ohlc.sort_values('Date').reset_index(drop=True)
-        # For weekend announcements, we need to find the next trading day
-        if section_key == "weekend":
-            # Find the next trading day after the announcement
-            next_trading_days = df_ohlc[df_ohlc['Date'].dt.date > ann_date]
-            if next_trading_days.empty:
-                return None
-            # Use the next trading day's date for calculations
-            next_trading_date = next_trading_days.iloc[0]['Date'].date()
-            pre_10, pre_20, move_30, move_60, days_30, days_60, peak_move = calc_post_earnings_move(security_id, next_trading_date, data_dir=data_dir, csv_path=csv_path)
-        else:
-            # For non-weekend announcements, check if announcement date exists in data
-            dates_in_file = df_ohlc['Date'].dt.date.tolist()
-            if ann_date not in dates_in_file:
-                return None
-            pre_10, pre_20, move_30, move_60, days_30, days_60, peak_move = calc_post_earnings_move(security_id, ann_date, data_dir=data_dir, csv_path=csv_path)
-    except Exception as e:
-        return None
-
-    # Get volume and check if it's a trading day
-    volume = None
-    close_ann = None
-    open_next = None
-    is_trading_day = False
-    
-    try:
-        df_ohlc = pd.read_csv(csv_path, parse_dates=['Date'])
-        df_ohlc['Date'] = pd.to_datetime(df_ohlc['Date'].astype(str).str.strip(), errors='coerce')
-        df_ohlc = df_ohlc.sort_values('Date').reset_index(drop=True)
-        
-        # Check if announcement date is a trading day
-        ann_date_data = df_ohlc[df_ohlc['Date'].dt.date == ann_date]
-        is_trading_day = not ann_date_data.empty
-        
-        if is_trading_day:
-            # Validate volume data
-            raw_volume = ann_date_data.iloc[0]['Volume']
-            if pd.notna(raw_volume) and raw_volume >= 0:
-                try:
-                    volume = int(raw_volume)
-                except (ValueError, OverflowError):
-                    volume = None
-            else:
-                volume = None
-            
-            close_ann = ann_date_data.iloc[0]['Close'] if pd.notna(ann_date_data.iloc[0]['Close']) else None
-            
-            # For trading days (including special Saturday sessions), use next trading day for gap
-            next_trading_day = df_ohlc[df_ohlc['Date'].dt.date > ann_date].iloc[0] if len(df_ohlc[df_ohlc['Date'].dt.date > ann_date]) > 0 else None
-            if next_trading_day is not None:
-                open_next = next_trading_day['Open'] if pd.notna(next_trading_day['Open']) else None
-        else:
-            # For non-trading days (regular weekends/holidays), find last trading day and next trading day
-            last_trading_day = df_ohlc[df_ohlc['Date'].dt.date < ann_date].iloc[-1] if len(df_ohlc[df_ohlc['Date'].dt.date < ann_date]) > 0 else None
-            next_trading_day = df_ohlc[df_ohlc['Date'].dt.date > ann_date].iloc[0] if len(df_ohlc[df_ohlc['Date'].dt.date > ann_date]) > 0 else None
-            
-            if last_trading_day is not None:
-                # Validate volume data
-                raw_volume = last_trading_day['Volume']
-                if pd.notna(raw_volume) and raw_volume >= 0:
-                    try:
-                        volume = int(raw_volume)
-                    except (ValueError, OverflowError):
-                        volume = None
-                else:
-                    volume = None
-                
-                close_ann = last_trading_day['Close'] if pd.notna(last_trading_day['Close']) else None
-            
-            if next_trading_day is not None:
-                open_next = next_trading_day['Open'] if pd.notna(next_trading_day['Open']) else None
-    except Exception:
-        volume = None
-        close_ann = None
-        open_next = None
-    
-    # Gap calculation for After Market Hours and Weekend
-    gap_check = ''
-    gap_pct = ''
-    
+OHLCV_DATA_DIR = "eod2/src/eod2_data/daily"
+
+def announcement_moves(df, after=False, by_code=True):
+    """
+    The pre/post-earnings moves of the announcements of `df`, one per (security, date), computed
+    in one batch from the OHLCV store (see `compute_post_earnings_moves()`).
+
+    :param after: day 0 is the first trading day after the announcement date (weekend section).
+    :param by_code: also look the bars up by scrip code, when there are none for the security id.
+    :return: `events` (`Security Id`, `SCRIP_CD`, `Announcement Date`) and their `moves`, row by row.
+    """
+    codes = df['SCRIP_CD'] if 'SCRIP_CD' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    security_ids = [scrip_to_securityid.get(code, code) for code in codes]
+    security_ids = [symbol_aliases.get(str(sid).upper(), sid) for sid in security_ids]
+    dt_tm = df['DT_TM'] if 'DT_TM' in df.columns else pd.Series(pd.NaT, index=df.index)
+    events = pd.DataFrame({
+        'Security Id': security_ids,
+        'SCRIP_CD': codes.to_numpy(),
+        'Announcement Date': pd.to_datetime(dt_tm, errors='coerce').dt.date.to_numpy(),
+    }).drop_duplicates(['Security Id', 'Announcement Date']).reset_index(drop=True)
+    candidates = list(zip(events['Security Id'], events['SCRIP_CD'])) if by_code \
+        else [(sid,) for sid in events['Security Id']]
+    moves = compute_post_earnings_moves(get_ohlcv_store(OHLCV_DATA_DIR), candidates,
+                                        events['Announcement Date'], after=after)
+    return events, moves
+
+def _round_or_na(value):
+    return round(float(value), 2) if pd.notna(value) else 'N/A'
+
+def _format_move(move, days, n):
+    # "12.3 (17d)" when there were fewer than n days after day 0
+    if pd.isna(move):
+        return 'N/A'
+    if pd.notna(days) and days != n:
+        return f"{round(float(move), 2)} ({int(days)}d)"
+    return round(float(move), 2)
+
+def format_move_row(event, move, section_key):
+    """The row of an announcement in the post-earnings moves table of a section"""
+    volume = move['Volume']
+    gap_cols = {}
     if section_key in ["after", "weekend"]:
-        try:
-            if close_ann is not None and open_next is not None and close_ann != 0:
-                # Calculate absolute gap percentage
-                gap_pct = round((open_next - close_ann) / close_ann * 100, 2)
-                # Consider a significant gap if > 0.5%
-                gap_check = '✔️' if abs(gap_pct) > 0.5 else '❌'
-            else:
-                gap_check = '❌'
-                gap_pct = 'N/A'
-        except Exception:
-            gap_check = '❌'
-            gap_pct = 'N/A'
-    
+        # Consider a significant gap if > 0.5%
+        if pd.notna(move['Gap %']):
+            gap_pct = round(float(move['Gap %']), 2)
+            gap_cols = {'Gap?': '✔️' if abs(gap_pct) > 0.5 else '❌', 'Gap %': gap_pct}
+        else:
+            gap_cols = {'Gap?': '❌', 'Gap %': 'N/A'}
     return {
-        'Security Id': security_id,
-        'Announcement Date': ann_date,
-        'Volume': volume,
-        'Pre 10d %': round(pre_10, 2) if pre_10 is not None else 'N/A',
-        'Pre 20d %': round(pre_20, 2) if pre_20 is not None else 'N/A',
-        'Move 30d %': f"{round(move_30, 2)} ({days_30}d)" if move_30 is not None and days_30 is not None and days_30 != 30 else (round(move_30, 2) if move_30 is not None else 'N/A'),
-        'Move 60d %': f"{round(move_60, 2)} ({days_60}d)" if move_60 is not None and days_60 is not None and days_60 != 60 else (round(move_60, 2) if move_60 is not None else 'N/A'),
-        'Peak Move %': round(peak_move, 2) if peak_move is not None else 'N/A',
-        **({'Gap?': gap_check, 'Gap %': gap_pct} if section_key in ["after", "weekend"] else {})
+        'Security Id': event['Security Id'],
+        'Announcement Date': event['Announcement Date'],
+        'Volume': int(volume) if pd.notna(volume) and volume >= 0 else None,
+        'Pre 10d %': _round_or_na(move['Pre 10d %']),
+        'Pre 20d %': _round_or_na(move['Pre 20d %']),
+        'Move 30d %': _format_move(move['Move 30d %'], move['Days 30'], 30),
+        'Move 60d %': _format_move(move['Move 60d %'], move['Days 60'], 60),
+        'Peak Move %': _round_or_na(move['Peak Move %']),
+        **gap_cols
     }
 
 def show_post_earnings_moves(df, section_key):
@@ -398,29 +280,14 @@ def show_post_earnings_moves(df, section_key):
     if show_moves:
         move_results = []
         copyable_symbols = set()
-        seen = set()
-        missing_ohlcv = []  # Track missing OHLCV data
-        tasks = []
-        data_dir = "eod2/src/eod2_data/daily"
-        for _, row in df.iterrows():
-            code = row.get('SCRIP_CD')
-            security_id = scrip_to_securityid.get(code, code)
-            security_id = symbol_aliases.get(str(security_id).upper(), security_id)
-            ann_date = pd.to_datetime(row.get('DT_TM')).date() if row.get('DT_TM') else None
-            key = (security_id, ann_date)
-            if key in seen:
-                continue
-            seen.add(key)
-            csv_path = find_ohlcv_csv(code, security_id, data_dir)
-            if not csv_path:
-                # Convert security_id to string before adding to missing_ohlcv
-                missing_ohlcv.append(str(security_id))
-                continue
-            # Pass the original section_key but treat weekend same as after for processing
-            tasks.append((row, section_key))
-        # Parallel processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            results = list(executor.map(process_announcement_row, tasks))
+        # Weekend announcements: the moves from the next trading day
+        events, moves = announcement_moves(df, after=(section_key == "weekend"))
+        # Track missing OHLCV data
+        missing_ohlcv = [str(sid) for sid in events.loc[moves['Symbol'].isna(), 'Security Id']]
+        # Other sections: only the announcements made on a trading day
+        valid = moves['Day 0'].notna() & (moves['Trading Day'] | (section_key == "weekend"))
+        results = [format_move_row(event, move, section_key)
+                   for (_, event), (_, move) in zip(events[valid].iterrows(), moves[valid].iterrows())]
         # Always include calculation columns, even if values are 'N/A'
         calculation_cols = ['Security Id', 'Announcement Date', 'Volume', 'Pre 10d %', 'Pre 20d %', 'Move 30d %', 'Move 60d %', 'Peak Move %', 'Gap?', 'Gap %']
         move_results_full = []
@@ -500,6 +367,17 @@ if filters_changed:
 if st.button("Fetch Announcements", type="primary", disabled=not fetch_enabled):
     st.session_state['fetch_announcements'] = True
 
+# Live mode: when the range ends today, each refresh only polls for the new filings
+live_available = to_date is not None and to_date == today.date()
+live = st.checkbox(
+    f"⚡ Live updates (every {LIVE_REFRESH_SECONDS}s)",
+    value=False,
+    disabled=not live_available,
+    help="Only available when the To Date is today"
+) and live_available
+if live and st.session_state['fetch_announcements']:
+    st_autorefresh(interval=LIVE_REFRESH_SECONDS * 1000, key="bse_live_refresh")
+
 if st.session_state['fetch_announcements']:
     try:
         with st.spinner("Fetching all announcements from BSE API (all pages)..."):
@@ -509,33 +387,19 @@ if st.session_state['fetch_announcements']:
                 to_date=to_date_str,
                 category=category,
                 scrip=security_name,
-                subcategory="-1"
+                subcategory="-1",
+                live=live
             )
             
             if not df.empty:
                 # --- Aggregate all symbols with calculated move % from all sections ---
-                data_dir = "eod2/src/eod2_data/daily"
                 all_move_symbols = dict()  # symbol -> (move_30, move_60)
-                seen = set()
-                for section in ["During Market Hours", "After Hours", "Weekend"]:
-                    section_df = df[df['Time_Classification'] == section]
-                    for _, row in section_df.iterrows():
-                        code = row.get('SCRIP_CD')
-                        security_id = scrip_to_securityid.get(code, code)
-                        security_id = symbol_aliases.get(str(security_id).upper(), security_id)
-                        sec_id_clean = str(security_id).strip().lower()
-                        csv_path = os.path.join(data_dir, f"{sec_id_clean}.csv")
-                        alt_csv_path = os.path.join(data_dir, f"{sec_id_clean.replace(' ', '')}.csv")
-                        if not os.path.exists(csv_path) and not os.path.exists(alt_csv_path):
-                            continue
-                        ann_date = pd.to_datetime(row.get('DT_TM')).date() if row.get('DT_TM') else None
-                        key = (security_id, ann_date)
-                        if key in seen:
-                            continue
-                        seen.add(key)
-                        pre_10, pre_20, move_30, move_60, days_30, days_60, peak_move = calc_post_earnings_move(security_id, ann_date)
-                        if (move_30 is not None) or (move_60 is not None):
-                            all_move_symbols[security_id] = (move_30, move_60)
+                sections = ["During Market Hours", "After Hours", "Weekend"]
+                section_df = pd.concat([df[df['Time_Classification'] == section] for section in sections])
+                events, moves = announcement_moves(section_df, by_code=False)
+                for sec_id, m30, m60 in zip(events['Security Id'], moves['Move 30d %'], moves['Move 60d %']):
+                    if pd.notna(m30) or pd.notna(m60):
+                        all_move_symbols[sec_id] = (m30 if pd.notna(m30) else None, m60 if pd.notna(m60) else None)
                 if all_move_symbols:
                     # Reference expander for detailed move %
                     with st.expander("Symbols with calculated move % (reference)", expanded=False):
@@ -650,7 +514,7 @@ if st.session_state['fetch_announcements']:
                             st.markdown("## 📅 Results on Weekends (Saturday/Sunday)")
                             temp_df = weekend_df.copy()
                             temp_df['Security Id'] = temp_df['SCRIP_CD'].apply(lambda x: scrip_to_securityid.get(x, x))
-                            show_moves = show_post_earnings_moves(temp_df, "weekend")  # Keep weekend key but use after logic in process_announcement_row
+                            show_moves = show_post_earnings_moves(temp_df, "weekend")  # Keep weekend key: day 0 is the next trading day
                             temp_df['PDF Link'] = temp_df.apply(get_pdf_link, axis=1)
                             temp_df['DT_TM'] = temp_df['DT_TM'].dt.strftime('%d-%m-%Y %I:%M:%S %p')
                             with st.expander("Show all results table", expanded=False):
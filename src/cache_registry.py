@@ -0,0 +1,311 @@
+"""
+A process-wide registry for the DataFrames the app keeps in memory, with a global byte budget.
+
+`st.cache_data` pickles its return value and hands every caller its own copy, and the pages then
+keep another copy per session in `st.session_state`, so the same price bands (or scan results)
+end up in memory once per open session, with nothing bounding the total. The registry instead:
+
+- keeps a single instance of each cached value, shared by all the sessions (the DataFrames are
+  handed out as copies, which only share the data with the cached one under copy-on-write, see
+  `enable_copy_on_write()`);
+- measures the deep size of every entry, and evicts the least recently used entries when the
+  total goes over the budget (`CACHE_BUDGET_MB`, 512 by default);
+- reports the usage of each cache (`usage()`, `render_usage_panel()`).
+
+    >>> from src.cache_registry import get_registry
+    >>> registry = get_registry()
+    >>> @registry.cached('price_bands', ttl=300)
+    ... def fetch_price_bands() -> pd.DataFrame: ...
+    >>> registry.session_put('query_results', df)  # per session, but still under the budget
+    >>> registry.session_get('query_results')  # None once evicted
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MB = 512
+
+
+def deep_sizeof(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    The deep memory footprint of an object in bytes: DataFrames and Series include the contents
+    of their object columns, and containers include (once) the objects they refer to.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    return size
+
+
+def _copy_on_write() -> bool:
+    import pandas as pd
+
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True  # always on
+    try:
+        return pd.get_option('mode.copy_on_write') is True  # i.e. not `'warn'`
+    except KeyError:  # pandas < 2, where the option doesn't exist
+        return False
+
+
+def _share(value: Any) -> Any:
+    # a shallow copy has its own columns/index, so `df['x'] = ...` in one session doesn't show up
+    # in the others, and copy-on-write makes any in-place edit copy the shared data first. Without
+    # it, `df.loc[...] = ...` would write to the shared data, so each session gets its own.
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not _copy_on_write())
+    if type(value) is tuple:  # i.e. `(df, last_update)`
+        return tuple(_share(item) for item in value)
+    return value
+
+
+def enable_copy_on_write() -> None:
+    """
+    Turn on pandas' copy-on-write (a global option, the default from pandas 3), so the registry can
+    hand out the cached DataFrames without copying their data. Meant to be called once, when the
+    app starts: it changes how every DataFrame of the process behaves.
+    """
+    import pandas as pd
+
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return
+    try:
+        pd.set_option('mode.copy_on_write', True)
+    except KeyError:
+        logger.warning('pandas %s has no copy-on-write, cached frames are copied', pd.__version__)
+
+
+def session_id() -> str:
+    """The id of the current Streamlit session (or `default` outside of a Streamlit run)."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return 'default'
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'default'
+
+
+@dataclass
+class _Entry:
+    value: Any
+    nbytes: int
+    expires: float
+
+
+@dataclass
+class CacheStats:
+    entries: int = 0
+    nbytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class CacheRegistry:
+    """
+    The entries of every cache, in a single LRU order, bounded by `budget_bytes` in total.
+
+    :param budget_bytes: the total (deep) size of the entries, past which the least recently
+        used ones are evicted. A single entry larger than the budget isn't kept.
+    :param clock: for the TTLs.
+    """
+
+    def __init__(self, budget_bytes: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.budget_bytes = budget_bytes
+        self.clock = clock
+        self.nbytes = 0
+        self._entries: OrderedDict[Tuple[str, Hashable], _Entry] = OrderedDict()
+        self._stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def _cache_stats(self, cache: str) -> CacheStats:
+        stats = self._stats.get(cache)
+        if stats is None:
+            stats = self._stats[cache] = CacheStats()
+        return stats
+
+    def _drop(self, key: Tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+        stats = self._stats[key[0]]
+        stats.entries -= 1
+        stats.nbytes -= entry.nbytes
+
+    def get(self, cache: str, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            stats = self._cache_stats(cache)
+            entry = self._entries.get((cache, key))
+            if entry is not None and entry.expires <= self.clock():
+                self._drop((cache, key))
+                entry = None
+            if entry is None:
+                stats.misses += 1
+                return default
+            stats.hits += 1
+            self._entries.move_to_end((cache, key))
+            return _share(entry.value)
+
+    def put(self, cache: str, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        """Store a value (replacing the previous one), and return it as `get()` would."""
+        nbytes = deep_sizeof(value)
+        expires = self.clock() + ttl if ttl is not None else float('inf')
+        with self._lock:
+            stats = self._cache_stats(cache)
+            if (cache, key) in self._entries:
+                self._drop((cache, key))
+            if nbytes > self.budget_bytes:
+                logger.warning(
+                    'Not caching %s[%r]: %d bytes is over the budget of %d bytes',
+                    cache, key, nbytes, self.budget_bytes,
+                )  # fmt: skip
+                return _share(value)
+            self._entries[(cache, key)] = _Entry(value, nbytes, expires)
+            self.nbytes += nbytes
+            stats.entries += 1
+            stats.nbytes += nbytes
+            while self.nbytes > self.budget_bytes:
+                lru = next(iter(self._entries))
+                self._drop(lru)
+                self._stats[lru[0]].evictions += 1
+                logger.info('Evicted %s[%r] (cache budget)', *lru)
+        return _share(value)
+
+    def pop(self, cache: str, key: Hashable) -> None:
+        with self._lock:
+            if (cache, key) in self._entries:
+                self._drop((cache, key))
+
+    def clear(self, cache: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if cache is None or k[0] == cache]:
+                self._drop(key)
+
+    # --- shared caches
+
+    def cached(self, cache: str, ttl: Optional[float] = None) -> Callable[[Callable], Callable]:
+        """
+        Decorator that memoizes a function (by its arguments) in the registry, shared by all the
+        sessions. A drop-in replacement for `st.cache_data` on functions that return DataFrames.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            locks: Dict[Hashable, threading.Lock] = {}
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                missing = object()
+                value = self.get(cache, key, missing)
+                if value is not missing:
+                    return value
+                # the sessions that miss at the same time wait for a single call
+                with self._lock:
+                    lock = locks.setdefault(key, threading.Lock())
+                with lock:
+                    try:
+                        value = self.get(cache, key, missing)
+                        if value is missing:
+                            value = self.put(cache, key, func(*args, **kwargs), ttl)
+                    finally:
+                        # the waiters already hold the lock (and find the value), so it's only
+                        # needed until the first fill: don't keep one per key ever called
+                        with self._lock:
+                            if locks.get(key) is lock:
+                                del locks[key]
+                return value
+
+            wrapper.clear = lambda: self.clear(cache)  # type: ignore
+            return wrapper
+
+        return decorator
+
+    # --- per-session values
+
+    def session_put(self, cache: str, value: Any, ttl: Optional[float] = None) -> Any:
+        """Store a value of the current session (i.e. its scan results) under the budget."""
+        return self.put(cache, session_id(), value, ttl)
+
+    def session_get(self, cache: str, default: Any = None) -> Any:
+        return self.get(cache, session_id(), default)
+
+    # --- reporting
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """The usage of each cache, the largest first."""
+        with self._lock:
+            rows = [{'cache': name, **vars(stats)} for name, stats in self._stats.items()]
+        return sorted(rows, key=lambda row: row['nbytes'], reverse=True)
+
+    def __repr__(self) -> str:
+        return (
+            f'< CacheRegistry({self.nbytes / 1e6:.1f} of {self.budget_bytes / 1e6:.1f} MB, '
+            f'{len(self._entries)} entries) >'
+        )
+
+
+_registry: Optional[CacheRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> CacheRegistry:
+    """
+    The process-wide `CacheRegistry`, with a budget of `CACHE_BUDGET_MB` (512 MB by default).
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                budget = float(os.environ.get('CACHE_BUDGET_MB', DEFAULT_BUDGET_MB))
+                _registry = CacheRegistry(int(budget * 1e6))
+    return _registry
+
+
+def render_usage_panel() -> None:
+    """Show the usage of each cache, with the performance debug panel (`PERF_DEBUG=1`)."""
+    from src.performance_monitor import is_debug_enabled
+
+    if not is_debug_enabled():
+        return
+    import pandas as pd
+    import streamlit as st
+
+    registry = get_registry()
+    with st.expander(f'🧠 Cache memory: {registry.nbytes / 1e6:.1f} MB', expanded=False):
+        rows = registry.usage()
+        if not rows:
+            st.caption('Nothing cached yet.')
+            return
+        df = pd.DataFrame(rows)
+        df['MB'] = df.pop('nbytes') / 1e6
+        st.caption(f'Budget: {registry.budget_bytes / 1e6:.0f} MB')
+        st.dataframe(df, hide_index=True, use_container_width=True)
@@ -0,0 +1,368 @@
+"""
+Hot-path instrumentation of the app: where the time of a page goes.
+
+Every timed block is a *stage* (`scan`, `http`, `decode`, `dataframe`, `filter`, `figure`,
+`render`...) of a *page*, and records its wall time, CPU time (of the calling thread) and the bytes
+it handled. The samples are aggregated in memory (the last `max_samples` per page and stage, for
+the percentiles), and optionally appended to a JSONL file (`PERF_JSONL=/path/to/perf.jsonl`).
+
+    >>> from src.performance_monitor import stage, track_performance, set_page
+    >>> set_page('Custom Scanner')
+    >>> with stage('http') as span:
+    ...     r = transport.post(url, data=body)
+    ...     span.nbytes = len(r.content)
+    >>> @track_performance(stage='figure')
+    ... def build_heatmap(df): ...
+
+`serve_metrics()` exposes the aggregates in the Prometheus text format on a local port (started by
+the app when `PERF_METRICS_PORT` is set, see `serve_metrics_from_env()`), and
+`render_debug_panel()` shows the slowest stages of a page in Streamlit, only when it's enabled
+(`PERF_DEBUG=1`, or `?perf_debug=1` in the URL).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('scan', 'http', 'decode', 'dataframe', 'filter', 'figure', 'render')
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+_page: contextvars.ContextVar[str] = contextvars.ContextVar('page', default='app')
+
+
+def set_page(name: str) -> None:
+    """Set the page the stages of the current thread (and its context) are recorded under."""
+    _page.set(name)
+
+
+def current_page() -> str:
+    return _page.get()
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # nearest-rank, on an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+@dataclass
+class Span:
+    """A running stage; set `nbytes` to the size of the payload it handled."""
+
+    page: str
+    stage: str
+    nbytes: int = 0
+
+
+@dataclass
+class StageStats:
+    """The aggregates of a stage of a page (the samples are the wall times, in seconds)."""
+
+    page: str
+    stage: str
+    count: int = 0
+    wall_total: float = 0.0
+    cpu_total: float = 0.0
+    bytes_total: int = 0
+    wall_max: float = 0.0
+    samples: deque = field(default_factory=deque)
+
+    def add(self, wall: float, cpu: float, nbytes: int) -> None:
+        self.count += 1
+        self.wall_total += wall
+        self.cpu_total += cpu
+        self.bytes_total += nbytes
+        self.wall_max = max(self.wall_max, wall)
+        self.samples.append(wall)
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.samples)
+        return {q: _percentile(ordered, q) for q in QUANTILES}
+
+    def summary(self) -> Dict[str, Any]:
+        quantiles = self.quantiles()
+        return {
+            'page': self.page,
+            'stage': self.stage,
+            'count': self.count,
+            'p50_ms': quantiles[0.5] * 1000,
+            'p90_ms': quantiles[0.9] * 1000,
+            'p95_ms': quantiles[0.95] * 1000,
+            'p99_ms': quantiles[0.99] * 1000,
+            'max_ms': self.wall_max * 1000,
+            'mean_ms': self.wall_total / self.count * 1000 if self.count else 0.0,
+            'cpu_ms': self.cpu_total / self.count * 1000 if self.count else 0.0,
+            'bytes': self.bytes_total,
+        }
+
+
+class PerformanceMonitor:
+    """
+    The in-memory aggregates of every stage, shared by all the sessions (threads) of the process.
+
+    :param max_samples: the number of recent samples kept per page and stage, for the percentiles.
+    :param jsonl_path: if given, every sample is also appended to this file as a JSON line.
+    """
+
+    def __init__(self, max_samples: int = 1024, jsonl_path: Optional[str] = None) -> None:
+        self.max_samples = max_samples
+        self.jsonl_path = jsonl_path
+        self._stats: Dict[Tuple[str, str], StageStats] = {}
+        self._lock = threading.Lock()
+        self._jsonl_lock = threading.Lock()
+
+    def record(
+        self, stage: str, wall: float, cpu: float = 0.0, nbytes: int = 0, page: Optional[str] = None
+    ) -> None:
+        page = page or current_page()
+        key = (page, stage)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = StageStats(page, stage, samples=deque(maxlen=self.max_samples))
+                self._stats[key] = stats
+            stats.add(wall, cpu, nbytes)
+        if self.jsonl_path:
+            self._append_jsonl(
+                {'ts': time.time(), 'page': page, 'stage': stage, 'wall': wall, 'cpu': cpu,
+                 'bytes': nbytes}  # fmt: skip
+            )
+
+    def _append_jsonl(self, sample: Dict[str, Any]) -> None:
+        path = self.jsonl_path
+        try:
+            with self._jsonl_lock, open(path, 'a', encoding='utf-8') as f:  # type: ignore
+                f.write(json.dumps(sample) + '\n')
+        except OSError:
+            logger.exception('Failed to append to %s', path)
+            self.jsonl_path = None  # don't fail (and log) on every sample
+
+    @contextmanager
+    def stage(self, name: str, nbytes: int = 0, page: Optional[str] = None) -> Iterator[Span]:
+        """Time a block as the stage `name` of the current page."""
+        span = Span(page or current_page(), name, nbytes)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            self.record(
+                span.stage,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+                span.nbytes,
+                span.page,
+            )
+
+    def summary(self, page: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The aggregates of every stage (of a page), the slowest (by p95) first."""
+        with self._lock:
+            stats = [s for s in self._stats.values() if page is None or s.page == page]
+            rows = [s.summary() for s in stats]
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def slowest(self, page: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.summary(page)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(self) -> str:
+        """The aggregates in the Prometheus text exposition format."""
+
+        def labels(row: Dict[str, Any], **extra: Any) -> str:
+            pairs = {'page': row['page'], 'stage': row['stage'], **extra}
+            return ','.join(f'{k}="{_escape_label(str(v))}"' for k, v in pairs.items())
+
+        lines = [
+            '# HELP app_stage_seconds Wall time of the stages of the app pages.',
+            '# TYPE app_stage_seconds summary',
+        ]
+        with self._lock:
+            stats = list(self._stats.values())
+            rows = [(s.summary(), s.quantiles(), s.wall_total, s.cpu_total) for s in stats]
+        for row, quantiles, wall_total, _ in rows:
+            for q, value in quantiles.items():
+                lines.append(f'app_stage_seconds{{{labels(row, quantile=q)}}} {value:.6f}')
+            lines.append(f'app_stage_seconds_sum{{{labels(row)}}} {wall_total:.6f}')
+            lines.append(f'app_stage_seconds_count{{{labels(row)}}} {row["count"]}')
+        lines += [
+            '# HELP app_stage_cpu_seconds_total CPU time (of the calling thread) of the stages.',
+            '# TYPE app_stage_cpu_seconds_total counter',
+        ]
+        for row, _, _, cpu_total in rows:
+            lines.append(f'app_stage_cpu_seconds_total{{{labels(row)}}} {cpu_total:.6f}')
+        lines += [
+            '# HELP app_stage_bytes_total Bytes handled by the stages.',
+            '# TYPE app_stage_bytes_total counter',
+        ]
+        for row, _, _, _ in rows:
+            lines.append(f'app_stage_bytes_total{{{labels(row)}}} {row["bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_monitor: Optional[PerformanceMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor() -> PerformanceMonitor:
+    """The process-wide `PerformanceMonitor` (created lazily, `PERF_JSONL` enables the file)."""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = PerformanceMonitor(jsonl_path=os.environ.get('PERF_JSONL') or None)
+    return _monitor
+
+
+def stage(name: str, nbytes: int = 0, page: Optional[str] = None):
+    """Time a block as a stage of the current page (see `PerformanceMonitor.stage()`)."""
+    return get_monitor().stage(name, nbytes, page)
+
+
+def track_performance(
+    func: Optional[Callable] = None, *, stage: str = 'render', page: Optional[str] = None
+) -> Any:
+    """
+    Decorator that times every call of a function as a stage. Used bare (`@track_performance`) it
+    times the whole function as the `render` stage, and (with `page`) it sets the page that the
+    nested stages are recorded under.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if page is not None:
+                set_page(page)
+            with get_monitor().stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+# --- export
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    monitor: PerformanceMonitor
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] == '/metrics':
+            body = self.monitor.to_prometheus().encode()
+            content_type = 'text/plain; version=0.0.4'
+        elif self.path.split('?')[0] == '/stats.jsonl':
+            body = ''.join(json.dumps(row) + '\n' for row in self.monitor.summary()).encode()
+            content_type = 'application/x-ndjson'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def serve_metrics(
+    port: int = 9464, host: str = '127.0.0.1', monitor: Optional[PerformanceMonitor] = None
+) -> ThreadingHTTPServer:
+    """
+    Serve `/metrics` (Prometheus text) and `/stats.jsonl` (one summary row per stage) from a
+    daemon thread. Calling it again returns the running server, so it's safe on every rerun.
+    """
+    global _server
+    monitor = monitor or get_monitor()  # before taking the lock, `get_monitor()` takes it too
+    with _monitor_lock:
+        if _server is None:
+            handler = type('MetricsHandler', (_MetricsHandler,), {})
+            handler.monitor = monitor  # type: ignore
+            _server = ThreadingHTTPServer((host, port), handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def serve_metrics_from_env() -> Optional[ThreadingHTTPServer]:
+    """
+    `serve_metrics()` on the port of `PERF_METRICS_PORT` (and the host of `PERF_METRICS_HOST`,
+    `127.0.0.1` by default), or nothing when it isn't set. Meant to be called when the app starts.
+    """
+    port = os.environ.get('PERF_METRICS_PORT')
+    if not port:
+        return None
+    try:
+        return serve_metrics(int(port), host=os.environ.get('PERF_METRICS_HOST', '127.0.0.1'))
+    except (ValueError, OSError):
+        # i.e. the port is already taken by another process, the app itself doesn't need it
+        logger.exception('Failed to serve the metrics on PERF_METRICS_PORT=%s', port)
+        return None
+
+
+# --- Streamlit
+
+
+def is_debug_enabled() -> bool:
+    if os.environ.get('PERF_DEBUG', '').lower() in ('1', 'true', 'yes'):
+        return True
+    try:
+        import streamlit as st
+
+        return st.query_params.get('perf_debug', '') in ('1', 'true')
+    except Exception:
+        return False
+
+
+def render_debug_panel(page: Optional[str] = None, limit: int = 10) -> None:
+    """
+    Show the slowest stages of a page (the current one by default) in an expander, only when the
+    debug mode is enabled (`PERF_DEBUG=1` or `?perf_debug=1`).
+    """
+    if not is_debug_enabled():
+        return
+    import pandas as pd
+    import streamlit as st
+
+    page = page or current_page()
+    rows = get_monitor().slowest(page, limit)
+    with st.expander(f'⏱️ Performance: {page}', expanded=False):
+        if not rows:
+            st.caption('No stages recorded yet.')
+            return
+        df = pd.DataFrame(rows).drop(columns=['page'])
+        st.dataframe(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                col: st.column_config.NumberColumn(col, format='%.1f')
+                for col in df.columns
+                if col.endswith('_ms')
+            },
+        )
@@ -0,0 +1,263 @@
+"""
+The NSE price bands (symbol → band), loaded from the Google Sheet once per TTL and shared by every
+page and session.
+
+The table is read-only and indexed by symbol, so the pages look up bands in O(1) and join them to
+the scanner results with a single hash lookup per row, instead of keeping their own copy of the
+sheet in `st.session_state` and merging it on every rerun.
+
+    >>> from src.price_bands import get_price_bands
+    >>> bands = get_price_bands()
+    >>> bands.band('NSE:SUZLON')  # NaN for the symbols without a band
+    5.0
+    >>> df['Price Band'] = bands.labels(bands.lookup(df['name']))
+    >>> query.where(Column('name').isin(bands.symbols([5, 10], no_band=True)))
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.cache_registry import CacheRegistry
+
+logger = logging.getLogger(__name__)
+
+PRICE_BANDS_URL = (
+    'https://docs.google.com/spreadsheets/d/1xig6-dQ8PuPdeCxozcYdm15nOFUKMMZFm_p8VvRFDaE'
+    '/gviz/tq?tqx=out:csv&gid=364491472'
+)
+PRICE_BANDS_TTL = 6 * 60 * 60
+COLUMNS = ['Symbol', 'Series', 'Security Name', 'Band']
+NO_BAND = 'No Band'
+
+
+def _normalize(symbols: Any) -> np.ndarray:
+    # `NSE:RELIANCE`, ` reliance ` -> `RELIANCE`
+    import pandas as pd
+
+    values = pd.Series(np.asarray(symbols, dtype=object), dtype=object).astype(str)
+    return values.str.strip().str.upper().str.removeprefix('NSE:').to_numpy(dtype=object)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class PriceBandTable:
+    """
+    An immutable symbol → band table. The bands are floats (5, 10, 20...), NaN for the symbols
+    without a band.
+
+    :param frame: the sheet, with (at least) the `Symbol` and `Band` columns.
+    :param last_update: when it was downloaded.
+    """
+
+    def __init__(self, frame: pd.DataFrame, last_update: Optional[str] = None) -> None:
+        import pandas as pd
+
+        frame = frame.reset_index(drop=True)
+        frame['Symbol'] = _normalize(frame['Symbol'])
+        frame['Band'] = pd.to_numeric(frame['Band'], errors='coerce')
+        frame = frame.drop_duplicates('Symbol', keep='first').reset_index(drop=True)
+
+        self.last_update = last_update or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.loaded_at = time.monotonic()
+        frame['Last Updated'] = self.last_update
+        self._frame = frame
+        self._index = pd.Index(frame['Symbol'].to_numpy(dtype=object))
+        self._bands = _read_only(frame['Band'].to_numpy(dtype=float, copy=True))
+        self._by_symbol: Dict[str, float] = dict(zip(self._index, self._bands.tolist()))
+        # the symbols of each band, for the server-side `isin()` filters
+        groups = frame.groupby(frame['Band'].fillna(-1), sort=True)['Symbol']
+        self._symbols: Dict[float, Tuple[str, ...]] = {
+            (np.nan if band == -1 else float(band)): tuple(symbols)
+            for band, symbols in groups
+        }
+
+    @classmethod
+    def from_csv(cls, source: Union[str, io.IOBase] = PRICE_BANDS_URL) -> PriceBandTable:
+        import pandas as pd
+
+        df = pd.read_csv(source)
+        missing = set(COLUMNS) - set(df.columns)
+        if missing:
+            raise ValueError(f'The price bands sheet has no {sorted(missing)} columns')
+        return cls(df[COLUMNS])
+
+    @classmethod
+    def empty(cls) -> PriceBandTable:
+        import pandas as pd
+
+        return cls(pd.DataFrame(columns=COLUMNS))
+
+    # --- lookups
+
+    def __len__(self) -> int:
+        return len(self._bands)
+
+    def __contains__(self, symbol: object) -> bool:
+        return isinstance(symbol, str) and self._key(symbol) in self._by_symbol
+
+    def _key(self, symbol: str) -> str:
+        if symbol in self._by_symbol:
+            return symbol
+        return _normalize([symbol])[0]
+
+    def band(self, symbol: str, default: float = np.nan) -> float:
+        """The band of a symbol (NaN if it has none), or `default` if it isn't in the sheet."""
+        return self._by_symbol.get(self._key(symbol), default)
+
+    def _positions(self, symbols: Any) -> np.ndarray:
+        values = np.asarray(symbols, dtype=object)
+        positions = self._index.get_indexer(values)
+        missing = positions < 0
+        if missing.any():  # i.e. `NSE:` prefixed or lowercase symbols
+            positions[missing] = self._index.get_indexer(_normalize(values[missing]))
+        return positions
+
+    def lookup(self, symbols: Any) -> np.ndarray:
+        """The bands of many symbols at once (NaN for those without a band or not in the sheet)."""
+        positions = self._positions(symbols)
+        if not len(self._bands):
+            return np.full(len(positions), np.nan)
+        bands = self._bands.take(np.maximum(positions, 0))
+        bands[positions < 0] = np.nan
+        return bands
+
+    def contains(self, symbols: Any) -> np.ndarray:
+        """Whether each symbol is in the sheet (with or without a band)."""
+        return self._positions(symbols) >= 0
+
+    def mask(self, symbols: Any, bands: Iterable[float], no_band: bool = False) -> np.ndarray:
+        """Whether each symbol is in one of `bands` (or, with `no_band`, in the sheet without one)."""
+        positions = self._positions(symbols)
+        values = self._bands.take(np.maximum(positions, 0)) if len(self._bands) else positions * 0.0
+        selected = np.isin(values, list(bands))
+        if no_band:
+            selected |= np.isnan(values)
+        return selected & (positions >= 0)
+
+    def symbols(self, bands: Optional[Iterable[float]] = None, no_band: bool = False) -> List[str]:
+        """The symbols in `bands` (all of them by default), and those without a band if `no_band`."""
+        if bands is None:
+            return self._index.tolist()
+        out: List[str] = []
+        for band in bands:
+            out.extend(self._symbols.get(float(band), ()))
+        if no_band:
+            out.extend(self._symbols.get(np.nan, ()))
+        return out
+
+    @property
+    def band_values(self) -> List[float]:
+        """The bands in the sheet, smallest first (without NaN)."""
+        return [band for band in self._symbols if not np.isnan(band)]
+
+    def count(self, band: float) -> int:
+        return len(self._symbols.get(np.nan if np.isnan(band) else float(band), ()))
+
+    @staticmethod
+    def labels(bands: Sequence[float]) -> np.ndarray:
+        """`5.0` -> `5%`, NaN -> `No Band`."""
+        bands = np.asarray(bands, dtype=float)
+        out = np.full(len(bands), NO_BAND, dtype=object)
+        has_band = ~np.isnan(bands)
+        out[has_band] = [f'{int(band)}%' for band in bands[has_band]]
+        return out
+
+    def join(
+        self, df: pd.DataFrame, on: str, column: str = 'Price Band', labels: bool = True
+    ) -> pd.DataFrame:
+        """
+        A copy of `df` with the band of its `on` symbols in `column` (as `5%`/`No Band` labels, or
+        the raw floats). A hash lookup per row, rather than a `merge()` with the whole sheet.
+        """
+        bands = self.lookup(df[on].to_numpy())
+        df = df.copy(deep=False)
+        df[column] = self.labels(bands) if labels else bands
+        return df
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The sheet (`Symbol`, `Series`, `Security Name`, `Band`, `Last Updated`)."""
+        # its own columns, so a page adding one doesn't change the shared table
+        return self._frame.copy(deep=False)
+
+    def __sizeof__(self) -> int:
+        # for the cache budget (`deep_sizeof()`): the symbols are shared by the frame, index and dicts
+        return (
+            object.__sizeof__(self)
+            + int(self._frame.memory_usage(deep=True, index=True).sum())
+            + int(self._index.memory_usage(deep=False))
+            + sys.getsizeof(self._by_symbol)
+            + sum(sys.getsizeof(symbols) for symbols in self._symbols.values())
+        )
+
+    def __repr__(self) -> str:
+        return f'< PriceBandTable({len(self)} symbols, updated {self.last_update}) >'
+
+
+_load_lock = threading.Lock()
+
+
+def get_price_bands(
+    refresh: bool = False, registry: Optional[CacheRegistry] = None
+) -> PriceBandTable:
+    """
+    The shared `PriceBandTable`, downloaded at most once per `PRICE_BANDS_TTL` (or on `refresh`),
+    for all the sessions. If the download fails the previous table is kept; with no
+    previous table, the error is raised.
+
+    :param registry: where the table is kept, `get_registry()` by default.
+    """
+    if registry is None:
+        from src.cache_registry import get_registry
+
+        registry = get_registry()
+    table = registry.get('price_bands', 'table')
+    if not refresh and table is not None and _is_fresh(table):
+        return table
+    with _load_lock:
+        latest = registry.get('price_bands', 'table')
+        if latest is not table and latest is not None and _is_fresh(latest):
+            return latest  # downloaded by another session in the meantime
+        try:
+            table = PriceBandTable.from_csv(PRICE_BANDS_URL)
+        except Exception:
+            if latest is None:
+                raise
+            logger.exception('Failed to refresh the price bands, keeping the previous ones')
+            return latest
+        # no TTL in the registry: a stale table is still served if the next download fails
+        return registry.put('price_bands', 'table', table)
+
+
+def _is_fresh(table: PriceBandTable) -> bool:
+    return time.monotonic() - table.loaded_at < PRICE_BANDS_TTL
+
+
+def fetch_price_bands(refresh: bool = False) -> Tuple[pd.DataFrame, str]:
+    """
+    `(frame, last_update)` of the shared table, for the pages that show the whole sheet. On
+    failure, shows the error and returns an empty frame.
+    """
+    try:
+        table = get_price_bands(refresh)
+    except Exception as e:
+        import streamlit as st
+
+        st.error(f'Error fetching price bands: {e}')
+        table = PriceBandTable.empty()
+    return table.frame, table.last_update
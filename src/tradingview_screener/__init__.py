@@ -6,3 +6,15 @@ from __future__ import annotations
 
 from tradingview_screener.column import Column, col
 from tradingview_screener.query import Query, And, Or
+from tradingview_screener.nodes import FilterNode
+from tradingview_screener.transport import Transport, get_default_transport, set_default_transport
+from tradingview_screener.aio import gather_scans
+from tradingview_screener.decoder import decode_scanner_data
+from tradingview_screener.cache import ScanCache, get_default_cache
+from tradingview_screener.singleflight import SingleFlight
+from tradingview_screener.ratelimit import RateLimiter, TokenBucket, get_default_rate_limiter
+from tradingview_screener.local import UnsupportedOperationError, scan_local
+from tradingview_screener.snapshot import UniverseSnapshot, get_universe_snapshot
+from tradingview_screener.batch import QueryBatch
+from tradingview_screener.delta import DeltaQuery, ScanDelta
+from tradingview_screener.catalog import Field, FieldCatalog, FieldSchema, get_field_catalog
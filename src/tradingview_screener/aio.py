@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+__all__ = ['gather_scans']
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterable, Optional, Union
+    import pandas as pd
+    from tradingview_screener.query import Query
+
+
+async def gather_scans(
+    queries: Iterable[Query],
+    max_concurrency: int = 8,
+    timeout: Optional[float] = 20,
+    return_exceptions: bool = False,
+    **kwargs,
+) -> list[Union[tuple[int, pd.DataFrame], BaseException]]:
+    """
+    Run many queries concurrently and return their results in the same order as `queries`.
+
+    At most `max_concurrency` requests are in flight at any moment, and each one of them is
+    bounded by `timeout` seconds (which is also forwarded to `requests.post()` so the worker
+    thread doesn't outlive the request). The wall-clock time of a multi-scan page drops from the
+    sum of the latencies to roughly the slowest one.
+
+    Examples:
+
+    >>> import asyncio
+    >>> queries = [
+    ...     Query().set_markets('india').where(col('exchange') == exchange).limit(20000)
+    ...     for exchange in ('NSE', 'BSE')
+    ... ]
+    >>> (nse_count, nse_df), (bse_count, bse_df) = asyncio.run(gather_scans(queries))
+
+    :param queries: the `Query` objects to run.
+    :param max_concurrency: maximum number of requests in flight at the same time.
+    :param timeout: timeout in seconds for each request (None to disable).
+    :param return_exceptions: if True, a failed query yields its exception instead of raising.
+    :param kwargs: forwarded to `Query.get_scanner_data()`.
+    :return: a list of `(total_count, dataframe)` tuples (or exceptions), in input order.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f'max_concurrency must be at least 1, got {max_concurrency}')
+    if timeout is not None:
+        kwargs.setdefault('timeout', timeout)
+
+    # use our own pool instead of the loop's default executor, whose size depends on the number
+    # of CPUs and would silently cap the concurrency on small containers
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='gather_scans')
+
+    async def run(query: Query) -> tuple[int, pd.DataFrame]:
+        async with semaphore:
+            future = loop.run_in_executor(
+                executor, functools.partial(query.get_scanner_data, **kwargs)
+            )
+            return await asyncio.wait_for(future, timeout)
+
+    try:
+        return await asyncio.gather(
+            *(run(query) for query in queries), return_exceptions=return_exceptions
+        )
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+__all__ = ['QueryBatch']
+
+from typing import TYPE_CHECKING
+
+from tradingview_screener.local import scan_local
+from tradingview_screener.nodes import to_json
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional
+    import pandas as pd
+    from tradingview_screener.query import Query
+
+
+# the parts of a query that can differ between the members of a batch, everything else (markets,
+# filters, symbols, options, etc.) has to be identical
+_MERGEABLE_KEYS = ('columns', 'sort', 'range')
+
+
+def _batch_key(query: Query) -> str:
+    rest = {k: v for k, v in query.query.items() if k not in _MERGEABLE_KEYS}
+    return to_json([query.url, rest])
+
+
+class QueryBatch:
+    """
+    Merge queries that only differ in their `select()`, `order_by()` and `limit()/offset()` into
+    a single upstream request, and slice the result locally for each of them.
+
+    The queries are grouped by everything else (URL, markets, filters, symbols, options, etc.).
+    Each group sends one request with the union of the columns:
+    - When every query of the group has the same sort, the request uses that sort and the
+      widest range, so each result is just a slice of the rows.
+    - Otherwise the request fetches the whole filtered set (up to `max_rows`), and each query
+      is sorted and sliced with `tradingview_screener.local.scan_local()`. If the filtered set
+      turns out to be bigger than `max_rows`, those queries are sent on their own instead.
+
+    A group with a single query is sent as-is.
+
+    Examples:
+
+    >>> base = Query().set_markets('india').where(col('exchange') == 'NSE')
+    >>> batch = QueryBatch()
+    >>> by_sector = batch.add(base.copy().select('name', 'sector'))
+    >>> top_volume = batch.add(base.copy().select('volume').order_by('volume', ascending=False))
+    >>> results = batch.get_scanner_data()
+    >>> count, df = results[by_sector]
+
+    :param queries: the queries of the batch (more can be added with `add()`).
+    :param max_rows: the maximum number of rows to fetch for a group with different sorts.
+    """
+
+    def __init__(self, queries: Iterable[Query] = (), max_rows: int = 20_000) -> None:
+        self.queries: list[Query] = list(queries)
+        self.max_rows = max_rows
+
+    def add(self, query: Query) -> int:
+        """
+        Add a query to the batch, and return its position in the results.
+        """
+        self.queries.append(query)
+        return len(self.queries) - 1
+
+    def groups(self) -> list[list[int]]:
+        """
+        The positions of the queries that will be merged together, in order of appearance.
+        """
+        groups: dict[str, list[int]] = {}
+        for i, query in enumerate(self.queries):
+            groups.setdefault(_batch_key(query), []).append(i)
+        return list(groups.values())
+
+    def _merge(self, queries: list[Query]) -> tuple[Query, bool]:
+        from tradingview_screener.query import DEFAULT_RANGE
+
+        columns: dict[str, None] = {}
+        sorts = []
+        for query in queries:
+            columns.update(dict.fromkeys(query.query.get('columns', [])))
+            sort = query.query.get('sort')
+            if sort is not None:
+                columns[sort['sortBy']] = None
+            if sort not in sorts:
+                sorts.append(sort)
+
+        merged = queries[0].copy()
+        merged.query['columns'] = list(columns)
+        same_sort = len(sorts) == 1
+        if same_sort:
+            end = max(query.query.get('range', DEFAULT_RANGE)[1] for query in queries)
+        else:
+            merged.query.pop('sort', None)
+            end = self.max_rows
+        merged.query['range'] = [0, end]
+        return merged, same_sort
+
+    def get_scanner_data(
+        self, fetch: Optional[Callable[[Query], tuple[int, pd.DataFrame]]] = None, **kwargs
+    ) -> list[tuple[int, pd.DataFrame]]:
+        """
+        Run the batch, and return the result of each query (in the order they were added), the
+        same as calling `query.get_scanner_data()` on each of them.
+
+        :param fetch: the function that sends a query, defaults to `Query.get_scanner_data()`
+            (i.e. pass `get_default_cache().get_scanner_data` to go through the cache).
+        :param kwargs: kwargs to pass to `get_scanner_data()`.
+        """
+        from tradingview_screener.query import DEFAULT_RANGE
+
+        def send(query: Query) -> tuple[int, pd.DataFrame]:
+            return fetch(query) if fetch is not None else query.get_scanner_data(**kwargs)
+
+        results: list = [None] * len(self.queries)
+        for group in self.groups():
+            queries = [self.queries[i] for i in group]
+            if len(queries) == 1:
+                results[group[0]] = send(queries[0])
+                continue
+
+            merged, same_sort = self._merge(queries)
+            count, df = send(merged)
+            for i, query in zip(group, queries):
+                columns = ['ticker', *query.query.get('columns', [])]
+                if same_sort:
+                    start, end = query.query.get('range', DEFAULT_RANGE)
+                    results[i] = count, df[columns].iloc[start:end].reset_index(drop=True)
+                elif count > len(df):
+                    results[i] = send(query)  # the local copy is incomplete
+                else:
+                    # the filters were already applied upstream, only sort and slice
+                    local = {k: query.query[k] for k in _MERGEABLE_KEYS if k in query.query}
+                    results[i] = count, scan_local(df, local)[1]  # pyright: ignore
+        return results
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def __repr__(self) -> str:
+        return f'< QueryBatch(queries={len(self)}, groups={len(self.groups())}) >'
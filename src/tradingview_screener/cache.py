@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+__all__ = ['ScanCache', 'get_default_cache']
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from tradingview_screener.nodes import to_json
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Mapping, Optional
+    import pandas as pd
+    from tradingview_screener.query import Query
+
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry:
+    __slots__ = ('count', 'df', 'nbytes', 'created', 'ttl')
+
+    def __init__(self, count: int, df: pd.DataFrame, created: float, ttl: float) -> None:
+        self.count = count
+        self.df = df
+        self.nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        self.created = created
+        self.ttl = ttl
+
+
+class ScanCache:
+    """
+    An in-process cache for scanner results, shared by every page and script of the process.
+
+    Entries are keyed on `Query.fingerprint()` (a canonical hash of the query and the URL) and the
+    dtypes of the columns, so two queries built in a different order still share the same entry
+    (and the same request decoded with another schema doesn't), and unlike
+    `st.cache_data`, it doesn't depend on the arguments of the function that runs the scan.
+
+    - Each market can have its own TTL (`market_ttls`), a query on many markets uses the
+      shortest one.
+    - After the TTL, the entry is still served for `stale_ttl` more seconds, while a background
+      thread fetches a fresh copy (stale-while-revalidate).
+    - The total size of the cached DataFrames is bounded by `max_bytes`, the least recently used
+      entries are evicted first.
+
+    Examples:
+
+    >>> cache = ScanCache(ttl=60, market_ttls={'crypto': 10})
+    >>> count, df = cache.get_scanner_data(Query().set_markets('india').limit(20000))
+
+    Or use the process-wide cache:
+    >>> count, df = get_default_cache().get_scanner_data(query)
+
+    :param ttl: seconds after which an entry is stale (unless `market_ttls` says otherwise).
+    :param market_ttls: TTL overrides per market, i.e. `{'crypto': 10, 'india': 60}`.
+    :param stale_ttl: seconds an entry can be served stale while it's being refreshed.
+    :param max_bytes: maximum memory used by the cached DataFrames.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        market_ttls: Optional[Mapping[str, float]] = None,
+        stale_ttl: float = 300,
+        max_bytes: int = 256 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.market_ttls = dict(market_ttls or {})
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.nbytes = 0
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0}
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, query: Query) -> float:
+        ttls = [self.market_ttls.get(market, self.ttl) for market in query.query.get('markets', [])]
+        return min(ttls, default=self.ttl)
+
+    @staticmethod
+    def key(query: Query, **kwargs) -> str:
+        """The cache key of a query: its request (`fingerprint()`) and how it's decoded."""
+        fingerprint = query.fingerprint(**kwargs)
+        if query.dtypes is None:
+            return fingerprint
+        columns = query.query.get('columns', [])
+        dtypes = to_json({column: query.dtypes.get(column) for column in columns})
+        return hashlib.sha256(f'{fingerprint}{dtypes}'.encode()).hexdigest()
+
+    def get_scanner_data(self, query: Query, **kwargs) -> tuple[int, pd.DataFrame]:
+        """
+        Same as `query.get_scanner_data(**kwargs)`, but served from the cache when possible.
+
+        The returned DataFrame is a copy, so the caller is free to modify it.
+        """
+        key = self.key(query, **kwargs)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.created
+                if age < entry.ttl:
+                    self.stats['hits'] += 1
+                    self._entries.move_to_end(key)
+                    return entry.count, entry.df.copy()
+                if age < entry.ttl + self.stale_ttl:
+                    self.stats['stale_hits'] += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, query.copy(), kwargs),
+                            name='ScanCache-refresh',
+                            daemon=True,
+                        ).start()
+                    return entry.count, entry.df.copy()
+            self.stats['misses'] += 1
+
+        count, df = query.get_scanner_data(**kwargs)
+        self._put(key, count, df, self.ttl_for(query))
+        return count, df.copy()
+
+    def _refresh(self, key: str, query: Query, kwargs: Mapping[str, Any]) -> None:
+        try:
+            count, df = query.get_scanner_data(**kwargs)
+            self._put(key, count, df, self.ttl_for(query))
+            with self._lock:
+                self.stats['refreshes'] += 1
+        except Exception:
+            # keep serving the stale entry, the next call after `stale_ttl` will fetch again
+            logger.exception('Failed to refresh the cached scan %s', key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _put(self, key: str, count: int, df: pd.DataFrame, ttl: float) -> None:
+        entry = _CacheEntry(count, df, self.clock(), ttl)
+        with self._lock:
+            self._pop(key)
+            if entry.nbytes > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    def invalidate(self, query: Query, **kwargs) -> None:
+        with self._lock:
+            self._pop(self.key(query, **kwargs))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f'< ScanCache(entries={len(self)}, nbytes={self.nbytes}, stats={self.stats}) >'
+
+
+_default_cache: Optional[ScanCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ScanCache:
+    """
+    Return the process-wide `ScanCache` (created lazily), so that all the pages and scripts
+    running in the same process share their results.
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ScanCache()
+    return _default_cache
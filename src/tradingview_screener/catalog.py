@@ -0,0 +1,546 @@
+from __future__ import annotations
+
+__all__ = [
+    'Field',
+    'FieldCatalog',
+    'FieldSchema',
+    'build_index',
+    'get_field_catalog',
+    'parse_fields_page',
+    'CATALOG_KINDS',
+    'CATEGORICAL_FIELDS',
+    'INDEX_VERSION',
+    'INSTRUMENT_MARKETS',
+]
+
+import bisect
+import difflib
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from tradingview_screener.codec import dumps, loads
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Iterator, Optional
+    from tradingview_screener.transport import Transport
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+"""The version of the on-disk format, an index with a different version is ignored."""
+
+SHIPPED_INDEX = Path(__file__).with_name('fields.json')
+
+INSTRUMENT_MARKETS = {
+    'stock': 'stocks',
+    'dr': 'stocks',
+    'fund': 'stocks',
+    'index': 'stocks',
+    'crypto': 'crypto',
+    'coin': 'crypto',
+    'forex': 'forex',
+    'futures': 'futures',
+    'bond': 'bonds',
+    'economic': 'economics2',
+    'cfd': 'cfd',
+    'option': 'options',
+}
+"""The field list (screener) of each instrument type."""
+
+
+CATALOG_KINDS = {
+    'price': 'float',
+    'fundamental_price': 'float',
+    'percent': 'float',
+    'number': 'float',
+    'time': 'time',
+    'bool': 'boolean',
+    'text': 'string',
+}
+"""
+The decoder kind (see `tradingview_screener.decoder.FIELD_KINDS`) of each field type of the
+catalog, the other types (`set`, `map`, `interface`, and `''` for the fields whose type the docs
+don't give) are left to inference.
+"""
+
+CATEGORICAL_FIELDS = frozenset(
+    {
+        'sector',
+        'industry',
+        'exchange',
+        'type',
+        'subtype',
+        'country',
+        'currency_id',
+        'base_currency',
+        'update_mode',
+        'fractional',
+        'source',
+        'unit_id',
+        'option-type',
+    }
+)
+"""Text fields with few distinct values, which are decoded as categoricals by a `FieldSchema`."""
+
+
+class Field(NamedTuple):
+    name: str
+    display: str
+    type: str
+    markets: tuple[str, ...]
+    """The screeners that support the field (`stocks`, `crypto`, `forex`...)."""
+
+
+class _FieldTableParser(HTMLParser):
+    # collects the text of the cells of every row of the field tables
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: list[list[str]] = []
+        self._cell: Optional[list[str]] = None
+
+    def handle_starttag(self, tag, attrs) -> None:
+        if tag == 'tr':
+            self.rows.append([])
+        elif tag == 'td' and self.rows:
+            self._cell = []
+
+    def handle_endtag(self, tag) -> None:
+        if tag == 'td' and self._cell is not None:
+            self.rows[-1].append(''.join(self._cell).strip())
+            self._cell = None
+
+    def handle_data(self, data) -> None:
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse_fields_page(content: str) -> list[tuple[str, str, str]]:
+    """
+    Extract `(name, display, type)` from a page of the field docs, either a plain list
+    (`- name` lines, the type is then unknown: `''`) or an HTML table (name, display name, type).
+    """
+    fields = []
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith('- ') and line[2:]:
+            fields.append((line[2:], line[2:], ''))
+    if fields:
+        return fields
+    parser = _FieldTableParser()
+    parser.feed(content)
+    return [(row[0], row[1], row[2]) for row in parser.rows if len(row) >= 3 and all(row[:3])]
+
+
+class FieldCatalog:
+    """
+    The fields of the screener (name, display name, type, and the screeners that support them)
+    and the exchanges of each market, for the field pickers of the UI.
+
+    The catalog comes from a prebuilt index shipped with the package (or a newer copy saved at
+    `path`), so loading it doesn't touch the network. It's a compact JSON file, with one row per
+    field, and the types and markets stored as indexes into lookup tables. When the index is
+    older than `max_age`, `refresh_in_background()` downloads the field docs in a daemon thread
+    while the current index keeps being served.
+
+    The index is built from the docs with `python -m tradingview_screener.catalog` (see
+    `build_index()`). Until it is, the shipped one is a seed (the fields this app uses, without
+    types) built at `0`: `ensure_built()` then downloads the upstream list on the first use.
+
+    Examples:
+
+    >>> catalog = get_field_catalog()
+    >>> catalog.get('close')
+    Field(name='close', display='Price', type='price', markets=('stocks', 'crypto', ...))
+    >>> [f.name for f in catalog.prefix('perf.', market='stocks', limit=3)]
+    ['Perf.10Y', 'Perf.1M', 'Perf.3M']
+    >>> [f.name for f in catalog.search('relatve volum', limit=1)]
+    ['relative_volume_10d_calc']
+
+    :param path: where the refreshed index is saved (and loaded from, if it's newer than the
+        shipped one), defaults to `~/.cache/tradingview_screener/fields.json`.
+    :param max_age: seconds after which the index is stale.
+    :param transport: the transport used to download the field docs.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str | os.PathLike] = None,
+        max_age: float = 7 * 24 * 3600,
+        transport: Optional[Transport] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if path is None:
+            cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+            path = Path(cache_home) / 'tradingview_screener' / 'fields.json'
+        self.path = Path(path)
+        self.max_age = max_age
+        self.transport = transport
+        self.clock = clock
+        self.built = 0.0
+        self.source = ''
+        self.market_names: list[str] = []
+        self.exchanges_by_market: dict[str, list[str]] = {}
+        self._fields: dict[str, Field] = {}
+        self._keys: Optional[list[tuple[str, str]]] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._build_lock = threading.Lock()
+        self._build_tried = False
+        self._load()
+
+    # --- loading
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict[str, Any]]:
+        try:
+            index = loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception('Failed to read the field index %s', path)
+            return None
+        if index.get('version') != INDEX_VERSION:
+            return None
+        return index
+
+    def _load(self) -> None:
+        candidates = [self._read(self.path), self._read(SHIPPED_INDEX)]
+        indexes = [index for index in candidates if index is not None]
+        if not indexes:
+            raise RuntimeError(f'The field index {SHIPPED_INDEX} is missing or invalid')
+        self._apply(max(indexes, key=lambda index: index['built']))
+
+    def _apply(self, index: dict[str, Any]) -> None:
+        markets: list[str] = index['markets']
+        types: list[str] = index['types']
+        supported: dict[int, tuple[str, ...]] = {}  # there are only a handful of distinct masks
+        fields = {}
+        for name, display, type_idx, mask in index['fields']:
+            if mask not in supported:
+                supported[mask] = tuple(m for i, m in enumerate(markets) if mask >> i & 1)
+            fields[name] = Field(name, display, types[type_idx], supported[mask])
+        with self._lock:
+            self.built = float(index['built'])
+            self.source = index['source']
+            self.market_names = markets
+            self.exchanges_by_market = index.get('exchanges', {})
+            self._fields = fields
+            self._keys = None  # built on the first search
+
+    @staticmethod
+    def _market(market: Optional[str]) -> Optional[str]:
+        # accept the instrument types of the UI too (`stock`, `fund`, `bond`...)
+        return INSTRUMENT_MARKETS.get(market, market) if market is not None else None
+
+    # --- lookups
+
+    def fields(self, market: Optional[str] = None) -> list[Field]:
+        """
+        The fields supported by a screener (or an instrument type), or all of them.
+        """
+        market = self._market(market)
+        return [f for f in self._fields.values() if market is None or market in f.markets]
+
+    def get(self, name: str) -> Optional[Field]:
+        return self._fields.get(name)
+
+    def exchanges(self, market: str) -> list[str]:
+        """The exchanges of a market (i.e. `india`, `america`)."""
+        return list(self.exchanges_by_market.get(market, []))
+
+    def prefix(self, text: str, market: Optional[str] = None, limit: int = 20) -> list[Field]:
+        """
+        The fields whose name or display name starts with `text` (case-insensitive), sorted.
+        """
+        text = text.lower()
+        market = self._market(market)
+        keys = self._keys
+        if keys is None:
+            # sorted (lowercase name or display name, name), for the binary search
+            fields = self._fields
+            keys = sorted(
+                {(name.lower(), name) for name in fields}
+                | {(field.display.lower(), name) for name, field in fields.items()}
+            )
+            self._keys = keys
+        matches: dict[str, Field] = {}
+        i = bisect.bisect_left(keys, (text, ''))
+        while i < len(keys) and keys[i][0].startswith(text) and len(matches) < limit:
+            field = self._fields[keys[i][1]]
+            if market is None or market in field.markets:
+                matches.setdefault(field.name, field)
+            i += 1
+        return list(matches.values())
+
+    def search(self, text: str, market: Optional[str] = None, limit: int = 20) -> list[Field]:
+        """
+        Fuzzy search on the names and display names: prefix matches first, then the fields that
+        contain every word of `text`, then the closest matches (to tolerate typos).
+        """
+        words = text.lower().split()
+        if not words:
+            return self.fields(market)[:limit]
+        market = self._market(market)
+        candidates = self.fields(market)
+
+        ranked = self.prefix(text, market, limit)
+        seen = {f.name for f in ranked}
+
+        def add(fields: Iterator[Field]) -> None:
+            for field in fields:
+                if len(ranked) >= limit:
+                    return
+                if field.name not in seen:
+                    seen.add(field.name)
+                    ranked.append(field)
+
+        haystacks = {f.name: f'{f.name} {f.display}'.lower() for f in candidates}
+        add(f for f in candidates if all(word in haystacks[f.name] for word in words))
+        if len(ranked) < limit:
+            by_key = {}
+            for f in candidates:
+                by_key.setdefault(f.name.lower(), f)
+                by_key.setdefault(f.display.lower(), f)
+            close = difflib.get_close_matches(text.lower(), by_key, n=limit, cutoff=0.6)
+            add(by_key[key] for key in close)
+        return ranked
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._fields
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __iter__(self) -> Iterator[Field]:
+        return iter(list(self._fields.values()))
+
+    # --- refreshing
+
+    @property
+    def is_stale(self) -> bool:
+        return self.clock() - self.built >= self.max_age
+
+    def _download(self, transport: Transport, market: str) -> list[tuple[str, str, str]]:
+        r = transport.get(f'{self.source}{market}.html', timeout=10)
+        r.raise_for_status()
+        return parse_fields_page(r.text)
+
+    def refresh(self, max_workers: int = 8, strict: bool = False) -> None:
+        """
+        Download the field docs of every screener (concurrently), and replace the index.
+
+        A screener whose docs fail to download keeps its fields from the current index; in that
+        case the new index is only kept in memory, so the next process tries again. If all of them
+        fail, the exception of the first one is raised and the index is left as is.
+
+        The exchanges are kept from the current index, the docs don't list them.
+
+        :param max_workers: the number of docs downloaded at the same time.
+        :param strict: raise the first error if the docs of any screener fail to download.
+        """
+        from tradingview_screener.transport import get_default_transport
+
+        transport = self.transport or get_default_transport()
+        markets = list(self.market_names)
+        pages: dict[str, list[tuple[str, str, str]]] = {}
+        errors: dict[str, Exception] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self._download, transport, m): m for m in markets}
+            for future in as_completed(futures):
+                market = futures[future]
+                try:
+                    pages[market] = future.result()
+                except Exception as e:
+                    logger.warning('Failed to download the fields of %r: %s', market, e)
+                    errors[market] = e
+        if errors and (strict or not pages):
+            raise next(iter(errors.values()))
+        for market in errors:
+            current = self.fields(market)
+            pages[market] = [(f.name, f.display, f.type) for f in current]
+
+        rows: dict[str, list[Any]] = {}
+        types: list[str] = []
+        for i, market in enumerate(markets):  # in order, so the index is deterministic
+            for name, display, type_ in pages[market]:
+                if type_ not in types:
+                    types.append(type_)
+                row = rows.setdefault(name, [name, display, types.index(type_), 0])
+                row[3] |= 1 << i
+        if not rows:
+            raise ValueError(f'No fields found at {self.source}')
+
+        index = {
+            'version': INDEX_VERSION,
+            'built': int(self.clock()),
+            'source': self.source,
+            'markets': markets,
+            'types': types,
+            'exchanges': self.exchanges_by_market,
+            'fields': sorted(rows.values(), key=lambda row: row[0].lower()),
+        }
+        self._apply(index)
+        if not errors:
+            self._save(index)
+
+    @property
+    def is_seed(self) -> bool:
+        """Whether the index was never built from the docs (the seed in a source checkout)."""
+        return self.built == 0
+
+    def ensure_built(self) -> bool:
+        """
+        If the index was never built from the docs, refresh it now, in the foreground, so the
+        pickers show the full upstream list rather than the seed. It's tried once per catalog (the
+        concurrent callers wait for it), a failure keeps the seed and is left to
+        `refresh_in_background()`. Return whether the index is built.
+        """
+        with self._build_lock:
+            if self.is_seed and not self._build_tried:
+                self._build_tried = True
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception('Failed to build the field index, using the shipped seed')
+        return not self.is_seed
+
+    def _save(self, index: dict[str, Any]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f'{self.path.name}.tmp')
+            tmp.write_bytes(_dump_index(index))
+            os.replace(tmp, self.path)
+        except OSError:
+            logger.exception('Failed to write the field index to %s', self.path)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            # keep serving the current index, the next call will try again
+            logger.exception('Failed to refresh the field index')
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_in_background(self) -> bool:
+        """
+        Start refreshing the index in a daemon thread if it's stale (and it's not already being
+        refreshed), and return whether a refresh was started. It never blocks.
+        """
+        with self._lock:
+            if self._refreshing or not self.is_stale:
+                return False
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh_in_background, name='FieldCatalog', daemon=True
+        ).start()
+        return True
+
+    def __repr__(self) -> str:
+        return f'< FieldCatalog(fields={len(self)}, built={time.ctime(self.built)!r}) >'
+
+
+def _dump_index(index: dict[str, Any]) -> bytes:
+    # compact, but with one field per line, so that the changes of the shipped index are readable
+    head = dumps({key: value for key, value in index.items() if key != 'fields'})[:-1]
+    rows = b',\n'.join(dumps(row) for row in index['fields'])
+    return head + b',"fields":[' + rows + b']}\n'
+
+
+def build_index(
+    path: str | os.PathLike = SHIPPED_INDEX, transport: Optional[Transport] = None
+) -> FieldCatalog:
+    """
+    Build the index from the field docs (the markets, exchanges and docs URL are kept from the
+    current one) and write it to `path`, the index shipped with the package by default:
+
+        python -m tradingview_screener.catalog
+
+    Unlike `refresh()`, it fails if the docs of any screener can't be downloaded, so the shipped
+    index is never a mix of fresh and old fields.
+    """
+    catalog = FieldCatalog(path=path, max_age=0, transport=transport)
+    catalog.refresh(strict=True)
+    return catalog
+
+
+_default_catalog: Optional[FieldCatalog] = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_field_catalog() -> FieldCatalog:
+    """
+    Return the process-wide `FieldCatalog` (created lazily).
+    """
+    global _default_catalog
+    if _default_catalog is None:
+        with _default_catalog_lock:
+            if _default_catalog is None:
+                _default_catalog = FieldCatalog()
+    return _default_catalog
+
+
+class FieldSchema(Mapping):
+    """
+    A field -> dtype mapping for `decode_scanner_data()`, derived from the types of the field
+    catalog: numbers are always float64 (an integer column with nulls doesn't become objects),
+    times become datetimes, bools use the nullable `boolean` dtype, and the low-cardinality text
+    fields (`sector`, `exchange`...) are categoricals.
+
+    It's what `Query.set_schema()` uses, the fields that aren't in the catalog are inferred.
+
+    >>> schema = FieldSchema()  # once the catalog has been refreshed with the typed docs
+    >>> schema['close'], schema['sector'], schema['is_primary']
+    ('float', 'category', 'boolean')
+
+    :param catalog: defaults to `get_field_catalog()`.
+    :param categorical: the text fields to decode as categoricals.
+    :param overrides: field -> kind, takes precedence over the catalog.
+    """
+
+    def __init__(
+        self,
+        catalog: Optional[FieldCatalog] = None,
+        categorical: Iterable[str] = CATEGORICAL_FIELDS,
+        overrides: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.catalog = catalog or get_field_catalog()
+        self.categorical = frozenset(categorical)
+        self.overrides = dict(overrides or {})
+
+    def __getitem__(self, name: str) -> str:
+        kind = self.overrides.get(name)
+        if kind is not None:
+            return kind
+        field = self.catalog.get(name)
+        kind = CATALOG_KINDS.get(field.type) if field is not None else None
+        if kind is None:
+            raise KeyError(name)
+        if kind == 'string' and name in self.categorical:
+            return 'category'
+        return kind
+
+    def __iter__(self) -> Iterator[str]:
+        names = dict.fromkeys(self.overrides)
+        names.update((f.name, None) for f in self.catalog if f.type in CATALOG_KINDS)
+        return iter(names)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'< FieldSchema(fields={len(self)}, overrides={self.overrides}) >'
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(build_index())
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+__all__ = [
+    'BACKENDS',
+    'Codec',
+    'dumps',
+    'get_default_codec',
+    'iter_json_array',
+    'loads',
+    'loads_stream',
+    'set_default_codec',
+]
+
+import codecs
+import json
+import re
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+
+BACKENDS = ('orjson', 'ujson', 'json')
+"""The JSON libraries a `Codec` can use, in order of preference (`json` is always available)."""
+
+
+class Codec:
+    """
+    A JSON backend, with the same interface regardless of the library behind it:
+    `loads()` accepts `bytes` or `str`, and `dumps()` always returns `bytes`.
+
+    >>> codec = Codec('json')
+    >>> codec.dumps({'a': [1, None]})
+    b'{"a":[1,null]}'
+
+    The backends differ on a few edge cases: orjson (and ujson) write `NaN` as `null`, and orjson
+    serializes NumPy arrays/scalars natively, the stdlib passes them to `default`.
+
+    :param name: one of `BACKENDS`.
+    """
+
+    __slots__ = ('name', 'loads', '_dumps')
+
+    def __init__(self, name: str) -> None:
+        if name not in BACKENDS:
+            raise ValueError(f'Unknown JSON backend {name!r}, expected one of {BACKENDS}')
+        self.name = name
+        self.loads: Callable[[bytes | str], Any]
+        self._dumps: Callable[[Any, Optional[Callable[[Any], Any]]], bytes]
+
+        if name == 'orjson':
+            import orjson
+
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            self.loads = orjson.loads
+            self._dumps = lambda obj, default: orjson.dumps(obj, default=default, option=option)
+        elif name == 'ujson':
+            import ujson
+
+            self.loads = ujson.loads
+            self._dumps = lambda obj, default: ujson.dumps(
+                obj, default=default, ensure_ascii=False
+            ).encode()
+        else:
+            self.loads = json.loads
+            self._dumps = lambda obj, default: json.dumps(
+                obj, default=default, ensure_ascii=False, separators=(',', ':')
+            ).encode()
+
+    def dumps(self, obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """
+        Serialize `obj` to compact UTF-8 JSON.
+
+        :param default: called with the objects the backend can't serialize, it should return
+            something serializable or raise a `TypeError`.
+        """
+        return self._dumps(obj, default)
+
+    def load(self, fp: IO[bytes]) -> Any:
+        return self.loads(fp.read())
+
+    def dump(self, obj: Any, fp: IO[bytes], default: Optional[Callable[[Any], Any]] = None) -> None:
+        fp.write(self._dumps(obj, default))
+
+    def __repr__(self) -> str:
+        return f'< Codec({self.name!r}) >'
+
+
+def _best_codec() -> Codec:
+    for name in BACKENDS:
+        try:
+            return Codec(name)
+        except ImportError:  # orjson and ujson are optional dependencies
+            continue
+    raise AssertionError('unreachable')
+
+
+_default_codec: Optional[Codec] = None
+_default_codec_lock = threading.Lock()
+
+
+def get_default_codec() -> Codec:
+    """
+    Return the process-wide `Codec`, the fastest library that's installed (see `BACKENDS`).
+    """
+    global _default_codec
+    if _default_codec is None:
+        with _default_codec_lock:
+            if _default_codec is None:
+                _default_codec = _best_codec()
+    return _default_codec
+
+
+def set_default_codec(codec: Codec | str) -> None:
+    """
+    Replace the process-wide `Codec` (i.e. `set_default_codec('json')` to rule out a backend).
+    """
+    global _default_codec
+    _default_codec = Codec(codec) if isinstance(codec, str) else codec
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON with the default codec."""
+    return get_default_codec().loads(data)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Encode JSON (compact, UTF-8) with the default codec."""
+    return get_default_codec().dumps(obj, default)
+
+
+_WHITESPACE = ' \t\n\r'
+# what's left in the buffer after a number that may continue in the next chunk (i.e. `1` of `1e-7`)
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+class _StreamReader:
+    # decodes JSON values one at a time from a stream of byte chunks, while only keeping the
+    # part of the text that wasn't consumed yet
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.raw_decode = json.JSONDecoder().raw_decode
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def error(self, msg: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(msg, self.buf, self.pos)
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos > 65536 and self.pos * 2 > len(self.buf):
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self.decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        # the next non-whitespace character (without consuming it)
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise self.error('Unexpected end of JSON')
+
+    def next_char(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, char: str) -> None:
+        if self.next_char() != char:
+            self.pos -= 1
+            raise self.error(f'Expecting {char!r}')
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue  # the value was truncated
+                raise
+            # a number at the end of the buffer might continue in the next chunk
+            if not self.eof and _NUMBER_TAIL.match(self.buf, end) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_array(
+    chunks: Iterable[bytes], key: str, header: Optional[dict[str, Any]] = None
+) -> Iterator[Any]:
+    """
+    Decode a JSON object from a stream of byte chunks, yielding the items of the array at `key`
+    as soon as they are received.
+
+    The other keys of the object are stored into `header` (for the scanner, that's
+    `totalCount`), so they are complete once the iterator is exhausted.
+
+    >>> header = {}
+    >>> rows = iter_json_array(response.iter_content(65536), 'data', header)
+
+    :param chunks: the body, i.e. `response.iter_content()` of a `stream=True` response.
+    """
+    if header is None:
+        header = {}
+    reader = _StreamReader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise reader.error('Expecting property name enclosed in double quotes')
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    char = reader.next_char()
+                    if char == ']':
+                        break
+                    if char != ',':
+                        reader.pos -= 1
+                        raise reader.error("Expecting ',' delimiter")
+        else:
+            header[name] = reader.value()
+        char = reader.next_char()
+        if char == '}':
+            return
+        if char != ',':
+            reader.pos -= 1
+            raise reader.error("Expecting ',' delimiter")
+
+
+def loads_stream(chunks: Iterable[bytes], key: str = 'data') -> dict[str, Any]:
+    """
+    Decode a JSON object from a stream of byte chunks.
+
+    With the stdlib backend, the object is decoded incrementally with `iter_json_array()` while
+    the body is downloaded, so the whole body is never held in memory (neither as bytes nor as
+    text). orjson and ujson are faster at decoding the whole body at once, so the chunks are just
+    joined.
+
+    :param key: the key of the (big) array that is decoded incrementally.
+    """
+    codec = get_default_codec()
+    if codec.name != 'json':
+        return codec.loads(b''.join(chunks))
+
+    header: dict[str, Any] = {}
+    items = list(iter_json_array(chunks, key, header))
+    header.setdefault(key, items)  # unless it wasn't an array
+    return header
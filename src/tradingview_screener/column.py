@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import sys
 from typing import TYPE_CHECKING
 
+from tradingview_screener.nodes import expression
+
 
 if TYPE_CHECKING:
     from typing import Optional, Iterable
@@ -44,10 +47,39 @@ class Column:
     >>> Column('description').like('apple')  # the same as `description LIKE '%apple%'`
     >>> Column('premarket_change').not_empty()  # same as `Column('premarket_change') != None`
     >>> Column('earnings_release_next_trading_date_fq').in_day_range(0, 0)  # same day
+
+    Columns are immutable and interned (`Column('close') is Column('close')`), and the filters
+    they build are immutable `FilterNode`s (see `tradingview_screener.nodes`), which are hashable
+    and cache their JSON.
     """
 
-    def __init__(self, name: str) -> None:
-        self.name = name
+    __slots__ = ('name',)
+    _interned: dict[tuple[type, str], Column] = {}
+
+    def __new__(cls, name: str) -> Column:
+        name = str(name)  # `sys.intern()` only takes exact `str`s (not i.e. `np.str_`)
+        key = (cls, name)
+        self = cls._interned.get(key)
+        if self is None:
+            self = super().__new__(cls)
+            object.__setattr__(self, 'name', sys.intern(name))
+            self = cls._interned.setdefault(key, self)
+        return self
+
+    def __setattr__(self, key, value) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __reduce__(self):
+        return type(self), (self.name,)
+
+    def __copy__(self) -> Column:
+        return self
+
+    def __deepcopy__(self, memo) -> Column:
+        return self
 
     @staticmethod
     def _extract_name(obj) -> ...:
@@ -56,51 +88,47 @@ class Column:
         return obj
 
     def __gt__(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'greater', 'right': self._extract_name(other)}
+        return expression(self.name, 'greater', self._extract_name(other))
 
     def __ge__(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'egreater', 'right': self._extract_name(other)}
+        return expression(self.name, 'egreater', self._extract_name(other))
 
     def __lt__(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'less', 'right': self._extract_name(other)}
+        return expression(self.name, 'less', self._extract_name(other))
 
     def __le__(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'eless', 'right': self._extract_name(other)}
+        return expression(self.name, 'eless', self._extract_name(other))
 
     def __eq__(self, other) -> FilterOperationDict:  # pyright: ignore [reportIncompatibleMethodOverride]
-        return {'left': self.name, 'operation': 'equal', 'right': self._extract_name(other)}
+        return expression(self.name, 'equal', self._extract_name(other))
 
     def __ne__(self, other) -> FilterOperationDict:  # pyright: ignore [reportIncompatibleMethodOverride]
-        return {'left': self.name, 'operation': 'nequal', 'right': self._extract_name(other)}
+        return expression(self.name, 'nequal', self._extract_name(other))
 
     def crosses(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'crosses', 'right': self._extract_name(other)}
+        return expression(self.name, 'crosses', self._extract_name(other))
 
     def crosses_above(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'crosses_above', 'right': self._extract_name(other)}
+        return expression(self.name, 'crosses_above', self._extract_name(other))
 
     def crosses_below(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'crosses_below', 'right': self._extract_name(other)}
+        return expression(self.name, 'crosses_below', self._extract_name(other))
 
     def between(self, left, right) -> FilterOperationDict:
-        return {
-            'left': self.name,
-            'operation': 'in_range',
-            'right': [self._extract_name(left), self._extract_name(right)],
-        }
+        return expression(
+            self.name, 'in_range', [self._extract_name(left), self._extract_name(right)]
+        )
 
     def not_between(self, left, right) -> FilterOperationDict:
-        return {
-            'left': self.name,
-            'operation': 'not_in_range',
-            'right': [self._extract_name(left), self._extract_name(right)],
-        }
+        return expression(
+            self.name, 'not_in_range', [self._extract_name(left), self._extract_name(right)]
+        )
 
     def isin(self, values: Iterable) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'in_range', 'right': list(values)}
+        return expression(self.name, 'in_range', list(values))
 
     def not_in(self, values: Iterable) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'not_in_range', 'right': list(values)}
+        return expression(self.name, 'not_in_range', list(values))
 
     def has(self, values: str | list[str]) -> FilterOperationDict:
         """
@@ -108,7 +136,7 @@ class Column:
 
         (it's the same as `isin()`, except that it works on fields of type `set`)
         """
-        return {'left': self.name, 'operation': 'has', 'right': values}
+        return expression(self.name, 'has', values)
 
     def has_none_of(self, values: str | list[str]) -> FilterOperationDict:
         """
@@ -116,16 +144,16 @@ class Column:
 
         (it's the same as `not_in()`, except that it works on fields of type `set`)
         """
-        return {'left': self.name, 'operation': 'has_none_of', 'right': values}
+        return expression(self.name, 'has_none_of', values)
 
     def in_day_range(self, a: int, b: int) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'in_day_range', 'right': [a, b]}
+        return expression(self.name, 'in_day_range', [a, b])
 
     def in_week_range(self, a: int, b: int) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'in_week_range', 'right': [a, b]}
+        return expression(self.name, 'in_week_range', [a, b])
 
     def in_month_range(self, a: int, b: int) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'in_month_range', 'right': [a, b]}
+        return expression(self.name, 'in_month_range', [a, b])
 
     def above_pct(self, column: Column | str, pct: float) -> FilterOperationDict:
         """
@@ -137,11 +165,7 @@ class Column:
         closing price is above the 52-week-low by more than 150%
         >>> Column('close').above_pct('price_52_week_low', 2.5)
         """
-        return {
-            'left': self.name,
-            'operation': 'above%',
-            'right': [self._extract_name(column), pct],
-        }
+        return expression(self.name, 'above%', [self._extract_name(column), pct])
 
     def below_pct(self, column: Column | str, pct: float) -> FilterOperationDict:
         """
@@ -150,11 +174,7 @@ class Column:
         The closing price is lower than the VWAP by 3% or more
         >>> Column('close').below_pct('VWAP', 1.03)
         """
-        return {
-            'left': self.name,
-            'operation': 'below%',
-            'right': [self._extract_name(column), pct],
-        }
+        return expression(self.name, 'below%', [self._extract_name(column), pct])
 
     def between_pct(
         self, column: Column | str, pct1: float, pct2: Optional[float] = None
@@ -165,11 +185,7 @@ class Column:
         The percentage change between the Close and the EMA is between 20% and 50%
         >>> Column('close').between_pct('EMA200', 1.2, 1.5)
         """
-        return {
-            'left': self.name,
-            'operation': 'in_range%',
-            'right': [self._extract_name(column), pct1, pct2],
-        }
+        return expression(self.name, 'in_range%', [self._extract_name(column), pct1, pct2])
 
     def not_between_pct(
         self, column: Column | str, pct1: float, pct2: Optional[float] = None
@@ -180,27 +196,23 @@ class Column:
         The percentage change between the Close and the EMA is between 20% and 50%
         >>> Column('close').not_between_pct('EMA200', 1.2, 1.5)
         """
-        return {
-            'left': self.name,
-            'operation': 'not_in_range%',
-            'right': [self._extract_name(column), pct1, pct2],
-        }
+        return expression(self.name, 'not_in_range%', [self._extract_name(column), pct1, pct2])
 
     def like(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'match', 'right': self._extract_name(other)}
+        return expression(self.name, 'match', self._extract_name(other))
 
     def not_like(self, other) -> FilterOperationDict:
-        return {'left': self.name, 'operation': 'nmatch', 'right': self._extract_name(other)}
+        return expression(self.name, 'nmatch', self._extract_name(other))
 
     def empty(self) -> FilterOperationDict:
         # it seems like the `right` key is optional
-        return {'left': self.name, 'operation': 'empty', 'right': None}
+        return expression(self.name, 'empty', None)
 
     def not_empty(self) -> FilterOperationDict:
         """
         This method can be used to check if a field is not None/null.
         """
-        return {'left': self.name, 'operation': 'nempty', 'right': None}
+        return expression(self.name, 'nempty', None)
 
     def __repr__(self) -> str:
         return f'< Column({self.name!r}) >'
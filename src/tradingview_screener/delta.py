@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+__all__ = ['DeltaQuery', 'ScanDelta', 'VOLATILE_COLUMNS']
+
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Optional
+    import pandas as pd
+    from tradingview_screener.query import Query
+
+
+VOLATILE_COLUMNS = (
+    'close',
+    'open',
+    'high',
+    'low',
+    'change',
+    'change_abs',
+    'volume',
+    'Value.Traded',
+    'relative_volume_10d_calc',
+    'premarket_change',
+    'postmarket_change',
+)
+"""The fields that change during the session (everything else is refreshed every `full_every`)."""
+
+
+class ScanDelta:
+    """
+    The difference between two consecutive results of a `DeltaQuery`.
+
+    - `added`: the rows of the tickers that are new in the result (all the columns).
+    - `removed`: the tickers that are no longer in the result.
+    - `changed`: the current rows of the tickers whose values changed (all the columns).
+    - `cells`: a boolean DataFrame aligned with `changed`, True where a value changed.
+    - `full`: whether the slow columns were refreshed too.
+    """
+
+    __slots__ = ('added', 'removed', 'changed', 'cells', 'full')
+
+    def __init__(
+        self,
+        added: pd.DataFrame,
+        removed: list[str],
+        changed: pd.DataFrame,
+        cells: pd.DataFrame,
+        full: bool,
+    ) -> None:
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.cells = cells
+        self.full = full
+
+    def __bool__(self) -> bool:
+        return bool(len(self.added) or self.removed or len(self.changed))
+
+    def __repr__(self) -> str:
+        return (
+            f'< ScanDelta(added={len(self.added)}, removed={len(self.removed)}, '
+            f'changed={len(self.changed)}, full={self.full}) >'
+        )
+
+
+def _diff(old: pd.DataFrame, new: pd.DataFrame, columns: list[str], full: bool) -> ScanDelta:
+    # both frames are indexed by ticker
+    added = new[~new.index.isin(old.index)]
+    removed = old.index[~old.index.isin(new.index)].tolist()
+
+    common = new.index[new.index.isin(old.index)]
+    before = old.loc[common, columns]
+    after = new.loc[common, columns]
+    # a null that stays null is not a change
+    cells = (before != after) & ~(before.isna() & after.isna())
+    rows = cells.any(axis=1).to_numpy()
+    return ScanDelta(
+        added=added.reset_index(),
+        removed=removed,
+        changed=new.loc[common[rows]].reset_index(),
+        cells=cells[rows].reset_index(),
+        full=full,
+    )
+
+
+class DeltaQuery:
+    """
+    Keep the last result of a query, and refresh it incrementally.
+
+    An auto-refreshing page re-downloads every column of every row on each cycle, even though
+    most of them (sector, fundamentals, etc.) don't change during the session. A `DeltaQuery`
+    only asks for the volatile columns of the query (`close`, `change`, `volume`...) on most
+    refreshes, and merges them with the slow columns it already has. The slow columns of new
+    tickers are fetched on their own, and every `full_every` seconds the whole query is sent
+    again.
+
+    Each refresh returns a `ScanDelta` (added/removed/changed tickers), so the UI can patch its
+    tables in place instead of rebuilding them, and `frame` holds the same DataFrame that
+    `query.get_scanner_data()` would return.
+
+    Examples:
+
+    >>> live = DeltaQuery(Query().set_markets('india').select('name', 'sector', 'close', 'change'))
+    >>> delta = live.refresh()  # the first refresh downloads everything (all rows are `added`)
+    >>> delta = live.refresh()  # only `close` and `change` are downloaded
+    >>> delta.changed[['ticker', 'close', 'change']]
+
+    :param query: the query to keep up to date (it's copied).
+    :param volatile: the fields to refresh on every cycle.
+    :param full_every: seconds between two full refreshes.
+    """
+
+    def __init__(
+        self,
+        query: Query,
+        volatile: Iterable[str] = VOLATILE_COLUMNS,
+        full_every: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.query = query.copy()
+        self.columns = list(dict.fromkeys(self.query.query.get('columns', [])))
+        volatile = set(volatile)
+        self.volatile_columns = [c for c in self.columns if c in volatile]
+        self.slow_columns = [c for c in self.columns if c not in volatile]
+        self.full_every = full_every
+        self.clock = clock
+        self.count = 0
+        self.stats = {'full': 0, 'delta': 0, 'lookups': 0}
+        self._df: Optional[pd.DataFrame] = None  # indexed by ticker
+        self._last_full = 0.0
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        The current result, the same as the DataFrame of `query.get_scanner_data()`.
+        """
+        if self._df is None:
+            raise RuntimeError('The query has not been refreshed yet, call `refresh()` first')
+        return self._df.reset_index()
+
+    def _fetch(self, columns: list[str], **kwargs) -> tuple[int, pd.DataFrame]:
+        query = self.query.copy()
+        query.query['columns'] = columns
+        count, df = query.get_scanner_data(**kwargs)
+        return count, df.set_index('ticker')
+
+    def _lookup(self, tickers: list[str], **kwargs) -> pd.DataFrame:
+        # the slow columns of the tickers that just entered the result, the filters already
+        # matched, so we only need to look them up
+        query = self.query.copy()
+        query.query['columns'] = self.slow_columns
+        query.query['symbols'] = {**query.query.get('symbols', {}), 'tickers': tickers}
+        for key in ('filter', 'filter2', 'sort'):
+            query.query.pop(key, None)  # pyright: ignore
+        query.query['range'] = [0, len(tickers)]
+        self.stats['lookups'] += 1
+        return query.get_scanner_data(**kwargs)[1].set_index('ticker')
+
+    def refresh(self, full: bool = False, **kwargs) -> ScanDelta:
+        """
+        Fetch the latest values and return what changed since the previous refresh.
+
+        :param full: force a full refresh.
+        :param kwargs: kwargs to pass to `get_scanner_data()`.
+        """
+        now = self.clock()
+        old = self._df
+        full = (
+            full or old is None or not self.slow_columns or now - self._last_full >= self.full_every
+        )
+
+        if full:
+            self.count, new = self._fetch(self.columns, **kwargs)
+            self._last_full = now
+            self.stats['full'] += 1
+            compared = self.columns
+        else:
+            assert old is not None
+            self.count, new = self._fetch(self.volatile_columns, **kwargs)
+            self.stats['delta'] += 1
+            slow = old[self.slow_columns]
+            missing = new.index[~new.index.isin(old.index)].tolist()
+            if missing:
+                import pandas as pd
+
+                slow = pd.concat([slow, self._lookup(missing, **kwargs)[self.slow_columns]])
+            new = new.join(slow)[self.columns]
+            compared = self.volatile_columns
+
+        if old is None:
+            old = new.iloc[:0]
+        self._df = new
+        return _diff(old, new, compared, full)
+
+    def __repr__(self) -> str:
+        rows = 0 if self._df is None else len(self._df)
+        return f'< DeltaQuery(rows={rows}, volatile={self.volatile_columns}, stats={self.stats}) >'
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+__all__ = ['UnsupportedOperationError', 'evaluate', 'query_mask', 'scan_local']
+
+import datetime as dt
+import operator
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Optional
+    import pandas as pd
+    from tradingview_screener.models import (
+        FilterOperationDict,
+        OperationComparisonDict,
+        OperationDict,
+        QueryDict,
+    )
+
+
+class UnsupportedOperationError(Exception):
+    """
+    The query can't be evaluated locally (unknown operation, missing column, etc.), and has to be
+    sent to the scanner API instead.
+    """
+
+
+_COMPARISONS: dict[str, Callable[[Any, Any], Any]] = {
+    'greater': operator.gt,
+    'egreater': operator.ge,
+    'less': operator.lt,
+    'eless': operator.le,
+    'equal': operator.eq,
+    'nequal': operator.ne,
+}
+_PERIODS = {'in_day_range': 'D', 'in_week_range': 'W', 'in_month_range': 'M'}
+# the symbol filters that only the server can resolve
+_REMOTE_SYMBOLS = ('symbolset', 'watchlist', 'groups')
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df.columns:
+        raise UnsupportedOperationError(f'The column {name!r} is not in the local DataFrame')
+    series = df[name]
+    # the same field can be selected more than once
+    return series.iloc[:, 0] if series.ndim == 2 else series  # pyright: ignore
+
+
+def _operand(df: pd.DataFrame, value: Any) -> Any:
+    # like the scanner API, a string on the right side is a field when there is a field with
+    # that name, otherwise it's a literal value
+    if isinstance(value, str) and value in df.columns:
+        return _column(df, value).to_numpy()
+    return value
+
+
+def _numeric(df: pd.DataFrame, name: Any) -> np.ndarray:
+    if not isinstance(name, str):
+        raise UnsupportedOperationError(f'Expected a field name, got {name!r}')
+    return _column(df, name).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+    dtype = series.dtype
+    return (is_numeric_dtype(dtype) and not is_bool_dtype(dtype)) or is_datetime64_any_dtype(dtype)
+
+
+def _notna(values: Any) -> np.ndarray:
+    import pandas as pd
+
+    return np.asarray(pd.notna(values), dtype=bool)
+
+
+def _compare(left: pd.Series, right: Any, op: Callable[[Any, Any], Any]) -> np.ndarray:
+    # same as SQL: comparing a null (on either side) never matches, so the comparison only runs
+    # on the rows where both sides are set (which also keeps `None > 5` from raising)
+    values = left.to_numpy()
+    valid = _notna(values)
+    if isinstance(right, np.ndarray):
+        valid &= _notna(right)
+        right = right[valid]
+    elif right is None:
+        return np.zeros(len(values), dtype=bool)
+    elif isinstance(right, str) and _is_numeric(left):
+        raise UnsupportedOperationError(f'Unknown field {right!r} (compared to {left.name!r})')
+
+    mask = np.zeros(len(values), dtype=bool)
+    try:
+        mask[valid] = op(values[valid], right)
+    except TypeError as e:
+        raise UnsupportedOperationError(f'Cannot compare {left.name!r} with {right!r}') from e
+    return mask
+
+
+def _between(left: pd.Series, low: Any, high: Any) -> np.ndarray:
+    return _compare(left, low, operator.ge) & _compare(left, high, operator.le)
+
+
+def _is_range(df: pd.DataFrame, left: pd.Series, right: Any) -> bool:
+    # `between(a, b)` and `isin([a, b])` are both sent as `in_range` with a list of two values,
+    # and (just like the server) we treat it as a range when the field is numeric
+    return (
+        isinstance(right, (list, tuple))
+        and len(right) == 2
+        and _is_numeric(left)
+        and all(
+            isinstance(value, (int, float)) or (isinstance(value, str) and value in df.columns)
+            for value in right
+        )
+    )
+
+
+def _has(left: pd.Series, right: str | list[str]) -> np.ndarray:
+    wanted = {right} if isinstance(right, str) else set(right)
+    values = left.to_numpy()
+
+    def matches(value: Any) -> bool:
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return not wanted.isdisjoint(value)
+        return value in wanted
+
+    return np.fromiter(
+        (value is not None and matches(value) for value in values), dtype=bool, count=len(values)
+    )
+
+
+def _in_period_range(
+    left: pd.Series, freq: str, a: int, b: int, now: Optional[dt.datetime]
+) -> np.ndarray:
+    import pandas as pd
+
+    # dates are sent as unix timestamps (in seconds), unless they were already decoded
+    if left.dtype.kind == 'M':
+        dates = left
+    elif _is_numeric(left):
+        dates = pd.to_datetime(left, unit='s')
+    else:
+        raise UnsupportedOperationError(f'{left.name!r} is not a date field')
+    valid = _notna(dates)
+    today = pd.Timestamp(now if now is not None else dt.datetime.now(dt.timezone.utc))
+    if today.tzinfo is not None:
+        today = today.tz_convert('UTC').tz_localize(None)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+
+    offsets = dates.dt.to_period(freq).array.asi8 - today.to_period(freq).ordinal
+    return valid & (offsets >= a) & (offsets <= b)
+
+
+def _evaluate_expression(
+    df: pd.DataFrame, expr: FilterOperationDict, now: Optional[dt.datetime]
+) -> np.ndarray:
+    op = expr['operation']
+    left = _column(df, expr['left'])
+    right = expr.get('right')
+
+    if op in _COMPARISONS:
+        return _compare(left, _operand(df, right), _COMPARISONS[op])
+    if op in ('in_range', 'not_in_range'):
+        if _is_range(df, left, right):
+            mask = _between(left, _operand(df, right[0]), _operand(df, right[1]))
+        else:
+            values = [right] if isinstance(right, str) else list(right)
+            mask = left.isin(values).to_numpy(dtype=bool)
+        return mask if op == 'in_range' else _notna(left.to_numpy()) & ~mask
+    if op == 'empty':
+        return ~_notna(left.to_numpy())
+    if op == 'nempty':
+        return _notna(left.to_numpy())
+    if op in ('match', 'smatch', 'nmatch'):
+        if _is_numeric(left):
+            raise UnsupportedOperationError(f'Cannot match the numeric field {left.name!r}')
+        # `LOWER(col) LIKE '%pattern%'`
+        contains = left.str.contains(str(right), case=False, regex=False, na=False)
+        mask = np.asarray(contains, dtype=bool)
+        return mask if op != 'nmatch' else _notna(left.to_numpy()) & ~mask
+    if op == 'has':
+        return _has(left, right)
+    if op == 'has_none_of':
+        return _notna(left.to_numpy()) & ~_has(left, right)
+    if op in ('above%', 'below%'):
+        reference = _numeric(df, right[0]) * right[1]
+        return _compare(left, reference, operator.gt if op == 'above%' else operator.lt)
+    if op in ('in_range%', 'not_in_range%'):
+        column, pct1, pct2 = right
+        if pct2 is None:
+            raise UnsupportedOperationError(f'{op!r} with a single percentage')
+        reference = _numeric(df, column)
+        low, high = sorted((pct1, pct2))
+        mask = _between(left, reference * low, reference * high)
+        if op == 'in_range%':
+            return mask
+        return _notna(left.to_numpy()) & _notna(reference) & ~mask
+    if op in _PERIODS:
+        return _in_period_range(left, _PERIODS[op], right[0], right[1], now)
+    # `crosses` and friends need the value of the previous bar, which only the server has
+    raise UnsupportedOperationError(f'The operation {op!r} can only be evaluated remotely')
+
+
+def evaluate(
+    df: pd.DataFrame,
+    expr: FilterOperationDict | OperationDict | OperationComparisonDict | dict,
+    now: Optional[dt.datetime] = None,
+) -> np.ndarray:
+    """
+    Compile a filter tree (as built by `Column` operators, `And()` and `Or()`) into a boolean
+    mask over the rows of `df`.
+
+    Each leaf runs as a single vectorized operation on a whole column. Nulls never match a
+    comparison (like in SQL), only `empty()` selects them.
+
+    Examples:
+
+    >>> evaluate(df, col('close').between(10, 20))
+    >>> evaluate(df, Or(col('type') == 'stock', And(col('type') == 'fund', col('close') > 5)))
+
+    :param df: the DataFrame, with one column per field.
+    :param expr: a `FilterOperationDict`, an `OperationDict` or its `operation` value.
+    :param now: the reference time of `in_day_range()` and friends (defaults to now, in UTC).
+    :raises UnsupportedOperationError: when the tree can't be evaluated locally.
+    """
+    if 'left' in expr:
+        return _evaluate_expression(df, expr, now)  # pyright: ignore [reportArgumentType]
+    if 'expression' in expr:
+        return evaluate(df, expr['expression'], now)
+    operation = expr['operation'] if 'operation' in expr else expr
+    masks = [evaluate(df, operand, now) for operand in operation['operands']]
+    if operation['operator'] == 'and':
+        return np.logical_and.reduce(masks) if masks else np.ones(len(df), dtype=bool)
+    if operation['operator'] == 'or':
+        return np.logical_or.reduce(masks) if masks else np.zeros(len(df), dtype=bool)
+    raise UnsupportedOperationError(f'Unknown operator: {operation["operator"]!r}')
+
+
+def query_mask(df: pd.DataFrame, query: QueryDict, now: Optional[dt.datetime] = None) -> np.ndarray:
+    """
+    The rows of `df` that match the `filter`, `filter2` and `symbols` of a query.
+
+    `markets` is ignored, `df` is expected to already be the universe of the query's markets.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for expr in query.get('filter') or []:
+        mask &= evaluate(df, expr, now)
+    if query.get('filter2'):
+        mask &= evaluate(df, query['filter2'], now)
+
+    symbols = query.get('symbols') or {}
+    if any(symbols.get(key) for key in _REMOTE_SYMBOLS) or query.get('preset'):
+        raise UnsupportedOperationError('Symbol sets, watchlists and presets are resolved remotely')
+    if symbols.get('tickers'):
+        mask &= _column(df, 'ticker').isin(symbols['tickers']).to_numpy(dtype=bool)
+    types = (symbols.get('query') or {}).get('types')
+    if types:
+        mask &= _column(df, 'type').isin(types).to_numpy(dtype=bool)
+    return mask
+
+
+def scan_local(
+    df: pd.DataFrame, query: QueryDict, now: Optional[dt.datetime] = None
+) -> tuple[int, pd.DataFrame]:
+    """
+    Run a query on a local DataFrame (i.e. a cached snapshot of the whole universe), and return
+    the same thing as `Query.get_scanner_data()`: the number of matching rows, and the selected
+    `columns` of the rows in `range`, sorted by `sort`.
+
+    Examples:
+
+    >>> count, universe = Query().select(*fields).limit(100_000).get_scanner_data()
+    >>> scan_local(universe, Query().select('name', 'close').where(col('close') > 5).query)
+
+    :raises UnsupportedOperationError: when the query can't be evaluated locally (an operation
+        like `crosses()`, a column that isn't in `df`, a watchlist, etc.).
+    """
+    columns = ['ticker', *query.get('columns', [])]
+    for name in columns:
+        _column(df, name)
+
+    mask = query_mask(df, query, now)
+    result = df[mask]
+
+    sort = query.get('sort')
+    if sort:
+        # ranking (ties keep their order) lets us sort any dtype and place the nulls in one pass
+        ranks = _column(result, sort['sortBy']).rank(
+            method='first',
+            ascending=sort['sortOrder'] == 'asc',
+            na_option='top' if sort.get('nullsFirst') else 'bottom',
+        )
+        result = result.iloc[np.argsort(ranks.to_numpy(), kind='stable')]
+
+    start, end = query.get('range') or (0, len(result))
+    return int(mask.sum()), result[columns].iloc[start:end].reset_index(drop=True)
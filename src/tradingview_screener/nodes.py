@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+__all__ = ['FilterNode', 'FrozenList', 'expression', 'freeze', 'operation', 'to_json']
+
+import json
+import math
+from json.encoder import encode_basestring_ascii
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, NoReturn
+
+
+def _dumps(obj: Any) -> str:
+    # the canonical form used everywhere: sorted keys and no whitespace
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _scalar_json(obj: Any) -> str:
+    # the scalars of a filter tree, without the overhead of a `json.dumps()` call for each
+    if type(obj) is str:
+        return encode_basestring_ascii(obj)
+    if obj is None:
+        return 'null'
+    if obj is True:
+        return 'true'
+    if obj is False:
+        return 'false'
+    if type(obj) is int or (type(obj) is float and math.isfinite(obj)):
+        return repr(obj)
+    if type(obj).__module__ == 'numpy' and hasattr(obj, 'item'):
+        return _scalar_json(obj.item())  # i.e. the values of `col(...).isin(df['name'].unique())`
+    return _dumps(obj)
+
+
+def _dict_json(obj: dict) -> str:
+    if not all(type(k) is str for k in obj):
+        return _dumps(obj)  # JSON keys are strings, let `json` convert them
+    items = sorted(obj.items())
+    return '{' + ','.join(f'{encode_basestring_ascii(k)}:{to_json(v)}' for k, v in items) + '}'
+
+
+def _immutable(self, *args, **kwargs) -> NoReturn:
+    raise TypeError(f'{type(self).__name__} is immutable')
+
+
+class FrozenList(list):
+    """
+    An immutable (and hashable) `list`, it's still a `list` so it compares equal to one, and
+    every JSON encoder serializes it as an array.
+    """
+
+    __slots__ = ('_hash', '_json')
+
+    def __init__(self, iterable=()) -> None:
+        super().__init__(iterable)
+        self._hash: int | None = None
+        self._json: str | None = None
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # pyright: ignore
+
+    def __hash__(self) -> int:  # pyright: ignore [reportIncompatibleVariableOverride]
+        if self._hash is None:
+            self._hash = hash(tuple(self))
+        return self._hash
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = '[' + ','.join(map(to_json, self)) + ']'
+        return self._json
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+    def __copy__(self) -> FrozenList:
+        return self
+
+    def __deepcopy__(self, memo) -> FrozenList:
+        return self
+
+
+class FilterNode(dict):
+    """
+    An immutable node of a filter tree (the dictionaries built by the `Column` operators, and by
+    `And()`/`Or()`).
+
+    It's a `dict`, so it can be used exactly like the `FilterOperationDict` and `OperationDict`
+    it replaces, but:
+    - it's hashable (structurally, so two equal trees have the same hash), so a filter can be used
+      as a cache key directly.
+    - its canonical JSON is computed once, and reused by every tree that contains it, so
+      re-serializing a big query only serializes what changed.
+    - copying it is free.
+    """
+
+    __slots__ = ('_hash', '_json')
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._hash: int | None = None
+        self._json: str | None = None
+
+    __setitem__ = __delitem__ = __ior__ = _immutable  # pyright: ignore
+    pop = popitem = clear = update = setdefault = _immutable  # pyright: ignore
+
+    def __hash__(self) -> int:  # pyright: ignore [reportIncompatibleVariableOverride]
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = _dict_json(self)
+        return self._json
+
+    def __reduce__(self):
+        return FilterNode, (dict(self),)
+
+    def __copy__(self) -> FilterNode:
+        return self
+
+    def __deepcopy__(self, memo) -> FilterNode:
+        return self
+
+
+def freeze(obj: Any) -> Any:
+    """
+    Recursively convert the dicts and lists of `obj` into `FilterNode`s and `FrozenList`s.
+
+    Objects that are already frozen are returned as-is, so it's cheap to call on the filters of
+    a query, which are usually already frozen.
+    """
+    if isinstance(obj, (FilterNode, FrozenList)):
+        return obj
+    if isinstance(obj, dict):
+        return FilterNode({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return FrozenList(map(freeze, obj))
+    return obj
+
+
+def to_json(obj: Any) -> str:
+    """
+    The canonical JSON of `obj` (sorted keys, no whitespace), the same as
+    `json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)`, except that the frozen
+    parts of `obj` reuse their cached JSON.
+    """
+    if isinstance(obj, (FilterNode, FrozenList)):
+        return obj.to_json()
+    if isinstance(obj, dict):
+        return _dict_json(obj)
+    if isinstance(obj, (list, tuple)):
+        return '[' + ','.join(map(to_json, obj)) + ']'
+    return _scalar_json(obj)
+
+
+_MAX_NODES = 4096
+_EXPRESSIONS: dict[tuple, FilterNode] = {}
+_OPERATIONS: dict[tuple, FilterNode] = {}
+
+
+def _key(obj: Any) -> Any:
+    # a hashable key for the `right` of an expression, the type is part of it since
+    # `1 == 1.0 == True`, and the JSON of these is different
+    if obj is None or isinstance(obj, (str, int, float)):
+        return type(obj), obj
+    if isinstance(obj, (list, tuple)):
+        return tuple(map(_key, obj))
+    raise TypeError
+
+
+def _remember(memo: dict[tuple, FilterNode], key: tuple, node: FilterNode) -> FilterNode:
+    if len(memo) >= _MAX_NODES:
+        memo.clear()
+    return memo.setdefault(key, node)
+
+
+def expression(left: str, operation: str, right: Any) -> FilterNode:
+    """
+    Build (or reuse) the `FilterNode` of a `FilterOperationDict`.
+
+    The same filters are built again on every Streamlit rerun, so the nodes are memoized, and a
+    rerun gets back the same objects, with their hash and JSON already computed.
+    """
+    try:
+        key = (left, operation, _key(right))
+    except TypeError:
+        right = freeze(right)
+        key = (left, operation, to_json(right))
+    node = _EXPRESSIONS.get(key)
+    if node is None:
+        node = FilterNode(left=left, operation=operation, right=freeze(right))
+        node = _remember(_EXPRESSIONS, key, node)
+    return node
+
+
+def operation(operator: str, expressions: Iterable[Any]) -> FilterNode:
+    """
+    Build (or reuse) the `FilterNode` of an `OperationDict` (what `And()` and `Or()` return).
+
+    The `FilterOperationDict` expressions are wrapped with `{'expression': expr}`, to know if it's
+    an instance of `FilterOperationDict` we simply check if it has the `left` key, which no other
+    TypedDict has.
+    """
+    expressions = [freeze(expr) for expr in expressions]
+    # the operands are usually memoized too (so they are the same objects on every rerun), and the
+    # node keeps them alive, so their ids can't be reused while it's in the memo
+    key = (operator, *map(id, expressions))
+    node = _OPERATIONS.get(key)
+    if node is None:
+        operands = FrozenList(
+            FilterNode(expression=expr) if 'left' in expr else expr for expr in expressions
+        )
+        node = FilterNode(operation=FilterNode(operator=operator, operands=operands))
+        node = _remember(_OPERATIONS, key, node)
+    return node
@@ -2,28 +2,40 @@ from __future__ import annotations
 
 __all__ = ['And', 'Or', 'Query']
 
+import asyncio
+import contextlib
+import copy
+import hashlib
 import pprint
-import requests
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
-import requests
-
+from tradingview_screener.codec import loads, loads_stream
 from tradingview_screener.column import Column
+from tradingview_screener.nodes import freeze, operation, to_json
+from tradingview_screener.singleflight import SCANNER_FLIGHT
+from tradingview_screener.transport import get_default_transport
 
 if TYPE_CHECKING:
     import pandas as pd
-    from typing import Literal, Any
+    from typing import Literal, Any, Callable, ContextManager, Iterator, Mapping
     from typing_extensions import Self
+    from tradingview_screener.transport import Transport
     from tradingview_screener.models import (
         QueryDict,
         SortByDict,
         ScreenerDict,
+        ScreenerRowDict,
         FilterOperationDict,
         OperationDict,
     )
 
 
 DEFAULT_RANGE = [0, 50]
+STREAM_MIN_ROWS = 5000
+"""Requests for at least this many rows have their response decoded while it's downloaded."""
+STREAM_CHUNK_SIZE = 1 << 16
 URL = 'https://scanner.tradingview.com/{market}/scan'
 HEADERS = {
     'authority': 'scanner.tradingview.com',
@@ -46,16 +58,9 @@ HEADERS = {
 def _impl_and_or_chaining(
     expressions: tuple[FilterOperationDict | OperationDict, ...], operator: Literal['and', 'or']
 ) -> OperationDict:
-    # we want to wrap all the `FilterOperationDict` expressions with `{'expression': expr}`,
-    # to know if it's an instance of `FilterOperationDict` we simply check if it has the `left` key,
-    # which no other TypedDict has.
-    lst = []
-    for expr in expressions:
-        if 'left' in expr:  # if isinstance(expr, FilterOperationDict): ...
-            lst.append({'expression': expr})
-        else:
-            lst.append(expr)
-    return {'operation': {'operator': operator, 'operands': lst}}
+    # the result is an immutable (and memoized) `FilterNode`, so nesting it in another
+    # `And()`/`Or()`, or in a query, reuses its hash and JSON instead of walking it again.
+    return operation(operator, expressions)  # pyright: ignore [reportReturnType]
 
 
 def And(*expressions: FilterOperationDict | OperationDict) -> OperationDict:
@@ -241,7 +246,7 @@ class Query:
      [50 rows x 5 columns])
     """
 
-    def __init__(self) -> None:
+    def __init__(self, transport: Transport | None = None) -> None:
         # noinspection PyTypeChecker
         self.query: QueryDict = {
             'markets': ['america'],
@@ -253,10 +258,16 @@ class Query:
             'range': DEFAULT_RANGE.copy(),
         }
         self.url = 'https://scanner.tradingview.com/america/scan'
+        # `None` means the process-wide transport from `get_default_transport()`
+        self.transport = transport
+        # field -> kind for `decode_scanner_data()`, `None` means every dtype is inferred
+        self.dtypes: Mapping[str, str] | None = None
+        # stage name -> context manager that times it, see `set_timer()`
+        self.timer: Callable[[str], ContextManager[Any]] | None = None
 
     def select(self, *columns: Column | str) -> Self:
         self.query['columns'] = [
-            col.name if isinstance(col, Column) else Column(col).name for col in columns
+            col.name if isinstance(col, Column) else sys.intern(str(col)) for col in columns
         ]
         return self
 
@@ -264,7 +275,8 @@ class Query:
         """
         Filter screener (expressions are joined with the AND operator)
         """
-        self.query['filter'] = list(expressions)  # convert tuple[dict] -> list[dict]
+        # convert tuple[dict] -> list[dict], the expressions themselves are immutable
+        self.query['filter'] = [freeze(expr) for expr in expressions]
         return self
 
     def where2(self, operation: OperationDict) -> Self:
@@ -325,7 +337,7 @@ class Query:
            - The `exchange` is one of `'UNISWAP3POLYGON', 'VERSEETH', 'a', 'fffffffff'`, **AND**
            - The `currency_id` is `'USD'`.
         """
-        self.query['filter2'] = operation['operation']
+        self.query['filter2'] = freeze(operation['operation'])
         return self
 
     def order_by(
@@ -569,6 +581,51 @@ class Query:
         self.query[key] = value
         return self
 
+    def set_schema(self, schema: Mapping[str, str] | None = None) -> Self:
+        """
+        Decode the columns with fixed dtypes instead of inferring them from the values.
+
+        By default the schema comes from the types of the field catalog (see
+        `tradingview_screener.catalog.FieldSchema`): numbers are always float64 (even when the
+        first rows are null), times are datetimes, bools are nullable `boolean`s, and the
+        low-cardinality text fields (`sector`, `industry`, `exchange`, `type`...) are
+        categoricals, which take a fraction of the memory of object columns on big scans.
+
+        >>> q = Query().select('name', 'sector', 'close').limit(20000).set_schema()
+        >>> count, df = q.get_scanner_data()
+        >>> df.dtypes
+        ticker      object
+        name        object
+        sector    category
+        close      float64
+        dtype: object
+
+        :param schema: field -> one of `FIELD_KINDS` (the fields it doesn't have are inferred).
+        """
+        if schema is None:
+            from tradingview_screener.catalog import FieldSchema
+
+            schema = FieldSchema()
+        self.dtypes = schema
+        return self
+
+    def set_timer(self, timer: Callable[[str], ContextManager[Any]] | None) -> Self:
+        """
+        Time the stages of the scans of this query: `timer(name)` is entered around each of them,
+        `http` (the request, up to the whole body for non-streamed responses), `decode` (the
+        JSON, which for streamed responses includes receiving the body) and `dataframe`.
+
+        >>> from src.performance_monitor import stage
+        >>> count, df = Query().select('close').set_timer(stage).get_scanner_data()
+
+        :param timer: i.e. `performance_monitor.stage`, `None` to stop timing.
+        """
+        self.timer = timer
+        return self
+
+    def _stage(self, name: str) -> ContextManager[Any]:
+        return self.timer(name) if self.timer else contextlib.nullcontext()
+
     def get_scanner_data_raw(self, **kwargs) -> ScreenerDict:
         """
         Perform a POST web-request and return the data from the API (dictionary).
@@ -576,6 +633,11 @@ class Query:
         Note that you can pass extra keyword-arguments that will be forwarded to `requests.post()`,
         this can be very useful if you want to pass your own headers/cookies.
 
+        The request is sent through `self.transport` (or the process-wide default transport), so
+        consecutive scans reuse the same pooled keep-alive connections. Identical requests made
+        concurrently (same `fingerprint()`) are coalesced into a single upstream call, see
+        `tradingview_screener.singleflight.SCANNER_FLIGHT`.
+
         >>> Query().select('close', 'volume').limit(5).get_scanner_data_raw()
         {
             'totalCount': 17559,
@@ -589,17 +651,42 @@ class Query:
         }
         """
         self.query.setdefault('range', DEFAULT_RANGE.copy())
+        # concurrent callers sending the same request share a single upstream call (and the same
+        # decoded dictionary, so it shouldn't be mutated)
+        return SCANNER_FLIGHT.do(
+            self.fingerprint(**kwargs), lambda: self._post(self.query, **kwargs)
+        )
 
+    def _post(self, query: QueryDict, **kwargs) -> ScreenerDict:
         kwargs.setdefault('headers', HEADERS)
         kwargs.setdefault('timeout', 20)
-        r = requests.post(self.url, json=self.query, **kwargs)
-
-        if not r.ok:
-            # add the body to the error message for debugging purposes
-            r.reason += f'\n Body: {r.text}\n'
-            r.raise_for_status()
-
-        return r.json()
+        start, end = query.get('range', DEFAULT_RANGE)
+        kwargs.setdefault('stream', end - start >= STREAM_MIN_ROWS)
+        transport = self.transport or get_default_transport()
+        with self._stage('http'):
+            # the same body as `json=query`, but the filters reuse their cached JSON
+            r = transport.post(self.url, data=to_json(query).encode(), **kwargs)
+
+            if not r.ok:
+                # add the body to the error message for debugging purposes
+                r.reason += f'\n Body: {r.text}\n'
+                r.raise_for_status()
+
+        with self._stage('decode'):
+            if kwargs['stream']:
+                # big responses (tens of MB for `.limit(20000)`) are decoded as they arrive
+                with r:
+                    return loads_stream(r.iter_content(STREAM_CHUNK_SIZE))  # pyright: ignore
+            # decode straight from the bytes (with orjson if it's installed)
+            return loads(r.content)
+
+    def _to_dataframe(self, data: list[ScreenerRowDict], start: int = 0) -> pd.DataFrame:
+        from tradingview_screener.decoder import decode_scanner_data
+
+        with self._stage('dataframe'):
+            return decode_scanner_data(
+                data, self.query.get('columns', []), dtypes=self.dtypes, start=start
+            )
 
     def get_scanner_data(self, **kwargs) -> tuple[int, pd.DataFrame]:
         """
@@ -617,22 +704,171 @@ class Query:
         :param kwargs: kwargs to pass to `requests.post()`
         :return: a tuple consisting of: (total_count, dataframe)
         """
-        import pandas as pd
-
         json_obj = self.get_scanner_data_raw(**kwargs)
-        rows_count = json_obj['totalCount']
-        data = json_obj['data']
+        return json_obj['totalCount'], self._to_dataframe(json_obj['data'])
 
-        df = pd.DataFrame(
-            data=([row['s'], *row['d']] for row in data),
-            columns=['ticker', *self.query.get('columns', ())],  # pyright: ignore [reportArgumentType]
-        )
-        return rows_count, df
+    def get_scanner_data_local(
+        self, universe: pd.DataFrame, fallback: bool = True, **kwargs
+    ) -> tuple[int, pd.DataFrame]:
+        """
+        Evaluate the query on a local DataFrame instead of the scanner API (see
+        `tradingview_screener.local.scan_local()`), which takes milliseconds instead of a round
+        trip, so it's ideal to re-run a query while tweaking its filters.
+
+        `universe` must contain every row of the query's markets, and every field used by the
+        query (in `columns`, the filters and the sort).
+
+        >>> count, universe = Query().select(*fields).limit(100_000).get_scanner_data()
+        >>> Query().select('name', 'close').where(col('close') > 5).get_scanner_data_local(universe)
+
+        :param universe: a snapshot of the market, with a `ticker` column and one column per field.
+        :param fallback: when the query can't be evaluated locally (i.e. `crosses()`, or a field
+            that isn't in `universe`), send it to the scanner API, instead of raising
+            `UnsupportedOperationError`.
+        :param kwargs: kwargs to pass to `get_scanner_data()` when falling back.
+        """
+        from tradingview_screener.local import UnsupportedOperationError, scan_local
+
+        try:
+            return scan_local(universe, self.query)
+        except UnsupportedOperationError:
+            if not fallback:
+                raise
+        return self.get_scanner_data(**kwargs)
+
+    def _iter_raw_pages(
+        self, page_size: int, prefetch: bool, **kwargs
+    ) -> Iterator[tuple[int, ScreenerDict]]:
+        if page_size < 1:
+            raise ValueError(f'page_size must be at least 1, got {page_size}')
+        start, end = self.query.get('range', DEFAULT_RANGE)
+
+        def fetch(offset: int) -> ScreenerDict:
+            # shallow copy, so we don't mutate the range of `self.query`
+            query: QueryDict = {**self.query, 'range': [offset, min(offset + page_size, end)]}
+            return self._post(query, **kwargs)
+
+        if not prefetch:
+            offset = start
+            while offset < end:
+                page = fetch(offset)
+                yield offset, page
+                end = min(end, page['totalCount'])
+                offset += page_size
+            return
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='iter_pages')
+        offset = start
+        future = executor.submit(fetch, offset) if offset < end else None
+        try:
+            while future is not None:
+                page = future.result()
+                end = min(end, page['totalCount'])
+                # request the next page before handing this one to the caller
+                next_offset = offset + page_size
+                future = executor.submit(fetch, next_offset) if next_offset < end else None
+                yield offset, page
+                offset = next_offset
+        finally:
+            # don't block if the caller stopped early while a prefetch is still in flight
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_pages(
+        self, page_size: int = 1000, prefetch: bool = True, **kwargs
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Walk the `range` of the query one page at a time, yielding a DataFrame for each page.
+
+        Instead of fetching one giant response (i.e. `.limit(20000)`) and keeping it in memory
+        before building the DataFrame, the range is split into requests of `page_size` rows, and
+        it stops as soon as `totalCount` is reached. With `prefetch=True` the next page is
+        requested in a background thread while the caller is processing the current one.
+
+        The index of each chunk continues from the previous one, so concatenating all the chunks
+        gives the same DataFrame as `get_scanner_data()`.
+
+        Examples:
+
+        >>> query = Query().set_markets('india').select('name', 'close').limit(100_000)
+        >>> for df in query.iter_pages(page_size=5000):
+        ...     render(df)
+
+        :param page_size: number of rows per request.
+        :param prefetch: fetch the next page in the background while the current one is consumed.
+        :param kwargs: kwargs to pass to `requests.post()`
+        :return: a generator of DataFrames
+        """
+        for offset, page in self._iter_raw_pages(page_size, prefetch, **kwargs):
+            yield self._to_dataframe(page['data'], start=offset)
+
+    def iter_rows(
+        self, page_size: int = 1000, prefetch: bool = True, **kwargs
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Like `iter_pages()`, but yield one dictionary per row, i.e.
+        `{'ticker': 'NSE:RELIANCE', 'name': 'RELIANCE', 'close': 2939.9}`.
+        """
+        columns = ['ticker', *self.query.get('columns', ())]
+        for _, page in self._iter_raw_pages(page_size, prefetch, **kwargs):
+            for row in page['data']:
+                yield dict(zip(columns, [row['s'], *row['d']]))
+
+    async def aget_scanner_data_raw(self, **kwargs) -> ScreenerDict:
+        """
+        Async version of `get_scanner_data_raw()`.
+
+        The request runs in a worker thread through the same pooled `Transport`, so many scans
+        can be awaited concurrently (see `tradingview_screener.aio.gather_scans()`).
+        """
+        return await asyncio.to_thread(self.get_scanner_data_raw, **kwargs)
+
+    async def aget_scanner_data(self, **kwargs) -> tuple[int, pd.DataFrame]:
+        """
+        Async version of `get_scanner_data()`.
+
+        >>> count, df = await Query().select('close').aget_scanner_data()
+        """
+        return await asyncio.to_thread(self.get_scanner_data, **kwargs)
 
     def copy(self) -> Query:
-        new = Query()
-        new.query = self.query.copy()
-        return self
+        new = Query(transport=self.transport)
+        # deep copy, otherwise mutating i.e. the `range` list of the copy would change ours too
+        new.query = copy.deepcopy(self.query)
+        new.url = self.url
+        new.dtypes = self.dtypes
+        new.timer = self.timer
+        return new
+
+    def fingerprint(self, **kwargs) -> str:
+        """
+        A canonical hash of the query and the URL it's sent to.
+
+        Two queries that would send the same request have the same fingerprint (regardless of the
+        order in which the keys were set), so it can be used as a cache key.
+
+        >>> Query().select('close').fingerprint() == Query().select('close').fingerprint()
+        True
+
+        :param kwargs: the kwargs passed to `requests.post()` (i.e. cookies, which switch
+        between delayed and real-time data), they are hashed along with the query.
+        """
+        # only what is sent: the decoding options (`dtypes`) don't change the response, so the
+        # identical requests of queries with different schemas are still coalesced
+        request: dict[str, Any] = {'url': self.url, 'query': self.query, 'kwargs': kwargs}
+        return hashlib.sha256(to_json(request).encode()).hexdigest()
+
+    def to_json(self) -> str:
+        """
+        The JSON body of the request, in canonical form (sorted keys, no whitespace).
+
+        The filters are immutable and cache their own JSON, so serializing the same filters again
+        (i.e. on every Streamlit rerun, or in `fingerprint()`) only serializes the rest of the
+        query.
+
+        >>> Query().select('close').limit(5).to_json()
+        '{"columns":["close"],"markets":["america"],"options":{"lang":"en"},"range":[0,5],...}'
+        """
+        return to_json(self.query)
 
     def __repr__(self) -> str:
         return f'< {pprint.pformat(self.query)}\n url={self.url!r} >'
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+__all__ = [
+    'TokenBucket',
+    'RateLimiter',
+    'request_with_backoff',
+    'get_default_rate_limiter',
+    'DEFAULT_HOST_LIMITS',
+]
+
+import email.utils
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import requests
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Mapping, Optional
+
+
+DEFAULT_HOST_LIMITS: dict[str, tuple[float, int]] = {
+    # host: (requests per second, burst)
+    'scanner.tradingview.com': (5.0, 10),
+    'news-mediator.tradingview.com': (2.0, 5),
+    'api.bseindia.com': (4.0, 8),
+    'www.bseindia.com': (2.0, 4),
+    'www.screener.in': (1.0, 3),
+}
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket: `rate` requests per second on average, with bursts of up to
+    `burst` requests.
+
+    The rate is adaptive: `throttle()` halves it (i.e. after a 429), and every successful
+    request moves it back towards the configured rate, so we converge on the highest rate the
+    server tolerates instead of sleeping a fixed amount before every request.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request can be made, and return the number of seconds we waited.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            self.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """
+        Don't hand out any token for the next `seconds` (i.e. to honor `Retry-After`).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def throttle(self) -> None:
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(self.clock())
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def __repr__(self) -> str:
+        return (
+            f'< TokenBucket(rate={self.rate:g}/s, max_rate={self.max_rate:g}/s, '
+            f'burst={self.burst}) >'
+        )
+
+
+class RateLimiter:
+    """
+    A registry of `TokenBucket`s, one per host, shared by all the HTTP clients of the process.
+
+    Hosts without a configured limit are not throttled (unless `default` is given).
+
+    Examples:
+
+    >>> limiter = RateLimiter({'api.bseindia.com': (4, 8)})
+    >>> limiter.acquire('https://api.bseindia.com/BseIndiaAPI/api/AnnSubCategoryGetData/w')
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, tuple[float, int]] = DEFAULT_HOST_LIMITS,
+        default: Optional[tuple[float, int]] = None,
+    ) -> None:
+        self.limits = dict(limits)
+        self.default = default
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host: str, rate: float, burst: int = 1) -> None:
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def bucket(self, url: str) -> Optional[TokenBucket]:
+        host = urlsplit(url).hostname or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            limit = self.limits.get(host, self.default)
+            if limit is None:
+                return None
+            with self._lock:
+                bucket = self._buckets.setdefault(host, TokenBucket(*limit))
+        return bucket
+
+    def acquire(self, url: str) -> float:
+        bucket = self.bucket(url)
+        return bucket.acquire() if bucket is not None else 0.0
+
+    def __repr__(self) -> str:
+        return f'< RateLimiter(hosts={sorted(self.limits)}) >'
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the `Retry-After` header, which is either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter: a random delay between 0 and `base * 2**attempt`.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def request_with_backoff(
+    session: Optional[requests.Session],
+    method: str,
+    url: str,
+    limiter: Optional[RateLimiter] = None,
+    max_retries: int = 3,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    retry_timeouts: bool = False,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the per-host rate limiter, retrying with backoff on 429/5xx
+    responses and on connection errors (including connect timeouts).
+
+    The delay honors the `Retry-After` header when present (otherwise exponential backoff with
+    jitter), and it's applied to the whole host bucket, so that every other thread talking to
+    the same host backs off too. A 429 also halves the rate of the host.
+
+    The last response is returned as-is (even if its status is not ok), so the caller can still
+    decide how to handle it.
+
+    :param session: the session to send the request with (or None to use `requests.request`).
+    :param limiter: the rate limiter, defaults to `get_default_rate_limiter()`.
+    :param max_retries: number of retries after the first attempt.
+    :param retry_timeouts: also retry read timeouts. Off by default, as every retry waits for
+        the whole `timeout` again (a caller blocked for `timeout * (max_retries + 1)`).
+    :param kwargs: forwarded to `session.request()`.
+    """
+    limiter = limiter or get_default_rate_limiter()
+    bucket = limiter.bucket(url)
+    send = session.request if session is not None else requests.request
+    # `ConnectTimeout` is a `ConnectionError`: only the read timeouts are opt-in
+    retried = (requests.ConnectionError, requests.Timeout) if retry_timeouts else requests.ConnectionError
+
+    for attempt in range(max_retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        try:
+            r = send(method, url, **kwargs)
+        except retried:
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+            continue
+
+        if r.status_code not in RETRY_STATUSES or attempt == max_retries:
+            if bucket is not None and r.ok:
+                bucket.recover()
+            return r
+
+        delay = parse_retry_after(r.headers.get('Retry-After'))
+        if delay is None:
+            delay = backoff_delay(attempt, base_delay, max_delay)
+        delay = min(delay, max_delay)
+        r.close()
+        if bucket is None:
+            time.sleep(delay)
+        else:
+            if r.status_code == 429:
+                bucket.throttle()
+            bucket.pause(delay)  # the next `acquire()` waits it out
+    raise AssertionError('unreachable')
+
+
+_default_rate_limiter: Optional[RateLimiter] = None
+_default_rate_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide `RateLimiter` (created lazily with `DEFAULT_HOST_LIMITS`).
+    """
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        with _default_rate_limiter_lock:
+            if _default_rate_limiter is None:
+                _default_rate_limiter = RateLimiter()
+    return _default_rate_limiter
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+__all__ = ['SingleFlight', 'SCANNER_FLIGHT']
+
+import threading
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from typing import Callable, Optional
+
+T = TypeVar('T')
+
+
+class _Call(Generic[T]):
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesce concurrent calls that share the same key into a single execution.
+
+    The first caller of a key runs the function, and every other caller that arrives while it's
+    still running waits for it and receives the same result (or the same exception), so N
+    identical concurrent scans cost a single upstream request.
+
+    Counters:
+    - `hits`: number of calls made through `do()`.
+    - `coalesced`: calls that waited on a request started by someone else.
+    - `upstream`: calls that actually ran the function.
+
+    Examples:
+
+    >>> flight = SingleFlight()
+    >>> flight.do(query.fingerprint(), query.get_scanner_data_raw)
+    """
+
+    def __init__(self) -> None:
+        self.stats = {'hits': 0, 'coalesced': 0, 'upstream': 0}
+        self._calls: dict[str, _Call[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            self.stats['hits'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats['upstream'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # pyright: ignore [reportReturnType]
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def __repr__(self) -> str:
+        return f'< SingleFlight(in_flight={self.in_flight()}, stats={self.stats}) >'
+
+
+SCANNER_FLIGHT: SingleFlight = SingleFlight()
+"""Used by `Query.get_scanner_data_raw()` to coalesce identical concurrent scans."""
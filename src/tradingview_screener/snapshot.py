@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+__all__ = ['UniverseSnapshot', 'get_universe_snapshot', 'UNIVERSE_COLUMNS']
+
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from tradingview_screener.cache import get_default_cache
+from tradingview_screener.local import UnsupportedOperationError, scan_local
+from tradingview_screener.query import Query
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Mapping, Optional
+    import pandas as pd
+    from tradingview_screener.transport import Transport
+
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_COLUMNS = (
+    'name',
+    'description',
+    'exchange',
+    'type',
+    'typespecs',
+    'is_primary',
+    'sector',
+    'industry',
+    'close',
+    'open',
+    'high',
+    'low',
+    'change',
+    'change|1W',
+    'change|1M',
+    'volume',
+    'Value.Traded',
+    'relative_volume_10d_calc',
+    'average_volume_10d_calc',
+    'average_volume_30d_calc',
+    'average_volume_60d_calc',
+    'average_volume_90d_calc',
+    'market_cap_basic',
+    'price_52_week_low',
+    'price_52_week_high',
+    'Perf.W',
+    'Perf.1M',
+    'Perf.3M',
+    'Perf.6M',
+    'Perf.YTD',
+    'Perf.Y',
+    'Perf.5Y',
+    'Perf.10Y',
+    'Perf.All',
+    'EMA200',
+    'EMA200|1M',
+    'EMA200|3M',
+    'EMA200|6M',
+    'SMA200',
+    'SMA200|1M',
+    'SMA200|3M',
+    'SMA200|6M',
+)
+"""The union of the fields used by the pages that scan a whole market."""
+
+
+def _concat_pages(pages: list[pd.DataFrame]) -> pd.DataFrame:
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    df = pd.concat(pages)
+    # the categories of each page differ, which `concat()` turns back into strings
+    for i, dtype in enumerate(pages[0].dtypes):
+        if isinstance(dtype, pd.CategoricalDtype) and len(pages) > 1:
+            parts = [page.iloc[:, i] for page in pages]
+            df.isetitem(i, union_categoricals(parts, sort_categories=True))
+    return df
+
+
+class UniverseSnapshot:
+    """
+    A periodically refreshed copy of every row of a market, with a wide set of columns, that
+    answers `select/where/order_by/limit` queries locally (see `tradingview_screener.local`).
+
+    Instead of each page (and each user) scanning the same market with a slightly different set
+    of columns, the whole universe is downloaded once per `ttl`, one page at a time, and every
+    query that only uses fields of the snapshot is evaluated in memory. Queries that can't be
+    evaluated locally (other markets, unknown fields, `crosses()`, etc.) go to the scanner API
+    through the process-wide `ScanCache`.
+
+    Like the `ScanCache`, an expired snapshot keeps being served while a background thread
+    downloads a fresh one, for at most `stale_ttl` more seconds. Past it (i.e. when the refreshes
+    keep failing), it's downloaded in the foreground, and if that fails too, the queries go to the
+    scanner API.
+
+    The columns are decoded with `schema` (see `Query.set_schema()`), and so are the queries that
+    go to the scanner API without a schema of their own, so both give the same dtypes.
+
+    When `path` is given (and pyarrow is installed), each snapshot is also written to a Parquet
+    file, which is memory-mapped on startup if it's still fresh, so a restarted process doesn't
+    have to scan the market again.
+
+    Examples:
+
+    >>> snapshot = get_universe_snapshot('india')
+    >>> count, df = snapshot.get_scanner_data(
+    ...     Query().set_markets('india').select('name', 'close').where(col('close') > 100)
+    ... )
+
+    :param market: the market to download, i.e. `india`.
+    :param columns: the fields of the snapshot.
+    :param ttl: seconds after which the snapshot is refreshed.
+    :param stale_ttl: seconds the snapshot can be served stale while it's being refreshed.
+    :param page_size: rows per request while downloading the snapshot.
+    :param max_rows: upper bound on the size of the universe.
+    :param path: a Parquet file to persist the snapshot to.
+    :param transport: the transport used to download the snapshot.
+    :param schema: field -> kind, defaults to a `FieldSchema` of the field catalog.
+    """
+
+    def __init__(
+        self,
+        market: str,
+        columns: Iterable[str] = UNIVERSE_COLUMNS,
+        ttl: float = 60,
+        stale_ttl: float = 300,
+        page_size: int = 5000,
+        max_rows: int = 100_000,
+        path: Optional[str | os.PathLike] = None,
+        transport: Optional[Transport] = None,
+        clock: Callable[[], float] = time.time,
+        schema: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        if schema is None:
+            from tradingview_screener.catalog import FieldSchema
+
+            schema = FieldSchema()
+        self.market = market
+        self.columns = list(dict.fromkeys(columns))
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.path = path
+        self.transport = transport
+        self.clock = clock
+        self.schema = schema
+        self.stats = {'local': 0, 'remote': 0, 'refreshes': 0}
+        self._df: Optional[pd.DataFrame] = None
+        self._fetched_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        if path is not None:
+            self._load()
+
+    @property
+    def fetched_at(self) -> float:
+        return self._fetched_at
+
+    def _query(self) -> Query:
+        return (
+            Query(transport=self.transport)
+            .set_markets(self.market)
+            .select(*self.columns)
+            .order_by('Value.Traded', ascending=False)
+            .limit(self.max_rows)
+            .set_schema(self.schema)
+        )
+
+    def refresh(self) -> pd.DataFrame:
+        """
+        Download the whole universe (paginated), and replace the current snapshot.
+        """
+        import pandas as pd
+
+        with self._refresh_lock:
+            pages = list(self._query().iter_pages(page_size=self.page_size))
+            df = _concat_pages(pages) if pages else pd.DataFrame(columns=['ticker', *self.columns])
+            with self._lock:
+                self._df = df
+                self._fetched_at = self.clock()
+                self.stats['refreshes'] += 1
+            self._save(df)
+            return df
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            # keep serving the current snapshot, the next query will try again
+            logger.exception('Failed to refresh the %s universe snapshot', self.market)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def frame(self) -> pd.DataFrame:
+        """
+        The current snapshot, downloading it first if there is none yet.
+
+        The DataFrame is shared, so it must not be modified.
+        """
+        with self._lock:
+            df = self._servable()
+            if df is not None and self.clock() - self._fetched_at >= self.ttl:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh_in_background,
+                        name=f'UniverseSnapshot-{self.market}',
+                        daemon=True,
+                    ).start()
+        if df is not None:
+            return df
+        with self._refresh_lock:
+            # another thread may have downloaded it while we were waiting
+            with self._lock:
+                df = self._servable()
+            return df if df is not None else self.refresh()
+
+    def _servable(self) -> Optional[pd.DataFrame]:
+        # the snapshot, unless there is none or it's been stale for longer than `stale_ttl`
+        if self._df is None or self.clock() - self._fetched_at >= self.ttl + self.stale_ttl:
+            return None
+        return self._df
+
+    def covers(self, query: Query) -> bool:
+        """
+        Whether the query is on the market of the snapshot, and only uses its fields.
+
+        It doesn't look at the operations, those are checked when the query is evaluated.
+        """
+        q = query.query
+        if q.get('markets') != [self.market]:
+            return False
+        fields = set(q.get('columns', []))
+        if 'sort' in q:
+            fields.add(q['sort']['sortBy'])
+        for expr in q.get('filter') or []:
+            fields.add(expr['left'])
+        available = {'ticker', *self.columns}
+        return fields <= available
+
+    def get_scanner_data(self, query: Query, **kwargs) -> tuple[int, pd.DataFrame]:
+        """
+        Same as `query.get_scanner_data(**kwargs)`, but evaluated on the snapshot when possible.
+        """
+        if self.covers(query):
+            try:
+                df = self.frame()
+            except Exception:
+                # the snapshot couldn't be downloaded, the query alone may still go through
+                logger.exception('Failed to download the %s universe snapshot', self.market)
+                df = None
+            if df is not None:
+                try:
+                    result = scan_local(df, query.query)
+                except UnsupportedOperationError as e:
+                    logger.debug('Scanning %s remotely: %s', self.market, e)
+                else:
+                    with self._lock:
+                        self.stats['local'] += 1
+                    return result
+        with self._lock:
+            self.stats['remote'] += 1
+        if query.dtypes is None:
+            query = query.copy().set_schema(self.schema)
+        return get_default_cache().get_scanner_data(query, **kwargs)
+
+    def _save(self, df: pd.DataFrame) -> None:
+        if self.path is None:
+            return
+        try:
+            tmp = f'{os.fspath(self.path)}.tmp'
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, self.path)
+        except ImportError:
+            logger.warning('pyarrow is not installed, the universe snapshot is not persisted')
+        except OSError:
+            logger.exception('Failed to write the universe snapshot to %s', self.path)
+
+    def _load(self) -> None:
+        import pandas as pd
+
+        try:
+            fetched_at = os.path.getmtime(self.path)  # pyright: ignore [reportArgumentType]
+            if self.clock() - fetched_at >= self.ttl:
+                return
+            df = pd.read_parquet(self.path, memory_map=True)
+        except (ImportError, OSError, ValueError):
+            return
+        if list(df.columns) == ['ticker', *self.columns]:
+            self._df = df
+            self._fetched_at = fetched_at
+
+    def __repr__(self) -> str:
+        rows = 0 if self._df is None else len(self._df)
+        return f'< UniverseSnapshot(market={self.market!r}, rows={rows}, stats={self.stats}) >'
+
+
+_snapshots: dict[str, UniverseSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_universe_snapshot(market: str) -> UniverseSnapshot:
+    """
+    Return the process-wide `UniverseSnapshot` of a market (created lazily), so that all the
+    pages and sessions running in the same process share it.
+    """
+    snapshot = _snapshots.get(market)
+    if snapshot is None:
+        with _snapshots_lock:
+            snapshot = _snapshots.setdefault(market, UniverseSnapshot(market))
+    return snapshot
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+__all__ = ['Transport', 'get_default_transport', 'set_default_transport']
+
+import threading
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tradingview_screener.ratelimit import request_with_backoff
+
+if TYPE_CHECKING:
+    from typing import Any, Optional
+    from tradingview_screener.ratelimit import RateLimiter
+
+
+def _accept_encoding() -> str:
+    # `urllib3` only decodes brotli bodies if one of these packages is installed, so we only
+    # advertise `br` when we are actually able to decode it.
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        return 'gzip, deflate, br'
+    return 'gzip, deflate'
+
+
+ACCEPT_ENCODING = _accept_encoding()
+
+
+class Transport:
+    """
+    A pooled, keep-alive HTTP transport used by `Query` to talk to the scanner API.
+
+    Calling `requests.post()` directly opens a new TCP (and TLS) connection for every scan. A
+    `Transport` keeps a single `HTTPAdapter` connection pool that is shared by all the threads of
+    the process, so repeated scans (Streamlit reruns, loops over exchanges, etc.) reuse warm
+    connections.
+
+    `requests.Session` is not thread-safe (its cookie-jar gets mutated on every response), so each
+    thread gets its own lightweight session, but all the sessions are mounted on the same adapter,
+    which is where the (thread-safe) connection pool lives.
+
+    Every request goes through a per-host `RateLimiter` (the process-wide one by default), and
+    429/5xx responses are retried with backoff (see `request_with_backoff()`).
+
+    Examples:
+
+    >>> from tradingview_screener import Query, Transport
+    >>> transport = Transport(pool_maxsize=64)
+    >>> Query(transport=transport).get_scanner_data()
+
+    Or replace the process-wide default that every `Query` uses:
+    >>> set_default_transport(Transport(pool_maxsize=64))
+
+    :param pool_connections: number of distinct hosts to keep a connection pool for.
+    :param pool_maxsize: maximum number of connections to keep open per host.
+    :param max_retries: retries on connection errors (passed to `HTTPAdapter`).
+    :param keep_alive: if False, send `Connection: close` so sockets are not reused.
+    :param headers: extra headers sent with every request.
+    :param rate_limiter: defaults to `get_default_rate_limiter()`.
+    :param backoff_retries: retries on 429/5xx responses and connection errors.
+    :param retry_timeouts: also retry read timeouts (off by default, since each retry waits for
+        the whole timeout again).
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        max_retries: int = 0,
+        keep_alive: bool = True,
+        headers: Optional[dict[str, str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        backoff_retries: int = 3,
+        retry_timeouts: bool = False,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.rate_limiter = rate_limiter
+        self.backoff_retries = backoff_retries
+        self.retry_timeouts = retry_timeouts
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
+        if headers:
+            self.headers.update(headers)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The `requests.Session` of the current thread (created on first use).
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        return request_with_backoff(
+            self.session,
+            method,
+            url,
+            limiter=self.rate_limiter,
+            max_retries=self.backoff_retries,
+            retry_timeouts=self.retry_timeouts,
+            **kwargs,
+        )
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """
+        Close all the pooled connections (the transport can still be used afterwards).
+        """
+        self.adapter.close()
+
+    def __enter__(self) -> Transport:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f'< Transport(pool_connections={self.pool_connections}, '
+            f'pool_maxsize={self.pool_maxsize}, keep_alive={self.keep_alive}) >'
+        )
+
+
+_default_transport: Optional[Transport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> Transport:
+    """
+    Return the process-wide `Transport` (created lazily), which is used by every `Query` that
+    wasn't given its own transport.
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+    return _default_transport
+
+
+def set_default_transport(transport: Transport) -> None:
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -1,10 +1,13 @@
 import streamlit as st
 import inspect
 from src.tradingview_screener import Query, col
+from src.tradingview_screener.catalog import get_field_catalog
+from src.performance_monitor import render_debug_panel, serve_metrics_from_env, set_page, stage
+from src.cache_registry import enable_copy_on_write, get_registry, render_usage_panel
+from src.price_bands import PriceBandTable, get_price_bands
 import pandas as pd
 import io
 import requests
-from bs4 import BeautifulSoup
 import subprocess
 from functools import lru_cache
 import numpy as np
@@ -21,6 +24,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Start with sidebar collapsed
 )
 
+# Share the cached DataFrames between the sessions without copying their data
+enable_copy_on_write()
+# Prometheus metrics of the stages on PERF_METRICS_PORT, if set (once per process)
+serve_metrics_from_env()
+
 # Initialize session state for page navigation if not exists
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'Home'
@@ -259,6 +267,7 @@ selected_tab = st.radio(
 )
 
 st.session_state.selected_tab = selected_tab
+set_page(selected_tab)
 
 if selected_tab == "📝 Build Query":
     # Build Query tab content
@@ -325,133 +334,40 @@ if selected_tab == "📝 Build Query":
             st.warning("⚠️ Please select at least one instrument type to continue")
             st.stop()
 
-        # 2. Fetch fields & exchanges dynamically
-        @st.cache_data(show_spinner=False, ttl=60*60)
-        def fetch_fields_for_market(market_code: str, instrument_type: str = 'stock') -> tuple:
-            """Fetch and cache fields for a market"""
-            INSTRUMENT_FIELD_URLS = {
-                'stock': 'stocks',
-                'dr': 'stocks',
-                'fund': 'stocks',
-                'crypto': 'crypto',
-                'forex': 'forex',
-                'futures': 'futures',
-                'bond': 'bonds',
-                'index': 'stocks',
-                'economic': 'economics2',
-                'cfd': 'cfd',
-                'coin': 'crypto',
-                'option': 'options'
-            }
+        # 2. Fields & exchanges come from the field catalog shipped with the package (loaded
+        # from disk, it's refreshed in a background thread only when it gets stale)
+        catalog = get_field_catalog()
+        if catalog.is_seed:
+            # never built from the docs: download the full list once, like before the catalog
+            with st.spinner("Loading the fields..."):
+                catalog.ensure_built()
 
-            url_suffix = INSTRUMENT_FIELD_URLS.get(instrument_type, 'stocks')
-            url = f"https://shner-elmo.github.io/TradingView-Screener/fields/{url_suffix}.html"
-
-            try:
-                with st.spinner(f"🔄 Fetching fields for {INSTRUMENT_TYPES[instrument_type]}..."):
-                    resp = requests.get(url, timeout=5)
-                    resp.raise_for_status()
-                    content = resp.text
-
-                    fields = []
-                    exchanges = set()
-                    # If the content is a plain text list (not HTML table)
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if line.startswith("- "):
-                            field_name = line[2:]
-                            if field_name:
-                                fields.append({
-                                    "name": field_name,
-                                    "display": field_name,
-                                    "type": "string",  # Default type
-                                })
-                    if not fields:
-                        # fallback to old HTML parsing in case the format changes
-                        soup = BeautifulSoup(content, "html.parser")
-                        for row in soup.select("tr"):
-                            cols = row.find_all("td")
-                            if len(cols) >= 3:
-                                field_name = cols[0].text.strip()
-                                display_name = cols[1].text.strip()
-                                field_type = cols[2].text.strip()
-                                if not all([field_name, display_name, field_type]):
-                                    continue
-                                fields.append({
-                                    "name": field_name,
-                                    "display": display_name,
-                                    "type": field_type,
-                                })
-                                if len(cols) > 3:
-                                    exchanges.update([e.strip() for e in cols[3].text.split(",") if e.strip()])
-                    if not fields:
-                        basic_fields = [
-                            {"name": "name", "display": "Name", "type": "string"},
-                            {"name": "description", "display": "Description", "type": "string"},
-                            {"name": "type", "display": "Type", "type": "string"},
-                            {"name": "exchange", "display": "Exchange", "type": "string"},
-                            {"name": "close", "display": "Close", "type": "float"},
-                            {"name": "volume", "display": "Volume", "type": "float"},
-                        ]
-                        st.warning(f"⚠️ No fields found for {INSTRUMENT_TYPES[instrument_type]}, using basic fields")
-                        return basic_fields, []
-
-                    st.success(f"✅ Successfully loaded {len(fields)} fields for {INSTRUMENT_TYPES[instrument_type]}")
-                    return fields, sorted(list(exchanges))
-
-            except Exception as e:
-                st.error(f"❌ Error fetching fields: {str(e)}")
-                return [
-                    {"name": "name", "display": "Name", "type": "string"},
-                    {"name": "description", "display": "Description", "type": "string"},
-                    {"name": "type", "display": "Type", "type": "string"},
-                    {"name": "exchange", "display": "Exchange", "type": "string"},
-                    {"name": "close", "display": "Close", "type": "float"},
-                    {"name": "volume", "display": "Volume", "type": "float"},
-                ], []
-
-        # Loading animation for field fetching
+        def fetch_fields_for_market(market_code: str, instrument_type: str = 'stock') -> tuple:
+            """Get the fields of an instrument type and the exchanges of a market"""
+            catalog.refresh_in_background()
+            fields = [
+                {"name": f.name, "display": f.display, "type": f.type}
+                for f in catalog.fields(instrument_type)
+            ]
+            return fields, catalog.exchanges(market_code)
+
+        # an in-memory lookup, merged in the order of the selection, so the options don't reorder
+        # between reruns
         with st.container():
-            if USE_ANIMATIONS and LOTTIE_AVAILABLE and lottie_loading:
-                loading_placeholder = st.empty()
-                with loading_placeholder.container():
-                    st.markdown(
-                        """
-                        <div style="height:200px; display:flex; align-items:center; justify-content:center; 
-                        background:rgba(72,149,239,0.1); border-radius:8px; margin:10px 0;">
-                            <div style="text-align:center;">
-                                <div style="font-size:24px; margin-bottom:10px;">🔄</div>
-                                <div>Loading data fields, please wait...</div>
-                            </div>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
-                    st.info("Loading data fields, please wait...")
-            else:
-                loading_placeholder = st.empty()
-
-            try:
-                all_fields = []
-                all_exchanges = set()
-                for instrument_type in selected_types:
-                    type_fields, type_exchanges = fetch_fields_for_market(market_code, instrument_type)
-                    for field in type_fields:
-                        if field not in all_fields:
-                            field["display"] = f"[{INSTRUMENT_TYPES[instrument_type]}] {field['display']}"
-                            all_fields.append(field)
-                    all_exchanges.update(type_exchanges)
-
-                seen = set()
-                fields = []
-                for field in all_fields:
+            all_exchanges = set()
+            seen = set()
+            fields = []
+            for instrument_type in selected_types:
+                type_fields, type_exchanges = fetch_fields_for_market(market_code, instrument_type)
+                all_exchanges.update(type_exchanges)
+                for field in type_fields:
                     if field["name"] not in seen:
                         seen.add(field["name"])
+                        field["display"] = f"[{INSTRUMENT_TYPES[instrument_type]}] {field['display']}"
                         fields.append(field)
 
-                loading_placeholder.empty()
-            except Exception as e:
-                st.error(f"❌ Error fetching fields: {str(e)}")
+            if not fields:
+                st.error("❌ No fields found, showing the basic ones")
                 fields = [
                     {"name": "name", "display": "Name", "type": "string"},
                     {"name": "description", "display": "Description", "type": "string"},
@@ -460,7 +376,6 @@ if selected_tab == "📝 Build Query":
                     {"name": "close", "display": "Close", "type": "float"},
                     {"name": "volume", "display": "Volume", "type": "float"},
                 ]
-                loading_placeholder.empty()
 
         # 3. Exchange selection
         HARDCODED_EXCHANGES = {
@@ -496,12 +411,30 @@ if selected_tab == "📝 Build Query":
 
         with column_col:
             name_to_field = {f["name"]: f for f in fields}
+
+            def field_label(name):
+                # the type is unknown ('') for the fields of the untyped docs
+                field = name_to_field[name]
+                return f"{field['display']} [{field['type']}]" if field['type'] else field['display']
+
             def_field_names = ['name', 'description', 'type', 'exchange', 'close', 'volume']
+            field_search = st.text_input(
+                "🔎 Search fields",
+                key="field_search",
+                placeholder="e.g. relative volume, perf, eps growth",
+                help="Prefix and fuzzy search on the field names and descriptions"
+            )
+            column_options = [f["name"] for f in fields]
+            if field_search:
+                matches = {f.name for f in get_field_catalog().search(field_search, limit=50)}
+                already_selected = st.session_state.get("data_columns_multiselect", def_field_names)
+                column_options = [n for n in column_options if n in matches or n in already_selected]
             selected_instruments = st.multiselect(
                 "📊 Select Data Columns",
-                options=[f["name"] for f in fields],
+                options=column_options,
                 default=[name for name in def_field_names if name in name_to_field],
-                format_func=lambda n: f"{name_to_field[n]['display']} [{name_to_field[n]['type']}]",
+                format_func=field_label,
+                key="data_columns_multiselect",
                 help="Choose which columns to display in the results"
             )
         st.markdown('</div>', unsafe_allow_html=True)
@@ -530,7 +463,7 @@ if selected_tab == "📝 Build Query":
                 field = st.selectbox(
                     f"Field",
                     [f["name"] for f in fields],
-                    format_func=lambda n: f"{name_to_field[n]['display']} [{name_to_field[n]['type']}]",
+                    format_func=field_label,
                     key=f"filter_field_selectbox_{i}"
                 )
                 op = st.selectbox(
@@ -572,7 +505,7 @@ if selected_tab == "📝 Build Query":
         st.markdown('<h2 class="section-header" data-animation="slide-up">🔍 Query Preview</h2>', unsafe_allow_html=True)
         st.markdown('<div class="query-preview" data-animation="fade-in">', unsafe_allow_html=True)
         try:
-            query_code = f"Query().set_markets('{market_code}')"
+            query_code = f"Query().set_markets('{market_code}').set_schema()"
 
             if selected_types:
                 type_conditions = [f"col('type') == '{t}'" for t in selected_types]
@@ -651,7 +584,8 @@ if selected_tab == "📝 Build Query":
                 # Store market code in session state for results tab
                 st.session_state.market_code = market_code
 
-                q = Query().set_markets(market_code)
+                # fixed dtypes from the field catalog (categoricals, nullable bools...)
+                q = Query().set_markets(market_code).set_schema()
 
                 if selected_types:
                     type_conditions = [f"col('type') == '{t}'" for t in selected_types]
@@ -688,12 +622,15 @@ if selected_tab == "📝 Build Query":
 
                 q = q.offset(offset).limit(row_limit)
 
-                count, df = q.get_scanner_data()
+                # timed per stage (http, decode, dataframe) by the query itself
+                count, df = q.set_timer(stage).get_scanner_data()
 
                 if 'type' in df.columns:
-                    df = df[df['type'].isin(selected_types)]
+                    with stage("filter"):
+                        df = df[df['type'].isin(selected_types)]
 
-                st.session_state.query_results = df
+                # kept in the cache registry (under the global memory budget), not in the session
+                get_registry().session_put('query_results', df)
                 st.session_state.last_query_count = count
                 st.session_state.selected_tab = "📊 Results"
                 st.success(f"✅ Query executed successfully! Found {count} matches. Showing {len(df)} rows.")
@@ -709,8 +646,8 @@ if selected_tab == "📝 Build Query":
 
 else:
     # Results tab
-    if st.session_state.query_results is not None:
-        df = st.session_state.query_results
+    df = get_registry().session_get('query_results')
+    if df is not None:
 
         if not df.empty:
             # Configure columns for display
@@ -750,25 +687,14 @@ else:
             if market_code == 'india':
                 st.subheader("🎯 Price Band Filter")
                 
-                # Fetch price bands data
-                @st.cache_data(ttl=300)
-                def fetch_price_bands() -> pd.DataFrame:
-                    """Fetch and cache price bands data"""
-                    try:
-                        url = "https://docs.google.com/spreadsheets/d/1xig6-dQ8PuPdeCxozcYdm15nOFUKMMZFm_p8VvRFDaE/gviz/tq?tqx=out:csv&gid=364491472"
-                        bands_df = pd.read_csv(url)
-                        bands_df = bands_df[['Symbol', 'Band']]
-                        bands_df['Symbol'] = bands_df['Symbol'].str.replace('NSE:', '', regex=False)
-                        return bands_df
-                    except Exception as e:
-                        st.error(f"Error fetching price bands: {str(e)}")
-                        return pd.DataFrame(columns=['Symbol', 'Band'])
-
-                price_bands_df = fetch_price_bands()
-                
-                if not price_bands_df.empty:
-                    symbol_to_band = dict(zip(price_bands_df['Symbol'], price_bands_df['Band']))
-                    
+                # The price bands table shared by all the sessions (downloaded once per TTL)
+                try:
+                    price_bands = get_price_bands()
+                except Exception as e:
+                    st.error(f"Error fetching price bands: {str(e)}")
+                    price_bands = PriceBandTable.empty()
+
+                if len(price_bands):
                     symbol_column = None
                     for col in ['symbol', 'name', 'Stock', 'ticker']:
                         if col in df.columns:
@@ -776,16 +702,16 @@ else:
                             break
                     
                     if symbol_column:
-                        df['Price Band'] = df[symbol_column].str.replace('NSE:', '', regex=False).map(symbol_to_band)
+                        df = price_bands.join(df, on=symbol_column, column='Price Band', labels=False)
                         
-                        available_bands = sorted(price_bands_df['Band'].unique())
+                        available_bands = price_bands.band_values
                         
                         col1, col2 = st.columns([2, 1])
                         with col1:
                             selected_bands = st.multiselect(
                                 "Filter by Price Band",
                                 options=available_bands,
-                                format_func=lambda x: f"Band {x} ({len(price_bands_df[price_bands_df['Band'] == x])} stocks)"
+                                format_func=lambda x: f"Band {x} ({price_bands.count(x)} stocks)"
                             )
                         
                         with col2:
@@ -860,12 +786,13 @@ else:
                 column_config["Price Band"] = st.column_config.NumberColumn("Price Band", format="%.0f")
 
             # Display results in a single dataframe
-            st.dataframe(
-                df,
-                use_container_width=True,
-                height=500,
-                column_config=column_config
-            )
+            with stage("render"):
+                st.dataframe(
+                    df,
+                    use_container_width=True,
+                    height=500,
+                    column_config=column_config
+                )
 
             # Display statistics
             stats_col1, stats_col2, stats_col3 = st.columns(3)
@@ -1152,3 +1079,6 @@ elif st.session_state.page == 'bands':
     render_price_bands()
 elif st.session_state.page == 'results':
     render_results()
+
+render_debug_panel()
+render_usage_panel()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tradingview_screener.local import scan_local
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        '--network', action='store_true', help='also run the tests that hit the live scanner API'
+    )
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    # the default run is hermetic (the local stubs, and the cassettes of `replay.py`)
+    if config.getoption('--network'):
+        return
+    skip = pytest.mark.skip(reason='talks to the live scanner API, run with --network')
+    for item in items:
+        if 'network' in item.keywords:
+            item.add_marker(skip)
+
+
+class StubScannerServer(ThreadingHTTPServer):
+    """
+    A local stand-in for `scanner.tradingview.com` that replies to every POST with `self.response`
+    and records what it received.
+
+    `self.response` can also be a function of the payload, which may return a
+    `(status, body, headers)` tuple instead of the body.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(('127.0.0.1', 0), _StubScannerHandler)
+        self.response: dict = {'totalCount': 0, 'data': []}
+        self.requests: list[dict] = []
+        self.request_headers: list[dict[str, str]] = []
+        self.client_ports: set[int] = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/america/scan'
+
+
+class _StubScannerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+    server: StubScannerServer
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with self.server.lock:
+            self.server.requests.append(payload)
+            self.server.request_headers.append(dict(self.headers))
+            self.server.client_ports.add(self.client_address[1])
+            response = self.server.response
+        response = response(payload) if callable(response) else response
+        status, headers = 200, {}
+        if isinstance(response, tuple):
+            status, response, headers = response
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def make_local_scanner(universe):
+    """
+    A `StubScannerServer.response` that evaluates each request on the `universe` DataFrame (with
+    `scan_local()`), i.e. a fake scanner API with real filtering, sorting and pagination.
+    """
+
+    def respond(payload: dict) -> dict:
+        count, df = scan_local(universe() if callable(universe) else universe, payload)
+        columns = ['ticker', *payload.get('columns', [])]
+        frame = df[columns].astype(object)
+        frame = frame.where(frame.notna(), None)  # NaN isn't valid JSON
+        data = [{'s': row[0], 'd': list(row[1:])} for row in frame.itertuples(False)]
+        return {'totalCount': count, 'data': data}
+
+    return respond
+
+
+@pytest.fixture
+def local_scanner():
+    """`make_local_scanner()`, for the tests (the `conftest` module can't be imported by name)"""
+    return make_local_scanner
+
+
+@pytest.fixture
+def scanner_server():
+    server = StubScannerServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
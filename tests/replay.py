@@ -0,0 +1,261 @@
+"""
+Record/replay of HTTP traffic, so the tests and benchmarks run offline on real responses.
+
+`record()` lets the requests through and saves every request/response pair to a "cassette" (a
+JSON file); `replay()` serves a cassette from a local `ReplayServer` and redirects every request
+to it. Both hook `HTTPAdapter.send()`, so they cover all the clients of the repo: the `Transport`
+of `Query`, the `requests.Session` of `BSEAnnouncements`, and plain `requests.get()` calls.
+
+>>> with record('scan.json'):
+...     Query().limit(5000).get_scanner_data()
+>>> with replay('scan.json'):
+...     Query().limit(5000).get_scanner_data()  # no network
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any, Optional
+
+    from requests import PreparedRequest, Response
+
+CASSETTE_VERSION = 1
+
+# the body was decoded by urllib3, and it's served again with its actual length
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def _canonical_body(body: Optional[bytes | str]) -> str:
+    if not body:
+        return ''
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+    except ValueError:
+        return body
+
+
+def request_key(method: str, url: str, body: Optional[bytes | str] = None) -> str:
+    """
+    The key a request is matched on: the method, host, path, sorted query and (canonical) body.
+    The scheme and the headers (cookies, user-agents) are ignored.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f'{method.upper()} {parts.hostname}{parts.path}?{query} {_canonical_body(body)}'
+
+
+class Cassette:
+    """
+    The recorded interactions, replayed in order when the same request is sent more than once
+    (the last response repeats after that).
+    """
+
+    def __init__(self, interactions: Optional[list[dict[str, Any]]] = None) -> None:
+        self.interactions: list[dict[str, Any]] = interactions or []
+        self._lock = threading.Lock()
+        self._served: dict[str, int] = defaultdict(int)
+        self._by_key: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for interaction in self.interactions:
+            self._by_key[self._key(interaction['request'])].append(interaction['response'])
+
+    @staticmethod
+    def _key(request: dict[str, Any]) -> str:
+        return request_key(request['method'], request['url'], request.get('body'))
+
+    @classmethod
+    def load(cls, path: str | Path) -> Cassette:
+        content = json.loads(Path(path).read_bytes())
+        if content.get('version') != CASSETTE_VERSION:
+            raise ValueError(f'Unsupported cassette version in {path}')
+        return cls(content['interactions'])
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = {'version': CASSETTE_VERSION, 'interactions': self.interactions}
+        path.write_text(json.dumps(content, indent=1, ensure_ascii=False), encoding='utf-8')
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes | str],
+        status: int,
+        content: bytes,
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        try:
+            text, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
+        request = {'method': method.upper(), 'url': url, 'body': body or None}
+        response = {
+            'status': status,
+            'headers': {
+                k: v for k, v in (headers or {}).items() if k.lower() not in _DROPPED_HEADERS
+            },
+            'body': text,
+            'encoding': encoding,
+        }
+        with self._lock:
+            self.interactions.append({'request': request, 'response': response})
+            self._by_key[self._key(request)].append(response)
+
+    def match(self, method: str, url: str, body: Optional[bytes | str]) -> Optional[dict[str, Any]]:
+        key = request_key(method, url, body)
+        with self._lock:
+            responses = self._by_key.get(key)
+            if not responses:
+                return None
+            i = self._served[key]
+            self._served[key] = i + 1
+        return responses[min(i, len(responses) - 1)]
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+
+@contextmanager
+def _patched_send(send) -> Iterator[None]:
+    original = HTTPAdapter.send
+    HTTPAdapter.send = send  # pyright: ignore
+    try:
+        yield
+    finally:
+        HTTPAdapter.send = original  # pyright: ignore
+
+
+@contextmanager
+def record(path: Optional[str | Path] = None) -> Iterator[Cassette]:
+    """
+    Let every request through and record it (with its response) to a cassette, which is saved to
+    `path` on exit.
+    """
+    cassette = Cassette()
+    original = HTTPAdapter.send
+
+    def send(adapter: HTTPAdapter, request: PreparedRequest, **kwargs) -> Response:
+        response = original(adapter, request, **kwargs)
+        # reading it here is fine for streamed responses too, `iter_content()` then slices it
+        content = response.content
+        cassette.add(
+            request.method or 'GET',
+            request.url or '',
+            request.body,  # pyright: ignore
+            response.status_code,
+            content,
+            dict(response.headers),
+        )
+        return response
+
+    with _patched_send(send):
+        yield cassette
+    if path is not None:
+        cassette.save(path)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    A local HTTP server that answers each request with its recorded response. The original host is
+    the first segment of the path (`/scanner.tradingview.com/india/scan`).
+
+    Requests that aren't in the cassette get a 404, and are kept in `self.misses`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cassette: Cassette) -> None:
+        super().__init__(('127.0.0.1', 0), _ReplayHandler)
+        self.cassette = cassette
+        self.misses: list[str] = []
+        self.hits = 0
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def local_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        query = f'?{parts.query}' if parts.query else ''
+        return f'{self.base_url}/{parts.hostname}{parts.path}{query}'
+
+    @staticmethod
+    def original_url(path: str) -> str:
+        return f'https://{path.lstrip("/")}'
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+    server: ReplayServer
+
+    def _reply(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        url = self.server.original_url(self.path)
+        response = self.server.cassette.match(self.command, url, body)
+        if response is None:
+            self.server.misses.append(request_key(self.command, url, body))
+            status, headers, content = 404, {'Content-Type': 'text/plain'}, b'not recorded'
+        else:
+            self.server.hits += 1
+            status, headers = response['status'], response['headers']
+            content = response['body'].encode('utf-8')
+            if response.get('encoding') == 'base64':
+                content = base64.b64decode(content)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@contextmanager
+def replay(cassette: Cassette | str | Path) -> Iterator[ReplayServer]:
+    """
+    Serve a cassette from a `ReplayServer`, and send every request to it instead of the network.
+    """
+    if not isinstance(cassette, Cassette):
+        cassette = Cassette.load(cassette)
+    server = ReplayServer(cassette)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    original = HTTPAdapter.send
+
+    def send(adapter: HTTPAdapter, request: PreparedRequest, **kwargs) -> Response:
+        local = request.copy()
+        local.url = server.local_url(request.url or '')
+        local.headers.pop('Host', None)
+        response = original(adapter, local, **kwargs)
+        response.url = request.url or ''  # as if it came from the original host
+        response.request = request
+        return response
+
+    try:
+        with _patched_send(send):
+            yield server
+    finally:
+        server.shutdown()
+        server.server_close()
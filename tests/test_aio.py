@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from tradingview_screener import Query, gather_scans
+
+
+def _slow_echo(delay: float):
+    def respond(payload: dict) -> dict:
+        time.sleep(delay)
+        market = payload['markets'][0]
+        return {'totalCount': 1, 'data': [{'s': f'{market}:X', 'd': [market]}]}
+
+    return respond
+
+
+def _queries(url: str, markets: list[str]) -> list[Query]:
+    queries = []
+    for market in markets:
+        query = Query().select('name').set_markets(market)
+        query.url = url
+        queries.append(query)
+    return queries
+
+
+def test_gather_scans_preserves_order_and_runs_concurrently(scanner_server):
+    scanner_server.response = _slow_echo(0.2)
+    markets = ['india', 'america', 'uk', 'italy', 'japan', 'brazil']
+
+    start = time.perf_counter()
+    results = asyncio.run(gather_scans(_queries(scanner_server.url, markets), max_concurrency=6))
+    elapsed = time.perf_counter() - start
+
+    assert [df['name'].iloc[0] for _, df in results] == markets
+    assert elapsed < 0.2 * len(markets) / 2
+
+
+def test_gather_scans_bounded_concurrency(scanner_server):
+    scanner_server.response = _slow_echo(0.1)
+
+    start = time.perf_counter()
+    asyncio.run(gather_scans(_queries(scanner_server.url, ['a', 'b', 'c', 'd']), max_concurrency=1))
+    assert time.perf_counter() - start >= 0.4
+
+
+def test_gather_scans_timeout(scanner_server):
+    scanner_server.response = _slow_echo(0.5)
+    queries = _queries(scanner_server.url, ['india'])
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(gather_scans(queries, timeout=0.1))
+
+    results = asyncio.run(gather_scans(queries, timeout=0.1, return_exceptions=True))
+    assert isinstance(results[0], Exception)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingview_screener import Query, QueryBatch, col
+
+rng = np.random.default_rng(0)
+N = 300
+UNIVERSE = pd.DataFrame(
+    {
+        'ticker': [f'NSE:S{i}' for i in range(N)],
+        'name': [f'S{i}' for i in range(N)],
+        'exchange': rng.choice(['NSE', 'BSE'], N),
+        'sector': rng.choice(['Finance', 'Energy', 'Technology'], N),
+        # unique values, so the order of the sorted results is fully determined
+        'close': rng.permutation(N) + 0.5,
+        'volume': rng.permutation(N) * 10.0,
+        'Value.Traded': rng.permutation(N) * 100.0,
+    }
+)
+
+
+@pytest.fixture
+def base(scanner_server, local_scanner) -> Query:
+    scanner_server.response = local_scanner(UNIVERSE)
+    query = Query().set_markets('india').where(col('exchange') == 'NSE', col('close') > 50)
+    query.url = scanner_server.url
+    return query
+
+
+def assert_same_as_alone(scanner_server, queries: list[Query], results) -> None:
+    sent = len(scanner_server.requests)
+    for query, (count, df) in zip(queries, results):
+        expected_count, expected = query.get_scanner_data()
+        assert count == expected_count
+        pd.testing.assert_frame_equal(df, expected)
+    assert len(scanner_server.requests) == sent + len(queries)
+
+
+def test_same_sort_is_a_single_slice(scanner_server, base: Query):
+    queries = [
+        base.copy().select('name', 'sector').order_by('close').limit(10),
+        base.copy().select('close', 'volume').order_by('close').offset(5).limit(40),
+        base.copy().select('name').order_by('close').limit(200),
+    ]
+    batch = QueryBatch(queries)
+    assert batch.groups() == [[0, 1, 2]]
+
+    results = batch.get_scanner_data()
+    assert len(scanner_server.requests) == 1
+    request = scanner_server.requests[0]
+    assert request['columns'] == ['name', 'sector', 'close', 'volume']
+    assert request['range'] == [0, 200]
+    assert [len(df) for _, df in results] == [10, 35, len(results[2][1])]
+    assert_same_as_alone(scanner_server, queries, results)
+
+
+def test_different_sorts_are_sorted_locally(scanner_server, base: Query):
+    queries = [
+        base.copy().select('name').order_by('close', ascending=False).limit(15),
+        base.copy().select('name', 'volume').order_by('volume').offset(3).limit(20),
+        base.copy().select('sector', 'close').limit(25),  # the default sort, `Value.Traded`
+    ]
+    batch = QueryBatch(queries)
+    results = batch.get_scanner_data()
+
+    assert len(scanner_server.requests) == 1
+    request = scanner_server.requests[0]
+    assert 'sort' not in request
+    assert request['range'] == [0, batch.max_rows]
+    assert set(request['columns']) == {'name', 'close', 'volume', 'sector', 'Value.Traded'}
+    assert_same_as_alone(scanner_server, queries, results)
+
+
+def test_incompatible_queries_are_sent_separately(scanner_server, base: Query):
+    other_filters = base.copy().select('name').where(col('exchange') == 'BSE')
+    queries = [
+        base.copy().select('name'),
+        other_filters,
+        base.copy().select('close').order_by('close'),
+    ]
+    batch = QueryBatch(queries)
+    assert batch.groups() == [[0, 2], [1]]
+
+    results = batch.get_scanner_data()
+    assert len(scanner_server.requests) == 2
+    assert_same_as_alone(scanner_server, queries, results)
+
+
+def test_incomplete_local_copy_falls_back(scanner_server, base: Query):
+    queries = [
+        base.copy().select('name').order_by('close').limit(5),
+        base.copy().select('name').order_by('volume').limit(5),
+    ]
+    results = QueryBatch(queries, max_rows=10).get_scanner_data()
+    # the merged request only had 10 of the matching rows, so both queries were sent alone
+    assert len(scanner_server.requests) == 3
+    assert_same_as_alone(scanner_server, queries, results)
+
+
+def test_custom_fetch(base: Query):
+    sent = []
+
+    def fetch(query: Query):
+        sent.append(query)
+        return query.get_scanner_data()
+
+    batch = QueryBatch([base.copy().select('name'), base.copy().select('close')])
+    batch.get_scanner_data(fetch=fetch)
+    assert len(sent) == 1
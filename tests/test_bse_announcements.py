@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import datetime
+import threading
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('bs4')
+
+from utils.announcements_store import AnnouncementStore  # noqa: E402
+from utils.bse_announcements_utils import AnnouncementTail, BSEAnnouncements  # noqa: E402
+
+
+@pytest.fixture
+def bse(tmp_path, monkeypatch) -> BSEAnnouncements:
+    monkeypatch.chdir(tmp_path)
+    return BSEAnnouncements()
+
+
+def fake_api(pages_per_chunk: dict, total_page_cnt: bool = True):
+    calls = []
+    lock = threading.Lock()
+
+    def fetch_announcements_api(from_date, to_date, page, **kwargs) -> pd.DataFrame:
+        with lock:
+            calls.append((from_date, page))
+        if page > pages_per_chunk[from_date]:
+            return pd.DataFrame()
+        day = pd.Timestamp(datetime.datetime.strptime(from_date, '%d/%m/%Y')) + pd.Timedelta(days=page)
+        df = pd.DataFrame({
+            'NEWSID': [f'{from_date}-{page}-{i}' for i in range(20)],
+            'SCRIP_CD': [500000 + i for i in range(20)],
+            'CATEGORYNAME': ['Result' if i % 2 else 'Company Update' for i in range(20)],
+            'DT_TM': [day + pd.Timedelta(minutes=i) for i in range(20)],
+        })
+        if total_page_cnt:
+            df['TotalPageCnt'] = pages_per_chunk[from_date]
+        return df
+
+    return fetch_announcements_api, calls
+
+
+def test_date_chunks():
+    assert len(BSEAnnouncements._date_chunks('01/10/2026', '31/10/2026')) == 1
+    chunks = BSEAnnouncements._date_chunks('01/07/2026', '30/09/2026')
+    assert len(chunks) == 4
+    assert chunks[0][0].day == 1 and chunks[-1][1].month == 9 and chunks[-1][1].day == 30
+
+
+def test_fetch_all_pages_of_all_chunks(bse, monkeypatch):
+    fetch, calls = fake_api({'01/07/2026': 3, '31/07/2026': 1, '30/08/2026': 2})
+    monkeypatch.setattr(bse, 'fetch_announcements_api', fetch)
+    streamed = []
+
+    df = bse.fetch_all_announcements_api('01/07/2026', '10/09/2026', on_page=streamed.append)
+
+    # each page is requested once, and no page past `TotalPageCnt`
+    assert sorted(calls) == sorted(
+        [('01/07/2026', p) for p in (1, 2, 3)] + [('31/07/2026', 1)]
+        + [('30/08/2026', p) for p in (1, 2)]
+    )
+    assert len(streamed) == 6 and len(df) == 6 * 20
+    # the newest first, whatever the order the pages completed in
+    assert df['NEWSID'].iloc[0] == '30/08/2026-2-19' and df['DT_TM'].is_monotonic_decreasing
+    assert df['NEWSID'].nunique() == 120 and df['SCRIP_CD'].iloc[0] == 500019
+
+    # the closed days are read from the store, without fetching them again
+    calls.clear()
+    again = bse.fetch_all_announcements_api('01/07/2026', '10/09/2026')
+    assert calls == [] and again.equals(df)
+    assert len(bse.fetch_all_announcements_api('03/07/2026', '20/07/2026')) == 2 * 20
+    assert calls == []
+
+
+def test_pages_without_total_page_cnt(bse, monkeypatch):
+    fetch, calls = fake_api({'01/10/2026': 2}, total_page_cnt=False)
+    monkeypatch.setattr(bse, 'fetch_announcements_api', fetch)
+    df = bse.fetch_all_announcements_api('01/10/2026', '10/10/2026')
+    # the next page is requested after each full page, until an empty one
+    assert [page for _, page in calls] == [1, 2, 3] and len(df) == 40
+
+
+def test_failed_page_is_raised(bse, monkeypatch):
+    def fetch_announcements_api(page, **kwargs) -> pd.DataFrame:
+        raise Exception('Failed to fetch announcements after 3 attempts')
+
+    monkeypatch.setattr(bse, 'fetch_announcements_api', fetch_announcements_api)
+    with pytest.raises(Exception, match='Failed to fetch'):
+        bse.fetch_all_announcements_api('01/10/2026', '10/10/2026')
+
+
+def test_store_refetches_only_the_open_window(tmp_path):
+    store = AnnouncementStore(str(tmp_path / 'announcements.db'), open_days=1, open_ttl=60)
+    key = store.filter_key('Result', '', '-1')
+    today = datetime.date(2026, 10, 17)
+    now = datetime.datetime(2026, 10, 17, 12).timestamp()
+    start = today - datetime.timedelta(days=5)
+    assert store.missing_ranges(key, start, today, now=now) == [(start, today)]
+
+    df = pd.DataFrame({
+        'NEWSID': ['a', 'b', 'c'],
+        'SCRIP_CD': [500325, 500325, 532540],
+        'CATEGORYNAME': ['Result', 'Result', 'Board Meeting'],
+        'DT_TM': pd.to_datetime(['2026-10-12 10:00', '2026-10-16 18:00', '2026-10-17 09:00']),
+    })
+    store.upsert(key, start, today, df, fetched_at=now)
+    assert store.missing_ranges(key, start, today, now=now + 30) == []
+    # yesterday and today are still open: fetched again once their copy is older than the TTL
+    yesterday = today - datetime.timedelta(days=1)
+    assert store.missing_ranges(key, start, today, now=now + 60) == [(yesterday, today)]
+
+    # a refetch replaces the rows of the filter for these days, and upserts by ID
+    update = df.iloc[1:].assign(NEWSSUB=['late', 'edited'])
+    store.upsert(key, yesterday, today, update, fetched_at=now + 60)
+    assert len(store) == 3
+    assert store.query_filter(key, start, today)['NEWSID'].tolist() == ['c', 'b', 'a']
+    assert store.query(scrip='500325')['NEWSID'].tolist() == ['b', 'a']
+    assert store.query(start=today, category='Board Meeting')['NEWSSUB'].tolist() == ['edited']
+
+    # a day fetched after its window closed is final
+    later = datetime.datetime(2026, 10, 20).timestamp()
+    store.upsert(key, yesterday, today, update, fetched_at=later)
+    assert store.missing_ranges(key, start, today, now=later + 10**6) == []
+
+
+def test_poll_only_fetches_the_new_pages(bse, monkeypatch):
+    feed = []  # today's announcements, the newest first
+
+    def publish(n: int) -> None:
+        start = len(feed)
+        feed[:0] = [
+            {'NEWSID': f'id{i}', 'DT_TM': pd.Timestamp('2026-10-17 09:00') + pd.Timedelta(minutes=i)}
+            for i in reversed(range(start, start + n))
+        ]
+
+    pages = []
+
+    def fetch_announcements_api(page, **kwargs) -> pd.DataFrame:
+        pages.append(page)
+        rows = feed[(page - 1) * 20:page * 20]
+        df = pd.DataFrame(rows)
+        if rows:
+            df['TotalPageCnt'] = (len(feed) + 19) // 20
+        return df
+
+    monkeypatch.setattr(bse, 'fetch_announcements_api', fetch_announcements_api)
+    tail = AnnouncementTail()
+
+    publish(50)
+    first = bse.poll_new_announcements(tail)  # the whole day, through the store
+    assert len(first) == 50 and tail.newest == pd.Timestamp('2026-10-17 09:49')
+
+    pages.clear()
+    assert bse.poll_new_announcements(tail).empty and pages == [1]
+
+    publish(3)
+    pages.clear()
+    new = bse.poll_new_announcements(tail)
+    assert new['NEWSID'].tolist() == ['id52', 'id51', 'id50'] and pages == [1]
+
+    publish(25)  # more than a page: the second one has the first known row
+    pages.clear()
+    new = bse.poll_new_announcements(tail)
+    assert len(new) == 25 and new['NEWSID'].iloc[0] == 'id77' and pages == [1, 2]
+    assert tail.newest == pd.Timestamp('2026-10-17 10:17')
+
+
+def test_tail_announcements(bse, monkeypatch):
+    batches = iter([pd.DataFrame({'NEWSID': ['a']}), pd.DataFrame(), pd.DataFrame({'NEWSID': ['b']})])
+    monkeypatch.setattr(bse, 'poll_new_announcements', lambda tail: next(batches))
+    received = []
+    tail = bse.tail_announcements(interval=0, on_new=received.append)
+    assert next(tail)['NEWSID'].tolist() == ['a']
+    assert next(tail)['NEWSID'].tolist() == ['b']
+    assert len(received) == 2
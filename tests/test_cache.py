@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from tradingview_screener import Query, ScanCache, col
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _counter(payload: dict) -> dict:
+    _counter.calls += 1  # type: ignore
+    return {'totalCount': _counter.calls, 'data': [{'s': 'NSE:A', 'd': [_counter.calls]}]}  # type: ignore
+
+
+@pytest.fixture
+def query(scanner_server) -> Query:
+    _counter.calls = 0  # type: ignore
+    scanner_server.response = _counter
+    q = Query().set_markets('india').select('close')
+    q.url = scanner_server.url
+    return q
+
+
+def test_fingerprint():
+    a = Query().select('close').where(col('x') > 1)
+    b = Query().where(col('x') > 1).select('close')
+    assert a.fingerprint() == b.fingerprint()
+    assert a.fingerprint() != a.copy().limit(10).fingerprint()
+
+
+def test_hit_and_expiry(query: Query):
+    clock = FakeClock()
+    cache = ScanCache(ttl=10, stale_ttl=0, clock=clock)
+
+    assert cache.get_scanner_data(query)[0] == 1
+    df = cache.get_scanner_data(query)[1]
+    df['close'] = -1  # the caller gets a copy
+    assert cache.get_scanner_data(query)[1]['close'].tolist() == [1]
+    assert cache.stats['hits'] == 2
+
+    clock.now = 11
+    assert cache.get_scanner_data(query)[0] == 2
+    assert cache.stats['misses'] == 2
+
+
+def test_market_ttls(query: Query):
+    cache = ScanCache(ttl=100, market_ttls={'india': 5, 'crypto': 1})
+    assert cache.ttl_for(query) == 5
+    assert cache.ttl_for(Query().set_markets('america')) == 100
+    assert cache.ttl_for(Query().set_markets('india', 'crypto')) == 1
+
+
+def test_stale_while_revalidate(query: Query):
+    clock = FakeClock()
+    cache = ScanCache(ttl=10, stale_ttl=60, clock=clock)
+    cache.get_scanner_data(query)
+
+    clock.now = 20
+    # the stale value is returned immediately, and refreshed in the background
+    assert cache.get_scanner_data(query)[0] == 1
+    for _ in range(100):
+        if cache.stats['refreshes']:
+            break
+        time.sleep(0.02)
+    assert cache.get_scanner_data(query)[0] == 2
+    assert cache.stats['stale_hits'] == 1
+
+
+def test_lru_eviction_by_bytes(scanner_server):
+    scanner_server.response = {'totalCount': 1, 'data': [{'s': 'NSE:A', 'd': [1.0]}]}
+    queries = []
+    for market in ('india', 'america', 'uk'):
+        q = Query().set_markets(market).select('close')
+        q.url = scanner_server.url
+        queries.append(q)
+
+    cache = ScanCache()
+    cache.get_scanner_data(queries[0])
+    cache.max_bytes = cache.nbytes * 2
+    cache.get_scanner_data(queries[1])
+    cache.get_scanner_data(queries[0])  # `india` is now the most recently used
+    cache.get_scanner_data(queries[2])
+
+    assert len(cache) == 2
+    assert cache.stats['evictions'] == 1
+    cache.get_scanner_data(queries[0])
+    assert cache.stats['hits'] == 2
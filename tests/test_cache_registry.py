@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import inspect
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src import cache_registry
+from src.cache_registry import CacheRegistry, deep_sizeof
+
+
+def frame(n_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({'x': np.zeros(n_rows), 'name': [f'SYM{i}' for i in range(n_rows)]})
+
+
+def test_deep_sizeof():
+    df = frame(1000)
+    assert deep_sizeof(df) == df.memory_usage(deep=True).sum()
+    assert deep_sizeof(np.zeros(100)) == 800
+    # containers count each object once
+    assert deep_sizeof({'a': df, 'b': df}) < 2 * deep_sizeof(df)
+    assert deep_sizeof((df, 'x')) > deep_sizeof(df)
+
+
+def test_lru_eviction_by_budget():
+    size = deep_sizeof(frame(1000))
+    registry = CacheRegistry(budget_bytes=int(size * 2.5))
+    registry.put('a', 1, frame(1000))
+    registry.put('a', 2, frame(1000))
+    assert registry.get('a', 1) is not None  # 1 is now more recent than 2
+    registry.put('b', 1, frame(1000))
+
+    assert registry.get('a', 2) is None
+    assert registry.get('a', 1) is not None and registry.get('b', 1) is not None
+    assert registry.nbytes == 2 * size <= registry.budget_bytes
+    usage = {row['cache']: row for row in registry.usage()}
+    assert usage['a']['entries'] == 1 and usage['a']['evictions'] == 1
+    assert usage['a']['nbytes'] == usage['b']['nbytes'] == size
+
+    # larger than the whole budget: returned, but not kept
+    assert len(registry.put('c', 1, frame(10_000))) == 10_000
+    assert registry.get('c', 1) is None and registry.nbytes == 2 * size
+
+
+def test_ttl():
+    now = [0.0]
+    registry = CacheRegistry(10**6, clock=lambda: now[0])
+    registry.put('a', 1, 'x', ttl=10)
+    assert registry.get('a', 1) == 'x'
+    now[0] = 10
+    assert registry.get('a', 1) is None and registry.nbytes == 0
+
+
+def test_shared_frames_are_isolated():
+    registry = CacheRegistry(10**7)
+    shared = registry.put('a', 1, frame(10))
+    session_1, session_2 = registry.get('a', 1), registry.get('a', 1)
+    session_1['band'] = 5
+    session_1.loc[0, 'x'] = 1.0
+    assert 'band' not in session_2 and session_2.loc[0, 'x'] == 0
+    assert 'band' not in shared and shared.loc[0, 'x'] == 0
+
+
+def test_shared_frames_share_data_only_under_copy_on_write(monkeypatch):
+    registry = CacheRegistry(10**7)
+    shared = registry.put('a', 1, frame(10))
+    # under copy-on-write, no copy of the data until it's written to
+    monkeypatch.setattr(cache_registry, '_copy_on_write', lambda: True)
+    assert np.shares_memory(registry.get('a', 1)['x'].to_numpy(), shared['x'].to_numpy())
+
+    monkeypatch.setattr(cache_registry, '_copy_on_write', lambda: False)
+    session = registry.get('a', 1)
+    assert not np.shares_memory(session['x'].to_numpy(), shared['x'].to_numpy())
+    session.loc[0, 'x'] = 1.0
+    assert shared.loc[0, 'x'] == 0
+
+
+def test_cached_calls_once_per_key():
+    registry = CacheRegistry(10**7)
+    calls = []
+    barrier = threading.Barrier(8)
+
+    @registry.cached('bands', ttl=60)
+    def fetch(market: str) -> pd.DataFrame:
+        calls.append(market)
+        return frame(10)
+
+    def session() -> None:
+        barrier.wait()
+        fetch('india')
+
+    threads = [threading.Thread(target=session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fetch('america')
+    assert sorted(calls) == ['america', 'india']
+    # the per-key locks are dropped once the value is cached
+    assert inspect.getclosurevars(fetch).nonlocals['locks'] == {}
+
+    fetch.clear()  # pyright: ignore
+    fetch('india')
+    assert calls.count('india') == 2
+
+
+def test_session_values():
+    registry = CacheRegistry(10**7)
+    registry.session_put('query_results', frame(5))
+    assert len(registry.session_get('query_results')) == 5  # `default` outside of Streamlit
+    assert registry.session_get('missing') is None
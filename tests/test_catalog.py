@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from tradingview_screener.catalog import (
+    INDEX_VERSION,
+    SHIPPED_INDEX,
+    FieldCatalog,
+    build_index,
+    parse_fields_page,
+)
+
+HTML_PAGE = """
+<table>
+  <tr><th>Name</th><th>Display Name</th><th>Type</th></tr>
+  <tr><td>close</td><td>Price</td><td>price</td></tr>
+  <tr><td>new_field_xyz</td><td>Brand <b>New</b> Field</td><td>number</td></tr>
+</table>
+"""
+
+
+class FakeResponse:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        self.urls.append(url)
+        if url.endswith('/crypto.html'):
+            return FakeResponse('- close\n- 24h_vol|5\n')
+        return FakeResponse(HTML_PAGE)
+
+
+class FlakyTransport(FakeTransport):
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        if url.endswith('/crypto.html'):
+            raise ConnectionError('boom')
+        return super().get(url, **kwargs)
+
+
+@pytest.fixture
+def catalog(tmp_path) -> FieldCatalog:
+    return FieldCatalog(path=tmp_path / 'fields.json', transport=FakeTransport())  # pyright: ignore
+
+
+def test_shipped_index(catalog: FieldCatalog):
+    # a seed, refreshed on the first run
+    assert catalog.built == json.loads(SHIPPED_INDEX.read_bytes())['built'] == 0
+    assert catalog.is_stale
+    close = catalog.get('close')
+    assert close is not None and close.type == '' and 'crypto' in close.markets
+    assert 'market_cap_basic' in catalog and 'market_cap_basic' not in catalog.fields('crypto')
+    # the instrument types of the UI map to their screener
+    assert catalog.fields('fund') == catalog.fields('stocks')
+    assert catalog.exchanges('india') == ['BSE', 'NSE']
+    assert catalog.exchanges('nowhere') == []
+
+
+def test_prefix_and_search(catalog: FieldCatalog):
+    names = [f.name for f in catalog.prefix('ema', limit=100)]
+    assert names == sorted(names, key=str.lower) and names[0] == 'EMA10'
+    assert all(n.startswith('EMA') for n in names)
+    # prefix of the display name too
+    assert 'relative_volume_10d_calc' in [f.name for f in catalog.prefix('Relative Vol')]
+    assert catalog.prefix('sector', market='crypto') == []
+
+    assert catalog.search('relatve volum', limit=1)[0].name == 'relative_volume_10d_calc'  # typo
+    hits = [f.name for f in catalog.search('net income growth', limit=10)]
+    assert hits and all(n.startswith('net_income') for n in hits)
+    assert len(catalog.search('', limit=5)) == 5
+
+
+def test_parse_fields_page():
+    assert parse_fields_page(HTML_PAGE) == [
+        ('close', 'Price', 'price'),
+        ('new_field_xyz', 'Brand New Field', 'number'),
+    ]
+    assert parse_fields_page('# Crypto\n- close\n- 24h_vol|5\n') == [
+        ('close', 'close', ''),
+        ('24h_vol|5', '24h_vol|5', ''),
+    ]
+
+
+def test_refresh_saves_a_newer_index(tmp_path, catalog: FieldCatalog):
+    now = catalog.built + catalog.max_age + 1
+    catalog.clock = lambda: now
+    assert catalog.is_stale
+    assert catalog.refresh_in_background()
+    assert not catalog.refresh_in_background()  # already refreshing
+    deadline = time.monotonic() + 5
+    while catalog._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not catalog.is_stale
+    assert len(catalog.transport.urls) == len(catalog.market_names)  # pyright: ignore
+    assert catalog.get('new_field_xyz').display == 'Brand New Field'  # pyright: ignore
+    assert catalog.get('24h_vol|5').markets == ('crypto',)  # pyright: ignore
+    assert catalog.exchanges('india') == ['BSE', 'NSE']
+
+    # the saved index is newer than the shipped one, so it's loaded next time
+    reloaded = FieldCatalog(path=tmp_path / 'fields.json')
+    assert 'new_field_xyz' in reloaded and reloaded.built == catalog.built
+
+
+def test_invalid_local_index_is_ignored(tmp_path):
+    path = tmp_path / 'fields.json'
+    index = json.loads(SHIPPED_INDEX.read_bytes())
+    path.write_text(json.dumps({**index, 'version': INDEX_VERSION + 1, 'built': 2**40}))
+    assert FieldCatalog(path=path).built == index['built']
+    path.write_text('{not json')
+    assert FieldCatalog(path=path).built == index['built']
+
+
+def test_refresh_keeps_the_fields_of_failed_screeners(tmp_path, catalog: FieldCatalog):
+    before = {f.name for f in catalog.fields('crypto')}
+    catalog.transport = FlakyTransport()  # pyright: ignore
+    catalog.refresh()
+
+    assert 'new_field_xyz' in catalog
+    assert {f.name for f in catalog.fields('crypto')} == before
+    assert not (tmp_path / 'fields.json').exists()  # a partial index isn't saved
+
+    class DownTransport:
+        def get(self, url: str, **kwargs):
+            raise ConnectionError('down')
+
+    catalog.transport = DownTransport()  # pyright: ignore
+    with pytest.raises(ConnectionError):
+        catalog.refresh()
+    assert 'new_field_xyz' in catalog
+
+
+def test_ensure_built(tmp_path, catalog: FieldCatalog):
+    assert catalog.is_seed
+    assert catalog.ensure_built()
+    assert not catalog.is_seed and 'new_field_xyz' in catalog
+    assert catalog.ensure_built()
+    assert len(catalog.transport.urls) == len(catalog.market_names)  # pyright: ignore
+
+    class DownTransport(FakeTransport):
+        def get(self, url: str, **kwargs) -> FakeResponse:
+            self.urls.append(url)
+            raise ConnectionError('boom')
+
+    # a failure keeps the seed, and isn't retried in the foreground
+    seed = FieldCatalog(path=tmp_path / 'other.json', transport=DownTransport())  # pyright: ignore
+    assert not seed.ensure_built() and not seed.ensure_built()
+    assert len(seed.transport.urls) == len(seed.market_names)  # pyright: ignore
+    assert 'close' in seed
+
+
+def test_build_index(tmp_path):
+    path = tmp_path / 'fields.json'
+    path.write_bytes(SHIPPED_INDEX.read_bytes())
+    with pytest.raises(ConnectionError):  # strict: no mix of fresh and old fields
+        build_index(path, transport=FlakyTransport())  # pyright: ignore
+    assert path.read_bytes() == SHIPPED_INDEX.read_bytes()
+
+    catalog = build_index(path, transport=FakeTransport())  # pyright: ignore
+    assert not catalog.is_seed
+    # one field per line
+    content = path.read_bytes()
+    assert len(content.splitlines()) == len(json.loads(content)['fields']) == len(catalog)
+    assert FieldCatalog(path=path).get('new_field_xyz') == catalog.get('new_field_xyz')
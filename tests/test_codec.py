@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from tradingview_screener import Query, col, query as query_module
+from tradingview_screener.codec import (
+    Codec,
+    get_default_codec,
+    iter_json_array,
+    loads_stream,
+    set_default_codec,
+)
+
+BODY = json.dumps(
+    {
+        'totalCount': 12345,
+        'params': {'note': 'héllo ✓ [not, the, array]'},
+        'data': [
+            {'s': f'NSE:S{i}', 'd': [i * 1.5, -(10**i), 'Energy ✓', None, True, {'x': [i]}]}
+            for i in range(20)
+        ],
+        'tail': 1e-7,
+    },
+    ensure_ascii=False,
+    indent=1,
+).encode()
+
+
+def chunked(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.fixture
+def stdlib_codec():
+    previous = get_default_codec()
+    set_default_codec('json')
+    yield
+    set_default_codec(previous)
+
+
+@pytest.mark.parametrize('name', ['json', 'orjson'])
+def test_codec_round_trip(name: str):
+    pytest.importorskip(name)
+    codec = Codec(name)
+    obj = {'a': [1, 2.5, None, 'é'], 'b': {'c': True}}
+    assert codec.loads(codec.dumps(obj)) == obj
+    assert codec.loads(codec.dumps(obj).decode()) == obj
+    # the values the backend doesn't know are passed to `default`
+    assert codec.loads(codec.dumps({'x': {1, 2}}, default=sorted)) == {'x': [1, 2]}
+    assert codec.loads(codec.dumps([np.int64(3)], default=lambda o: o.item())) == [3]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Codec('simplejson')
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 64, len(BODY)])
+def test_iter_json_array(size: int):
+    header = {}
+    rows = list(iter_json_array(chunked(BODY, size), 'data', header))
+    expected = json.loads(BODY)
+    assert rows == expected.pop('data')
+    assert header == expected
+
+
+@pytest.mark.parametrize(
+    'body',
+    [b'{"data": [1, 2', b'{"totalCount": 1, "data": [1 2]}', b'[1, 2]', b'{"data": [{"s": "x"}]'],
+)
+def test_iter_json_array_invalid(body: bytes):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(chunked(body, 3), 'data'))
+
+
+def test_loads_stream(stdlib_codec):
+    assert loads_stream(chunked(BODY, 5)) == json.loads(BODY)
+    assert loads_stream([b'{"data": null, "a": []}']) == {'data': None, 'a': []}
+    assert loads_stream([b'{}']) == {'data': []}
+
+
+def test_streamed_scan(scanner_server, stdlib_codec, monkeypatch):
+    scanner_server.response = {
+        'totalCount': 3,
+        'data': [{'s': f'NSE:S{i}', 'd': [i + 0.5, f'S{i} ✓']} for i in range(3)],
+    }
+    q = Query().select('close', 'name').where(col('close') > 0)
+    q.url = scanner_server.url
+    count, expected = q.get_scanner_data()
+
+    monkeypatch.setattr(query_module, 'STREAM_MIN_ROWS', 1)
+    count2, df = q.copy().get_scanner_data()
+    assert count == count2 == 3
+    assert df.equals(expected)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import pytest
+
+from tradingview_screener.decoder import decode_scanner_data
+
+COLUMNS = ['name', 'close', 'volume', 'is_primary', 'typespecs', 'sector', 'dividends', 'close']
+DATA = [
+    {'s': 'NSE:A', 'd': ['A', 10, 100, True, ['common'], 'Finance', None, 10]},
+    {'s': 'NSE:B', 'd': ['B', 10.5, 200, False, ['preferred'], None, 1.5, 10.5]},
+    {'s': 'NSE:C', 'd': ['C', None, 300, True, [], 'Energy', 2, None]},
+]
+
+
+def _row_based(data: list, columns: list[str]) -> pd.DataFrame:
+    # the construction `Query.get_scanner_data()` used before the columnar decoder
+    return pd.DataFrame(data=([row['s'], *row['d']] for row in data), columns=['ticker', *columns])
+
+
+@pytest.mark.parametrize('data', [DATA, DATA[:1], []])
+def test_same_as_row_based(data: list):
+    pd.testing.assert_frame_equal(decode_scanner_data(data, COLUMNS), _row_based(data, COLUMNS))
+
+
+def test_inferred_dtypes():
+    df = decode_scanner_data(DATA, COLUMNS)
+
+    assert df['close'].iloc[:, 0].dtype == 'float64'
+    assert df['volume'].dtype == 'int64'
+    assert df['is_primary'].dtype == 'bool'
+    assert df['typespecs'].tolist() == [['common'], ['preferred'], []]
+
+
+def test_explicit_dtypes():
+    data = [{'s': 'NSE:A', 'd': [1, 1700000000]}, {'s': 'NSE:B', 'd': [None, None]}]
+    df = decode_scanner_data(data, ['volume', 'earnings_release_date'], dtypes={
+        'volume': 'int',
+        'earnings_release_date': 'time',
+    })
+
+    assert df['volume'].dtype == 'float64'  # int with nulls
+    assert df['earnings_release_date'].iloc[0] == pd.Timestamp('2023-11-14 22:13:20')
+    assert pd.isna(df['earnings_release_date'].iloc[1])
+
+
+def test_start_offset():
+    assert decode_scanner_data(DATA, COLUMNS, start=40).index.tolist() == [40, 41, 42]
+
+
+def test_nullable_and_categorical_dtypes():
+    data = [
+        {'s': 'NSE:A', 'd': [True, 1, 'Finance']},
+        {'s': 'NSE:B', 'd': [None, None, None]},
+        {'s': 'NSE:C', 'd': [False, 3, 'Finance']},
+    ]
+    columns = ['is_primary', 'employees', 'sector']
+    dtypes = {'is_primary': 'boolean', 'employees': 'Int64', 'sector': 'category'}
+    df = decode_scanner_data(data, columns, dtypes)
+
+    assert df['is_primary'].dtype == 'boolean'
+    assert df['is_primary'].isna().tolist() == [False, True, False]
+    assert df['employees'].dtype == 'Int64' and df['employees'].tolist()[::2] == [1, 3]
+    assert isinstance(df['sector'].dtype, pd.CategoricalDtype)
+    assert df['sector'].cat.categories.tolist() == ['Finance']
+    assert df['sector'].isna().tolist() == [False, True, False]
+
+    # values that don't fit the dtype fall back to inference
+    df = decode_scanner_data([{'s': 'NSE:A', 'd': [1.5]}], ['employees'], {'employees': 'Int64'})
+    assert df['employees'].dtype == 'float64'
+
+
+@pytest.mark.parametrize(
+    'kind, values',
+    [
+        ('float', ['x', 1.5]),
+        ('time', ['2026-01-01', None]),
+        ('int', [1.5, 2]),  # not truncated
+        ('bool', ['x', True]),
+        ('float', [[1], None]),
+    ],
+)
+def test_schema_mismatch_falls_back_to_inference(kind: str, values: list):
+    data = [{'s': f'NSE:{i}', 'd': [value]} for i, value in enumerate(values)]
+    df = decode_scanner_data(data, ['field'], {'field': kind})
+    pd.testing.assert_frame_equal(df, decode_scanner_data(data, ['field']))
+
+
+@pytest.fixture
+def typed_catalog(tmp_path):
+    # the shipped index has no types, as a refresh from the typed (HTML table) docs would have
+    from tradingview_screener.catalog import INDEX_VERSION, FieldCatalog
+
+    types = ['price', 'text', 'bool', 'time', 'set', 'number']
+    fields = [
+        ['close', 'Price', 0, 1],
+        ['name', 'Name', 1, 1],
+        ['sector', 'Sector', 1, 1],
+        ['is_primary', 'Primary Listing', 2, 1],
+        ['earnings_release_date', 'Recent Earnings Date', 3, 1],
+        ['typespecs', 'Type Specs', 4, 1],
+        ['volume', 'Volume', 5, 1],
+    ]
+    index = {'version': INDEX_VERSION, 'built': 1, 'source': '', 'markets': ['stocks'],
+             'types': types, 'exchanges': {}, 'fields': fields}
+    path = tmp_path / 'fields.json'
+    path.write_text(json.dumps(index))
+    return FieldCatalog(path=path)
+
+
+def test_field_schema(tmp_path, typed_catalog):
+    from tradingview_screener.catalog import FieldCatalog, FieldSchema
+
+    untyped = FieldSchema(FieldCatalog(path=tmp_path / 'seed.json'))  # the shipped seed: inferred
+    assert untyped.get('close') is None and len(untyped) == 0
+
+    schema = FieldSchema(typed_catalog, overrides={'volume': 'Int64'})
+    assert schema['close'] == 'float'
+    assert schema['sector'] == 'category' and schema['name'] == 'string'
+    assert schema['is_primary'] == 'boolean' and schema['earnings_release_date'] == 'time'
+    assert schema['volume'] == 'Int64'
+    assert schema.get('typespecs') is None  # a set, left to inference
+    assert schema.get('not_a_field') is None
+    assert 'close' in schema and 'typespecs' not in schema
+
+
+def test_query_schema(scanner_server, typed_catalog):
+    from tradingview_screener import Query
+    from tradingview_screener.catalog import FieldSchema
+
+    scanner_server.response = {
+        'totalCount': 2,
+        'data': [{'s': 'NSE:A', 'd': [10, 'Finance']}, {'s': 'NSE:B', 'd': [11, 'Energy']}],
+    }
+    q = Query().select('close', 'sector')
+    q.url = scanner_server.url
+    from tradingview_screener.cache import ScanCache
+
+    inferred = q.fingerprint()
+    inferred_key = ScanCache.key(q)
+    assert not isinstance(q.get_scanner_data()[1]['sector'].dtype, pd.CategoricalDtype)
+
+    q.set_schema(FieldSchema(typed_catalog))
+    # the same request (coalesced with the other one), but not the same cached DataFrame
+    assert q.fingerprint() == inferred and ScanCache.key(q) != inferred_key
+    df = q.copy().get_scanner_data()[1]
+    assert df['close'].dtype == 'float64'
+    assert isinstance(df['sector'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from tradingview_screener import DeltaQuery, Query, col
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def universe() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            'ticker': ['NSE:A', 'NSE:B', 'NSE:C', 'NSE:D'],
+            'name': ['A', 'B', 'C', 'D'],
+            'sector': ['Finance', 'Energy', 'Finance', None],
+            'close': [10.0, 20.0, 30.0, 1.0],
+            'volume': [100.0, 200.0, 300.0, 400.0],
+        }
+    )
+
+
+@pytest.fixture
+def live(scanner_server, local_scanner, universe) -> DeltaQuery:
+    scanner_server.response = local_scanner(lambda: universe)
+    query = Query().select('name', 'sector', 'close', 'volume').where(col('close') > 5)
+    query.url = scanner_server.url
+    return DeltaQuery(query.order_by('close', ascending=False), full_every=60, clock=FakeClock())
+
+
+def test_delta_refresh(scanner_server, universe, live: DeltaQuery):
+    delta = live.refresh()
+    assert delta.full
+    assert delta.added['ticker'].tolist() == ['NSE:C', 'NSE:B', 'NSE:A']
+    assert delta.removed == [] and len(delta.changed) == 0
+
+    # nothing changed, and only the volatile columns were requested
+    delta = live.refresh()
+    assert not delta
+    assert scanner_server.requests[-1]['columns'] == ['close', 'volume']
+
+    universe.loc[1, 'close'] = 21.0  # NSE:B moves
+    universe.loc[0, 'close'] = 2.0  # NSE:A leaves the result
+    universe.loc[3, 'close'] = 50.0  # NSE:D enters it
+    universe.loc[2, 'sector'] = 'Energy'  # a slow column, not refreshed yet
+    delta = live.refresh()
+    assert not delta.full
+    assert delta.added.to_dict('records') == [
+        {'ticker': 'NSE:D', 'name': 'D', 'sector': None, 'close': 50.0, 'volume': 400.0}
+    ]
+    assert delta.removed == ['NSE:A']
+    assert delta.changed['ticker'].tolist() == ['NSE:B']
+    assert delta.changed['close'].tolist() == [21.0]
+    assert delta.cells.set_index('ticker').loc['NSE:B'].to_dict() == {
+        'close': True, 'volume': False
+    }
+    # the slow columns of NSE:D were looked up on their own
+    assert scanner_server.requests[-1]['symbols']['tickers'] == ['NSE:D']
+    assert live.stats == {'full': 1, 'delta': 2, 'lookups': 1}
+
+    # the merged frame is what a full request would return (except for the stale sector)
+    _, expected = live.query.get_scanner_data()
+    assert live.frame['ticker'].tolist() == expected['ticker'].tolist()
+    assert live.frame.columns.tolist() == expected.columns.tolist()
+    assert live.frame['sector'].tolist()[1:] == ['Finance', 'Energy']
+    assert expected['sector'].tolist()[1:] == ['Energy', 'Energy']
+
+    live.clock.now += 60  # pyright: ignore
+    delta = live.refresh()
+    assert delta.full
+    assert delta.changed['ticker'].tolist() == ['NSE:C']
+    assert delta.cells.set_index('ticker').loc['NSE:C', 'sector']
+    pd.testing.assert_frame_equal(live.frame, expected)
+
+
+def test_frame_before_refresh(live: DeltaQuery):
+    with pytest.raises(RuntimeError):
+        live.frame
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingview_screener import And, Or, Query, col
+from tradingview_screener.local import UnsupportedOperationError, evaluate, scan_local
+
+NOW = dt.datetime(2024, 5, 15, 12)  # a Wednesday
+
+
+@pytest.fixture
+def universe() -> pd.DataFrame:
+    day = 24 * 3600
+    today = NOW.replace(tzinfo=dt.timezone.utc).timestamp()
+    return pd.DataFrame(
+        {
+            'ticker': ['NSE:A', 'NSE:B', 'NSE:C', 'BSE:D', 'NSE:E'],
+            'name': ['Alpha', 'Beta', 'Gamma', 'Delta', None],
+            'type': ['stock', 'stock', 'fund', 'stock', 'dr'],
+            'typespecs': [['common'], ['preferred'], ['etf'], ['common', 'reit'], []],
+            'close': [10.0, 25.0, np.nan, 100.0, 5.0],
+            'VWAP': [9.0, 26.0, 1.0, 50.0, 5.0],
+            'volume': [100, 200, 300, 400, 500],
+            'is_primary': [True, False, True, True, False],
+            'earnings_date': [today, today + day, today + 8 * day, np.nan, today - 40 * day],
+        }
+    )
+
+
+def tickers(df: pd.DataFrame, expr) -> list[str]:
+    return df['ticker'][evaluate(df, expr, now=NOW)].tolist()
+
+
+def test_comparisons(universe):
+    assert tickers(universe, col('close') > 10) == ['NSE:B', 'BSE:D']
+    assert tickers(universe, col('close') >= 10) == ['NSE:A', 'NSE:B', 'BSE:D']
+    assert tickers(universe, col('close') < 'VWAP') == ['NSE:B']  # field on the right side
+    assert tickers(universe, col('close') == col('VWAP')) == ['NSE:E']
+    assert tickers(universe, col('type') == 'fund') == ['NSE:C']
+    assert tickers(universe, col('is_primary') == True) == ['NSE:A', 'NSE:C', 'BSE:D']  # noqa
+    # nulls never match, like in SQL
+    assert tickers(universe, col('close') != 10) == ['NSE:B', 'BSE:D', 'NSE:E']
+    assert tickers(universe, col('name') != 'Alpha') == ['NSE:B', 'NSE:C', 'BSE:D']
+
+
+def test_ranges_and_sets(universe):
+    assert tickers(universe, col('close').between(10, 25)) == ['NSE:A', 'NSE:B']
+    assert tickers(universe, col('close').not_between(10, 25)) == ['BSE:D', 'NSE:E']
+    assert tickers(universe, col('volume').between('close', 'VWAP')) == []
+    assert tickers(universe, col('type').isin(['fund', 'dr'])) == ['NSE:C', 'NSE:E']
+    assert tickers(universe, col('type').not_in(['stock'])) == ['NSE:C', 'NSE:E']
+    assert tickers(universe, col('typespecs').has(['common', 'etf'])) == [
+        'NSE:A', 'NSE:C', 'BSE:D'
+    ]
+    assert tickers(universe, col('typespecs').has('reit')) == ['BSE:D']
+    assert tickers(universe, col('typespecs').has_none_of(['reit', 'etf'])) == [
+        'NSE:A', 'NSE:B', 'NSE:E'
+    ]
+
+
+def test_strings_and_nulls(universe):
+    assert tickers(universe, col('name').like('ta')) == ['NSE:B', 'BSE:D']
+    assert tickers(universe, col('name').not_like('ta')) == ['NSE:A', 'NSE:C']
+    assert tickers(universe, col('name').empty()) == ['NSE:E']
+    assert tickers(universe, col('close').not_empty()) == ['NSE:A', 'NSE:B', 'BSE:D', 'NSE:E']
+
+
+def test_percentages(universe):
+    assert tickers(universe, col('close').above_pct('VWAP', 1.1)) == ['NSE:A', 'BSE:D']
+    assert tickers(universe, col('close').below_pct('VWAP', 1)) == ['NSE:B']
+    assert tickers(universe, col('close').between_pct('VWAP', 0.9, 1.2)) == [
+        'NSE:A', 'NSE:B', 'NSE:E'
+    ]
+    assert tickers(universe, col('close').not_between_pct('VWAP', 0.9, 1.2)) == ['BSE:D']
+
+
+def test_date_ranges(universe):
+    assert tickers(universe, col('earnings_date').in_day_range(0, 0)) == ['NSE:A']
+    assert tickers(universe, col('earnings_date').in_day_range(0, 7)) == ['NSE:A', 'NSE:B']
+    assert tickers(universe, col('earnings_date').in_week_range(0, 1)) == [
+        'NSE:A', 'NSE:B', 'NSE:C'
+    ]
+    assert tickers(universe, col('earnings_date').in_month_range(-2, -1)) == ['NSE:E']
+
+
+def test_and_or(universe):
+    expr = Or(
+        And(col('type') == 'stock', col('typespecs').has(['common'])),
+        And(col('type') == 'fund', col('close').empty()),
+    )
+    assert tickers(universe, expr) == ['NSE:A', 'NSE:C', 'BSE:D']
+    # the form stored in `query['filter2']`
+    assert tickers(universe, expr['operation']) == ['NSE:A', 'NSE:C', 'BSE:D']
+
+
+def test_unsupported(universe):
+    with pytest.raises(UnsupportedOperationError):
+        evaluate(universe, col('close').crosses_above('VWAP'))
+    with pytest.raises(UnsupportedOperationError):
+        evaluate(universe, col('RSI') > 70)
+    with pytest.raises(UnsupportedOperationError):
+        evaluate(universe, col('close') > 'RSI')  # an unknown field, not a literal
+    with pytest.raises(UnsupportedOperationError):
+        query = Query().set_property('symbols', {'symbolset': ['SYML:NSE;NIFTY']})
+        scan_local(universe, query.order_by('close').query)
+
+
+def test_scan_local(universe):
+    query = (
+        Query()
+        .select('name', 'close')
+        .where(col('type') == 'stock')
+        .where2(Or(col('close') > 20, col('is_primary') == True))  # noqa
+        .order_by('close', ascending=False)
+        .limit(2)
+    )
+    count, df = scan_local(universe, query.query)
+    assert count == 3
+    assert df.to_dict('list') == {
+        'ticker': ['BSE:D', 'NSE:B'],
+        'name': ['Delta', 'Beta'],
+        'close': [100.0, 25.0],
+    }
+
+    # nulls go last (unless `nulls_first`) and the offset is applied after sorting
+    query = Query().select('close').order_by('close').offset(1).limit(5)
+    assert scan_local(universe, query.query)[1]['ticker'].tolist() == [
+        'NSE:A', 'NSE:B', 'BSE:D', 'NSE:C'
+    ]
+    query.order_by('close', nulls_first=True)
+    assert scan_local(universe, query.query)[1]['ticker'].tolist() == [
+        'NSE:E', 'NSE:A', 'NSE:B', 'BSE:D'
+    ]
+
+    query = Query().select('close').set_tickers('NSE:A', 'BSE:D').order_by('volume')
+    assert scan_local(universe, query.query)[1]['ticker'].tolist() == ['NSE:A', 'BSE:D']
+
+    # the default sort field (`Value.Traded`) isn't in the universe
+    with pytest.raises(UnsupportedOperationError):
+        scan_local(universe, Query().select('close').query)
+
+
+def test_get_scanner_data_local_falls_back(scanner_server, universe):
+    scanner_server.response = {'totalCount': 1, 'data': [{'s': 'NSE:B', 'd': [25.0]}]}
+    query = Query().select('close').where(col('close').crosses_above('VWAP')).order_by('close')
+    query.url = scanner_server.url
+
+    with pytest.raises(UnsupportedOperationError):
+        query.get_scanner_data_local(universe, fallback=False)
+    assert len(scanner_server.requests) == 0
+
+    count, df = query.get_scanner_data_local(universe)
+    assert count == 1
+    assert df['ticker'].tolist() == ['NSE:B']
+    assert len(scanner_server.requests) == 1
+
+    query = Query().select('close').where(col('close') > 20).order_by('close')
+    count, _ = query.get_scanner_data_local(universe)
+    assert count == 2
+    assert len(scanner_server.requests) == 1
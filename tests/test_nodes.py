@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import copy
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from tradingview_screener import And, Column, FilterNode, Or, Query, col
+from tradingview_screener.nodes import FrozenList, freeze, to_json
+
+
+def canonical(obj) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def test_column_is_interned_and_immutable():
+    assert Column('close') is col('close')
+    assert copy.deepcopy(Column('close')) is Column('close')
+    assert pickle.loads(pickle.dumps(Column('close'))) is Column('close')
+    assert {Column('close'): 1}[Column('close')] == 1
+    with pytest.raises(AttributeError):
+        Column('close').name = 'open'  # pyright: ignore
+
+
+def test_str_subclass_names():
+    # i.e. column names taken from a DataFrame or an ndarray
+    assert Column(np.str_('close')) is Column('close')
+    assert type(Column(np.str_('close')).name) is str
+    query = Query().select(np.str_('close'), 'volume')
+    assert query.query['columns'] == ['close', 'volume']
+    assert type(query.query['columns'][0]) is str
+
+
+def test_filters_are_frozen_dicts():
+    f = col('close').between(1, col('VWAP'))
+    assert f == {'left': 'close', 'operation': 'in_range', 'right': [1, 'VWAP']}
+    assert isinstance(f, FilterNode) and isinstance(f['right'], FrozenList)
+    # the same filter is built only once
+    assert col('close').between(1, 'VWAP') is f
+    with pytest.raises(TypeError):
+        f['left'] = 'open'  # pyright: ignore
+    with pytest.raises(TypeError):
+        f['right'].append(2)
+
+    # `1`, `1.0` and `True` are equal in Python, but they are different filters
+    assert to_json(col('x') == 1) == '{"left":"x","operation":"equal","right":1}'
+    assert to_json(col('x') == True) == '{"left":"x","operation":"equal","right":true}'  # noqa: E712
+    assert to_json(col('x') == 1.0) == '{"left":"x","operation":"equal","right":1.0}'
+
+
+def test_structural_hashing():
+    a = And(col('type') == 'stock', Or(col('close') > 5, col('sector').isin(['Finance'])))
+    b = freeze(
+        {
+            'operation': {
+                'operator': 'and',
+                'operands': [
+                    {'expression': {'left': 'type', 'operation': 'equal', 'right': 'stock'}},
+                    {
+                        'operation': {
+                            'operator': 'or',
+                            'operands': [
+                                {'expression': {'left': 'close', 'operation': 'greater', 'right': 5}},
+                                {
+                                    'expression': {
+                                        'left': 'sector',
+                                        'operation': 'in_range',
+                                        'right': ['Finance'],
+                                    }
+                                },
+                            ],
+                        }
+                    },
+                ],
+            }
+        }
+    )
+    assert a == b and a is not b
+    assert hash(a) == hash(b)
+    assert len({a, b}) == 1
+    assert copy.deepcopy(a) is a
+    assert pickle.loads(pickle.dumps(a)) == a
+
+
+def test_json_is_canonical():
+    q = (
+        Query()
+        .select('name', 'close')
+        .where(col('close').between_pct('EMA200', 1.2), col('exchange') != 'OTC')
+        .where2(Or(col('type') == 'stock', And(col('type') == 'fund', col('is_primary') == True)))  # noqa: E712
+        .order_by('close')
+    )
+    assert q.to_json() == canonical(q.query)
+    assert json.loads(q.to_json()) == q.query
+    # the cached fragments are reused by other trees
+    nested = And(q.query['filter2'], col('close') > 1)  # pyright: ignore
+    assert to_json(nested) == canonical(nested)
+    assert to_json({'a': [float('nan'), None, (1, 2)]}) == canonical({'a': [float('nan'), None, [1, 2]]})
+    # numpy scalars are sent as plain numbers
+    assert to_json(col('x').isin(np.array([1, 2]))['right']) == '[1,2]'
+    assert to_json(col('x') == np.float64(2.5)) == canonical(col('x') == 2.5)
+
+
+def test_copy_and_fingerprint():
+    q = Query().where(col('close') > 5)
+    other = q.copy()
+    other.query['filter'].append(col('volume') > 1)  # the list of filters is still mutable
+    assert len(q.query['filter']) == 1
+    assert other.fingerprint() != q.fingerprint()
+    assert q.copy().fingerprint() == q.fingerprint()
+
+
+def test_sent_body(scanner_server):
+    scanner_server.response = {'totalCount': 0, 'data': []}
+    q = Query().select('close').where(col('close').isin([1, 2]))
+    q.url = scanner_server.url
+    q.get_scanner_data()
+    assert scanner_server.requests[-1] == q.query
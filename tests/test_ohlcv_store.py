@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ohlcv_store import OhlcvStore
+
+
+def write_csv(data_dir, symbol: str, closes: list, start: str = '2026-01-01') -> str:
+    dates = pd.bdate_range(start, periods=len(closes))
+    df = pd.DataFrame({
+        'Date': dates.strftime('%Y-%m-%d'),
+        'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+        'Volume': [1000] * len(closes),
+    })
+    path = os.path.join(data_dir, f'{symbol}.csv')
+    df.iloc[::-1].to_csv(path, index=False)  # unsorted, as the store sorts by date
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'daily'
+    path.mkdir()
+    return str(path)
+
+
+def test_reads_each_symbol_as_views(data_dir, tmp_path):
+    write_csv(data_dir, 'tcs', [1.0, 2.0, 3.0])
+    write_csv(data_dir, 'infy', [10.0, 20.0])
+    store = OhlcvStore(data_dir, cache_dir=str(tmp_path / 'cache'))
+    assert store.refresh() and not store.refresh()
+    assert sorted(store.symbols) == ['infy', 'tcs'] and 'TCS' in store
+
+    bars = store.get('MISSING', None, ' TCS ')
+    assert bars.symbol == 'tcs' and bars.close.tolist() == [1.0, 2.0, 3.0]
+    assert bars.date[0] == np.datetime64('2026-01-01')
+    assert isinstance(bars.close.base.base, np.memmap)  # a view of the mapped file
+    assert not bars.close.flags.writeable
+    df = store.frame('infy')
+    assert df.columns.tolist() == ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+    assert df['Date'].dt.date.tolist() == [pd.Timestamp('2026-01-01').date(), pd.Timestamp('2026-01-02').date()]
+    assert store.get('nope') is None and store.frame('nope') is None
+
+
+def test_incremental_refresh(data_dir, tmp_path, monkeypatch):
+    write_csv(data_dir, 'tcs', [1.0, 2.0])
+    infy = write_csv(data_dir, 'infy', [10.0])
+    cache_dir = str(tmp_path / 'cache')
+    OhlcvStore(data_dir, cache_dir=cache_dir).refresh()
+
+    # a new process loads the cache, and only parses the CSVs that changed
+    store = OhlcvStore(data_dir, cache_dir=cache_dir)
+    assert store.get('tcs').close.tolist() == [1.0, 2.0]
+    parsed = []
+    read_csv = OhlcvStore._read_csv
+    monkeypatch.setattr(OhlcvStore, '_read_csv', staticmethod(lambda p: parsed.append(p) or read_csv(p)))
+    assert not store.refresh() and parsed == []
+
+    old = store.get('tcs')
+    write_csv(data_dir, 'infy', [10.0, 11.0, 12.0])
+    os.utime(infy, ns=(1, 1))
+    write_csv(data_dir, 'wipro', [5.0])
+    os.remove(os.path.join(data_dir, 'tcs.csv'))
+    assert store.refresh()
+    assert sorted(os.path.basename(p) for p in parsed) == ['infy.csv', 'wipro.csv']
+    assert store.get('infy').close.tolist() == [10.0, 11.0, 12.0]
+    assert 'tcs' not in store and store.get('wipro').close.tolist() == [5.0]
+    # the views of the previous generation are still valid
+    assert old.close.tolist() == [1.0, 2.0]
+
+
+
+def test_get_reads_a_single_generation(data_dir, tmp_path):
+    class RacyStore(OhlcvStore):
+        race = None
+
+        def __getattribute__(self, name):
+            value = super().__getattribute__(name)
+            race = super().__getattribute__('race')
+            if name == '_state' and race is not None:
+                self.race = None
+                race()  # a refresh lands right after the read
+            return value
+
+    write_csv(data_dir, 'a', [1.0])
+    write_csv(data_dir, 'b', [2.0] * 3)
+    store = RacyStore(data_dir, cache_dir=str(tmp_path / 'cache'))
+    store.refresh()
+    # the offsets of `b` move with the length of `a`
+    os.utime(write_csv(data_dir, 'a', [1.0] * 4), ns=(1, 1))
+    store.race = store.refresh
+    assert store.get('b').close.tolist() == [2.0] * 3  # all from the previous generation
+    assert store.get('a').close.tolist() == [1.0] * 4
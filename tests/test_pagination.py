@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from tradingview_screener import Query
+
+TOTAL = 95
+
+
+def _paginated(payload: dict) -> dict:
+    start, end = payload['range']
+    return {
+        'totalCount': TOTAL,
+        'data': [{'s': f'NSE:S{i}', 'd': [i, i * 1.5]} for i in range(start, min(end, TOTAL))],
+    }
+
+
+@pytest.fixture
+def query(scanner_server) -> Query:
+    scanner_server.response = _paginated
+    q = Query().select('rank', 'close')
+    q.url = scanner_server.url
+    return q
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_iter_pages(scanner_server, query: Query, prefetch: bool):
+    chunks = list(query.limit(1000).iter_pages(page_size=20, prefetch=prefetch))
+
+    assert [len(df) for df in chunks] == [20, 20, 20, 20, 15]
+    # the last request is trimmed to `totalCount`
+    assert [p['range'] for p in scanner_server.requests] == [
+        [0, 20], [20, 40], [40, 60], [60, 80], [80, 95]
+    ]
+    # concatenating the chunks gives the same result as a single request
+    _, expected = query.get_scanner_data()
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    # the range of the original query is left untouched
+    assert query.query['range'] == [0, 1000]
+
+
+def test_iter_pages_respects_range(scanner_server, query: Query):
+    chunks = list(query.offset(10).limit(50).iter_pages(page_size=15))
+
+    assert [p['range'] for p in scanner_server.requests] == [[10, 25], [25, 40], [40, 50]]
+    assert chunks[0].index[0] == 10
+    assert pd.concat(chunks)['rank'].tolist() == list(range(10, 50))
+
+
+def test_iter_pages_stop_early(scanner_server, query: Query):
+    pages = query.limit(1000).iter_pages(page_size=10)
+    first = next(pages)
+    pages.close()
+
+    assert first['rank'].tolist() == list(range(10))
+    assert len(scanner_server.requests) <= 2
+
+
+def test_iter_rows(query: Query):
+    rows = list(query.limit(1000).iter_rows(page_size=40))
+
+    assert len(rows) == TOTAL
+    assert rows[3] == {'ticker': 'NSE:S3', 'rank': 3, 'close': 4.5}
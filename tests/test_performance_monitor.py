@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import requests
+
+from src import performance_monitor
+from src.performance_monitor import (
+    PerformanceMonitor,
+    _percentile,
+    serve_metrics,
+    serve_metrics_from_env,
+    set_page,
+)
+from tradingview_screener import Query
+
+
+def test_percentile():
+    ordered = [float(i) for i in range(1, 101)]
+    assert _percentile(ordered, 0.5) == 50
+    assert _percentile(ordered, 0.95) == 95
+    assert _percentile(ordered, 1.0) == 100
+    assert _percentile([], 0.5) == 0
+
+
+def test_stages_and_summary(tmp_path):
+    monitor = PerformanceMonitor(max_samples=3, jsonl_path=str(tmp_path / 'perf.jsonl'))
+    set_page('Scanner')
+    with monitor.stage('http') as span:
+        time.sleep(0.01)
+        span.nbytes = 100
+    for wall in (0.001, 0.002, 0.003, 0.004):
+        monitor.record('decode', wall, nbytes=10)
+    monitor.record('render', 1.0, page='Other')
+
+    rows = monitor.summary('Scanner')
+    assert [row['stage'] for row in rows] == ['http', 'decode']  # slowest first
+    http, decode = rows
+    assert http['count'] == 1 and http['bytes'] == 100 and http['p50_ms'] >= 10
+    # the percentiles are over the last `max_samples`, the totals over all of them
+    assert decode['count'] == 4 and decode['bytes'] == 40
+    assert decode['p50_ms'] == 3 and decode['max_ms'] == 4
+    assert monitor.slowest(limit=1)[0]['page'] == 'Other'
+
+    lines = (tmp_path / 'perf.jsonl').read_text().splitlines()
+    assert len(lines) == 6 and json.loads(lines[0])['stage'] == 'http'
+
+
+def test_page_is_per_thread():
+    monitor = PerformanceMonitor()
+    set_page('Main')
+    thread = threading.Thread(target=lambda: (set_page('Worker'), monitor.record('http', 0.1)))
+    thread.start()
+    thread.join()
+    monitor.record('http', 0.1)
+    assert sorted(row['page'] for row in monitor.summary()) == ['Main', 'Worker']
+
+
+def test_query_stages(scanner_server):
+    scanner_server.response = {'totalCount': 1, 'data': [{'s': 'NASDAQ:AAPL', 'd': [1.5]}]}
+    monitor = PerformanceMonitor()
+    set_page('Build Query')
+    q = Query().select('close').set_timer(monitor.stage)
+    q.url = scanner_server.url
+    count, df = q.copy().get_scanner_data()
+    assert count == 1 and df['close'].tolist() == [1.5]
+    assert sorted(row['stage'] for row in monitor.summary('Build Query')) == [
+        'dataframe',
+        'decode',
+        'http',
+    ]
+
+
+def test_prometheus_endpoint():
+    monitor = PerformanceMonitor()
+    monitor.record('http', 0.25, cpu=0.05, nbytes=1024, page='News "Feed"')
+    text = monitor.to_prometheus()
+    assert 'app_stage_seconds{page="News \\"Feed\\"",stage="http",quantile="0.5"} 0.250000' in text
+    assert 'app_stage_seconds_count{page="News \\"Feed\\"",stage="http"} 1' in text
+    assert 'app_stage_bytes_total{page="News \\"Feed\\"",stage="http"} 1024' in text
+
+    server = serve_metrics(port=0, monitor=monitor)
+    try:
+        base = f'http://127.0.0.1:{server.server_port}'
+        assert requests.get(f'{base}/metrics', timeout=5).text == text
+        stats = requests.get(f'{base}/stats.jsonl', timeout=5).text.splitlines()
+        assert json.loads(stats[0])['stage'] == 'http'
+        assert requests.get(f'{base}/nope', timeout=5).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        performance_monitor._server = None
+
+
+def test_serve_metrics_from_env(monkeypatch):
+    monkeypatch.delenv('PERF_METRICS_PORT', raising=False)
+    assert serve_metrics_from_env() is None
+
+    monkeypatch.setenv('PERF_METRICS_PORT', 'nope')
+    assert serve_metrics_from_env() is None
+
+    monkeypatch.setenv('PERF_METRICS_PORT', '0')
+    server = serve_metrics_from_env()
+    try:
+        assert server is not None and serve_metrics_from_env() is server  # once per process
+        assert requests.get(f'http://127.0.0.1:{server.server_port}/metrics', timeout=5).ok
+    finally:
+        server.shutdown()
+        server.server_close()
+        performance_monitor._server = None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ohlcv_store import OhlcvStore
+from utils.post_earnings import compute_post_earnings_moves
+
+
+def write_csv(data_dir, symbol: str, dates: list, closes: list, opens: list | None = None) -> None:
+    pd.DataFrame({
+        'Date': [str(d) for d in dates],
+        'Open': opens if opens is not None else closes,
+        'High': closes, 'Low': closes, 'Close': closes,
+        'Volume': [1000 + i for i in range(len(closes))],
+    }).to_csv(data_dir / f'{symbol}.csv', index=False)
+
+
+def reference(dates: list, closes: list, day0: datetime.date) -> dict:
+    """The moves of a single announcement, the way the page computed them row by row"""
+    df = pd.DataFrame({'Date': pd.to_datetime(dates), 'Close': closes})
+    future = df[df['Date'] >= pd.Timestamp(day0)].reset_index(drop=True)
+    close_0 = future.loc[0, 'Close']
+    idx = df[df['Date'] >= pd.Timestamp(day0)].index[0]
+    out = {'Pre 10d %': np.nan, 'Pre 20d %': np.nan}
+    for n in (10, 20):
+        if idx - n >= 0:
+            out[f'Pre {n}d %'] = (close_0 - df.loc[idx - n, 'Close']) / df.loc[idx - n, 'Close'] * 100
+    for n in (30, 60):
+        i = min(n, len(future) - 1)
+        out[f'Move {n}d %'] = (future.loc[i, 'Close'] - close_0) / close_0 * 100
+        out[f'Days {n}'] = i
+    out['Peak Move %'] = ((future['Close'].dropna() - close_0) / close_0 * 100).max()
+    return out
+
+
+@pytest.fixture
+def store(tmp_path):
+    data_dir = tmp_path / 'daily'
+    data_dir.mkdir()
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range('2026-01-01', periods=80).date.tolist()
+    write_csv(data_dir, 'tcs', dates, (100 + rng.normal(0, 5, 80).cumsum()).tolist())
+    write_csv(data_dir, 'infy', dates[:40], (50 + rng.normal(0, 2, 40).cumsum()).tolist())
+    store = OhlcvStore(str(data_dir), cache_dir=str(tmp_path / 'cache'))
+    store.refresh()
+    return store
+
+
+def test_matches_the_row_by_row_moves(store):
+    tcs, infy = store.get('tcs'), store.get('infy')
+    tcs_dates = tcs.date.astype('datetime64[D]').astype(object).tolist()
+    infy_dates = infy.date.astype('datetime64[D]').astype(object).tolist()
+    events = [
+        (('TCS', 532540), tcs_dates[25]),
+        (('INFY',), infy_dates[30]),  # fewer than 30 days after
+        (('nope', 'tcs'), tcs_dates[5]),  # no 10 days before, found by its second candidate
+    ]
+    moves = compute_post_earnings_moves(store, [c for c, _ in events], [d for _, d in events])
+
+    for (candidates, day), (_, move) in zip(events, moves.iterrows()):
+        bars = store.get(*candidates)
+        expected = reference(bars.date.astype(object).tolist(), bars.close.tolist(), day)
+        for column, value in expected.items():
+            assert move[column] == pytest.approx(value, nan_ok=True), column
+        assert move['Trading Day'] and move['Day 0'].date() == day
+    assert moves['Symbol'].tolist() == ['tcs', 'infy', 'tcs']
+    assert moves.loc[1, 'Days 30'] == 9 and np.isnan(moves.loc[2, 'Pre 10d %'])
+
+
+def test_weekend_and_missing(store):
+    tcs = store.get('tcs')
+    saturday = datetime.date(2026, 1, 10)
+    moves = compute_post_earnings_moves(
+        store,
+        [('tcs',), ('tcs',), ('missing',), ('tcs',)],
+        [saturday, saturday, saturday, None],
+        after=[True, False, False, False],
+    )
+    monday = datetime.date(2026, 1, 12)
+    # weekend: day 0 is the next trading day; the volume, close and gap are from the Friday
+    assert moves.loc[0, 'Day 0'].date() == monday and not moves.loc[0, 'Trading Day']
+    assert moves.loc[1, 'Day 0'].date() == monday  # on or after the date
+    i_friday = int(np.searchsorted(tcs.date, np.datetime64('2026-01-09')))
+    assert moves.loc[0, 'Close'] == tcs.close[i_friday] and moves.loc[0, 'Volume'] == 1000 + i_friday
+    assert moves.loc[0, 'Next Open'] == tcs.open[i_friday + 1]
+    gap = (tcs.open[i_friday + 1] - tcs.close[i_friday]) / tcs.close[i_friday] * 100
+    assert moves.loc[0, 'Gap %'] == pytest.approx(gap)
+
+    assert moves.loc[2, 'Symbol'] is None and moves.loc[2, ['Move 30d %', 'Close']].isna().all()
+    assert pd.isna(moves.loc[3, 'Day 0']) and np.isnan(moves.loc[3, 'Move 30d %'])
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import price_bands
+from src.cache_registry import CacheRegistry, deep_sizeof
+from src.price_bands import PriceBandTable, get_price_bands
+
+SHEET = """Symbol,Series,Security Name,Band
+NSE:SUZLON,EQ,Suzlon Energy,5
+RELIANCE,EQ,Reliance Industries,
+IRFC,EQ,Indian Railway Finance,20
+ABC,BE,Abc Ltd,No Band
+XYZ,EQ,Xyz Ltd,5
+"""
+
+
+def table() -> PriceBandTable:
+    return PriceBandTable.from_csv(io.StringIO(SHEET))
+
+
+def test_lookups():
+    bands = table()
+    assert len(bands) == 5
+    assert bands.band('SUZLON') == 5 and bands.band('nse:suzlon ') == 5
+    assert np.isnan(bands.band('RELIANCE')) and np.isnan(bands.band('ABC'))
+    assert bands.band('MISSING', default=-1) == -1
+    assert 'NSE:IRFC' in bands and 'MISSING' not in bands
+    assert bands.band_values == [5.0, 20.0] and bands.count(5) == 2
+    assert bands.symbols([5], no_band=True) == ['SUZLON', 'XYZ', 'RELIANCE', 'ABC']
+
+    symbols = ['IRFC', 'NSE:SUZLON', 'MISSING', 'RELIANCE']
+    np.testing.assert_array_equal(bands.lookup(symbols), [20, 5, np.nan, np.nan])
+    assert bands.contains(symbols).tolist() == [True, True, False, True]
+    assert bands.mask(symbols, [20]).tolist() == [True, False, False, False]
+    # `no_band` is the symbols in the sheet without a band, not those missing from it
+    assert bands.mask(symbols, [5], no_band=True).tolist() == [False, True, False, True]
+
+
+def test_join():
+    bands = table()
+    df = pd.DataFrame({'name': ['XYZ', 'RELIANCE', 'MISSING'], 'close': [1.0, 2.0, 3.0]})
+    joined = bands.join(df, on='name')
+    assert joined['Price Band'].tolist() == ['5%', 'No Band', 'No Band']
+    assert joined['close'].tolist() == [1.0, 2.0, 3.0] and 'Price Band' not in df
+    assert bands.join(df, on='name', labels=False)['Price Band'].iloc[0] == 5
+
+
+def test_table_is_read_only():
+    bands = table()
+    frame = bands.frame
+    frame['extra'] = 1
+    frame.loc[0, 'Band'] = 10
+    assert 'extra' not in bands.frame and bands.band('SUZLON') == 5
+    with pytest.raises(ValueError):
+        bands._bands[0] = 10
+    # the registry accounts for the whole table, not just the object
+    assert deep_sizeof(bands) >= bands.frame.memory_usage(deep=True).sum()
+
+
+def test_missing_columns():
+    with pytest.raises(ValueError, match='Band'):
+        PriceBandTable.from_csv(io.StringIO('Symbol,Series,Security Name\nA,EQ,A\n'))
+
+
+def test_get_price_bands_is_shared_and_keeps_the_previous_table(monkeypatch):
+    registry = CacheRegistry(10**7)
+    downloads = []
+
+    def from_csv(source):
+        downloads.append(source)
+        if len(downloads) >= 3:
+            raise OSError('offline')
+        return PriceBandTable(pd.read_csv(io.StringIO(SHEET)))
+
+    monkeypatch.setattr(PriceBandTable, 'from_csv', staticmethod(from_csv))
+    first = get_price_bands(registry=registry)
+    assert get_price_bands(registry=registry) is first and len(downloads) == 1
+
+    second = get_price_bands(refresh=True, registry=registry)
+    assert second is not first and len(downloads) == 2
+
+    monkeypatch.setattr(price_bands, 'PRICE_BANDS_TTL', 0)  # stale: download again, and fail
+    assert get_price_bands(registry=registry) is second and len(downloads) == 3
+
+    registry.clear()
+    with pytest.raises(OSError):
+        get_price_bands(registry=registry)
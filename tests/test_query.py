@@ -22,6 +22,7 @@ def test_set_markets(markets: list[str], expected_url: str):
     assert q.query['markets'] == markets  # pyright: ignore [reportTypedDictNotRequiredAccess]
 
 
+@pytest.mark.network
 def test_limit_and_offset():
     from tradingview_screener.query import DEFAULT_RANGE
 
@@ -44,6 +45,7 @@ def test_limit_and_offset():
     assert DEFAULT_RANGE == original_range
 
 
+@pytest.mark.network
 def test_order_by():
     _, df = Query().select('close').order_by('close', ascending=True).get_scanner_data()
     assert df['close'].is_monotonic_increasing
@@ -68,6 +70,7 @@ def test_order_by():
     assert df['dividends_yield_current'].isna().is_monotonic_increasing
 
 
+@pytest.mark.network
 def test_query_above_pct():
     query = Query().select('close', 'price_52_week_low').limit(100_000)
 
@@ -108,6 +111,7 @@ def test_query_above_pct():
     assert (df['close'] < df['price_52_week_high'] * 0.5).all()
 
 
+@pytest.mark.network
 def test_between_and_not_between():
     query = Query().select('close', 'VWAP').limit(100_000)
 
@@ -119,6 +123,7 @@ def test_between_and_not_between():
     assert (~df['close'].between(df['VWAP'] * 1.1, df['VWAP'] * 1.3)).all()
 
 
+@pytest.mark.network
 def test_get_scanner_data():
     # make sure that we raise an exception when the status code is not ok
     from requests import HTTPError
@@ -230,9 +235,6 @@ def test_and_or_chaining():
         )
     )
     assert query.query['filter2'] == dct  # pyright: ignore [reportTypedDictNotRequiredAccess]
-    # make sure the API accepts this filtering
-    count, _ = query.get_scanner_data()
-    assert count > 0
 
     dct = {
         'operator': 'and',
@@ -298,5 +300,32 @@ def test_and_or_chaining():
         )
     )
     assert query.query['filter2'] == dct  # pyright: ignore [reportTypedDictNotRequiredAccess]
+
+
+@pytest.mark.network
+def test_and_or_chaining_is_accepted():
+    # make sure the API accepts this filtering
+    query = Query().where2(
+        And(
+            Or(
+                And(col('type') == 'stock', col('typespecs').has(['common'])),
+                And(col('type') == 'stock', col('typespecs').has(['preferred'])),
+                And(col('type') == 'dr'),
+                And(col('type') == 'fund', col('typespecs').has_none_of(['etf'])),
+            )
+        )
+    )
+    count, _ = query.get_scanner_data()
+    assert count > 0
+
+    query = Query().where2(
+        And(
+            Or(
+                And(col('typespecs').has(['etn'])),
+                And(col('typespecs').has(['etf'])),
+                And(col('type') == 'structured'),
+            )
+        )
+    )
     count, _ = query.get_scanner_data()
     assert count > 0
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import email.utils
+import time
+
+import pytest
+import requests
+
+from tradingview_screener import Query, Transport
+from tradingview_screener.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+    request_with_backoff,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(7)]
+    assert waits[:3] == [0, 0, 0]  # the burst
+    assert waits[3:] == pytest.approx([0.5] * 4)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_token_bucket_pause_and_adaptive_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=4, burst=1, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(3)
+    assert bucket.acquire() == pytest.approx(3)
+
+    bucket.throttle()
+    bucket.throttle()
+    assert bucket.rate == 1
+    for _ in range(100):
+        bucket.throttle()
+    assert bucket.rate == bucket.min_rate == 0.25
+
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == bucket.max_rate == 4
+
+
+def test_rate_limiter_hosts():
+    limiter = RateLimiter({'api.bseindia.com': (4, 8)})
+    assert limiter.bucket('https://api.bseindia.com/BseIndiaAPI/api/x') is not None
+    assert limiter.bucket('https://api.bseindia.com/y') is limiter.bucket('https://api.bseindia.com/')
+    assert limiter.bucket('https://example.com/') is None
+    assert limiter.acquire('https://example.com/') == 0
+
+    limiter.set_limit('example.com', 1, 1)
+    assert limiter.bucket('https://example.com/').rate == 1
+    assert RateLimiter({}, default=(1, 1)).bucket('https://example.com/') is not None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('garbage') is None
+    assert parse_retry_after('7') == 7
+    assert parse_retry_after('-1') == 0
+    date = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(date) <= 60
+    assert parse_retry_after(email.utils.formatdate(0, usegmt=True)) == 0
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(3, base=1, cap=5) for _ in range(200)]
+    assert all(0 <= delay <= 5 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retries_429_honoring_retry_after(scanner_server):
+    statuses = [429, 503]
+
+    def respond(payload):
+        if statuses:
+            return statuses.pop(0), {'error': 'slow down'}, {'Retry-After': '0.1'}
+        return {'totalCount': 1, 'data': [{'s': 'NASDAQ:AAPL', 'd': []}]}
+
+    scanner_server.response = respond
+    limiter = RateLimiter({'127.0.0.1': (100, 10)})
+    with Transport(rate_limiter=limiter) as transport:
+        query = Query(transport=transport).select()
+        query.url = scanner_server.url
+        start = time.perf_counter()
+        count, df = query.get_scanner_data()
+        elapsed = time.perf_counter() - start
+
+    assert count == 1
+    assert len(scanner_server.requests) == 3
+    assert elapsed >= 0.2
+    # the 429 halved the rate of the host, and the success moved it back up a step
+    assert limiter.bucket(scanner_server.url).rate == pytest.approx(55)
+
+
+def test_gives_up_after_max_retries(scanner_server):
+    scanner_server.response = lambda payload: (500, {'error': 'boom'}, {'Retry-After': '0'})
+    with Transport(backoff_retries=2) as transport:
+        query = Query(transport=transport)
+        query.url = scanner_server.url
+        with pytest.raises(requests.HTTPError, match='boom'):
+            query.get_scanner_data_raw()
+    assert len(scanner_server.requests) == 3
+
+
+def test_retries_connection_errors():
+    calls = []
+
+    class FlakySession:
+        def request(self, method, url, **kwargs):
+            calls.append((method, url, kwargs))
+            if len(calls) < 3:
+                raise requests.ConnectionError('reset')
+            response = requests.Response()
+            response.status_code = 200
+            return response
+
+    r = request_with_backoff(
+        FlakySession(), 'GET', 'https://example.com/', base_delay=0.01, timeout=1  # type: ignore
+    )
+    assert r.status_code == 200
+    assert calls == [('GET', 'https://example.com/', {'timeout': 1})] * 3
+
+    calls.clear()
+    with pytest.raises(requests.ConnectionError):
+        request_with_backoff(FlakySession(), 'GET', 'https://example.com/', max_retries=1)  # type: ignore
+
+
+def test_read_timeouts_are_not_retried_by_default():
+    calls = []
+
+    class SlowSession:
+        def request(self, method, url, **kwargs):
+            calls.append(url)
+            if len(calls) < 2:
+                raise requests.ReadTimeout('slow')
+            response = requests.Response()
+            response.status_code = 200
+            return response
+
+    with pytest.raises(requests.ReadTimeout):
+        request_with_backoff(SlowSession(), 'GET', 'https://example.com/', base_delay=0.01)  # type: ignore
+    assert len(calls) == 1
+
+    calls.clear()
+    r = request_with_backoff(
+        SlowSession(), 'GET', 'https://example.com/', base_delay=0.01, retry_timeouts=True  # type: ignore
+    )
+    assert r.status_code == 200 and len(calls) == 2
@@ -5,9 +5,11 @@ import tradingview_screener
 from pathlib import Path
 
 import pandas as pd
+import pytest
 
 
-def _test_readme_examples():
+@pytest.mark.network
+def test_readme_examples():
     readme = Path(tradingview_screener.__file__).parents[2] / 'README.md'
     source = readme.read_text(encoding='utf-8')
 
@@ -31,6 +33,6 @@ def _test_readme_examples():
 
 
 if __name__ == '__main__':
-    _test_readme_examples()
+    test_readme_examples()
 
 # TODO: add this to CI/CD (with GH actions)
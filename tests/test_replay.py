@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+import requests
+
+from replay import Cassette, record, replay, request_key
+from tradingview_screener import Query, Transport, col
+from tradingview_screener.ratelimit import RateLimiter
+
+
+def test_request_key():
+    # the scheme and the order of the query parameters don't matter
+    assert request_key('get', 'https://a.com/x?b=2&a=1') == request_key(
+        'GET', 'http://a.com/x?a=1&b=2'
+    )
+    # JSON bodies are compared by value
+    assert request_key('POST', 'https://a.com/x', b'{"a": 1, "b": [2]}') == request_key(
+        'POST', 'https://a.com/x', '{"b":[2],"a":1}'
+    )
+    assert request_key('POST', 'https://a.com/x', b'{"a": 1}') != request_key(
+        'POST', 'https://a.com/x', b'{"a": 2}'
+    )
+
+
+def test_record_and_replay(scanner_server, tmp_path):
+    scanner_server.response = {
+        'totalCount': 2,
+        'data': [{'s': 'NSE:A', 'd': [10.5, 'A ✓']}, {'s': 'NSE:B', 'd': [None, 'B']}],
+    }
+    q = Query(transport=Transport(rate_limiter=RateLimiter({})))
+    q.select('close', 'name').where(col('close') > 1)
+    q.url = scanner_server.url
+    with record(tmp_path / 'scan.json') as cassette:
+        count, expected = q.get_scanner_data()
+        requests.get(f'http://127.0.0.1:{scanner_server.server_port}/missing', timeout=5)
+    assert len(cassette) == 2
+
+    scanner_server.shutdown()  # from here on, only the replay server answers
+    with replay(tmp_path / 'scan.json') as server:
+        count2, df = q.copy().get_scanner_data()
+        assert count2 == count and df.equals(expected)
+        assert server.hits == 1 and not server.misses
+
+        # a request that wasn't recorded
+        with pytest.raises(requests.HTTPError):
+            q.copy().limit(5).get_scanner_data()
+        assert len(server.misses) == 1
+
+
+def test_repeated_requests_replay_in_order():
+    cassette = Cassette()
+    for i in range(2):
+        cassette.add('GET', 'https://a.com/x', None, 200, str(i).encode())
+    with replay(cassette):
+        bodies = [requests.get('https://a.com/x', timeout=5).text for _ in range(3)]
+    assert bodies == ['0', '1', '1']
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tradingview_screener import Query, SingleFlight
+from tradingview_screener.singleflight import SCANNER_FLIGHT
+
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow() -> list:
+        calls.append(1)
+        started.set()
+        release.wait()
+        return calls
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(flight.do, 'key', slow)
+        started.wait()
+        followers = [executor.submit(flight.do, 'key', slow) for _ in range(7)]
+        while flight.stats['hits'] < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {'hits': 8, 'coalesced': 7, 'upstream': 1}
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 42) == 42
+    assert flight.stats['upstream'] == 2
+
+
+def test_identical_scans_share_one_request(scanner_server):
+    def slow(payload: dict) -> dict:
+        time.sleep(0.3)
+        return {'totalCount': 1, 'data': [{'s': 'NSE:A', 'd': [1.0]}]}
+
+    scanner_server.response = slow
+    query = Query().set_markets('india').select('close')
+    query.url = scanner_server.url
+    upstream = SCANNER_FLIGHT.stats['upstream']
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda _: query.copy().get_scanner_data(), range(10)))
+
+    assert all(count == 1 for count, _ in results)
+    assert len(scanner_server.requests) == 1
+    assert SCANNER_FLIGHT.stats['upstream'] == upstream + 1
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+
+import pandas as pd
+import pytest
+
+from tradingview_screener import Query, UniverseSnapshot, col
+from tradingview_screener.query import Query as _Query
+
+TOTAL = 250
+
+
+def _universe(payload: dict) -> dict:
+    start, end = payload['range']
+    columns = payload['columns']
+    rows = []
+    for i in range(start, min(end, TOTAL)):
+        values = {
+            'name': f'S{i}',
+            'sector': ('Finance', 'Tech', 'Energy')[i // 100],
+            'close': float(i),
+            'Value.Traded': float(TOTAL - i),
+        }
+        rows.append({'s': f'NSE:S{i}', 'd': [values[c] for c in columns]})
+    return {'totalCount': TOTAL, 'data': rows}
+
+
+class StubSnapshot(UniverseSnapshot):
+    url: str
+
+    def _query(self) -> _Query:
+        query = super()._query()
+        query.url = self.url
+        return query
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def snapshot(scanner_server) -> StubSnapshot:
+    scanner_server.response = _universe
+    snapshot = StubSnapshot(
+        'india', columns=['name', 'close', 'Value.Traded'], page_size=100, clock=FakeClock()
+    )
+    snapshot.url = scanner_server.url
+    return snapshot
+
+
+def test_one_download_many_queries(scanner_server, snapshot: StubSnapshot):
+    query = Query().set_markets('india').select('name', 'close').where(col('close') >= 200)
+    count, df = snapshot.get_scanner_data(query.order_by('close').limit(10))
+    assert count == 50
+    assert df['ticker'].tolist() == [f'NSE:S{i}' for i in range(200, 210)]
+    # the universe was downloaded once, one page at a time
+    assert [p['range'] for p in scanner_server.requests] == [[0, 100], [100, 200], [200, 250]]
+    assert len(snapshot.frame()) == TOTAL
+
+    for threshold in range(10):
+        query = Query().set_markets('india').select('close').where(col('close') < threshold)
+        assert snapshot.get_scanner_data(query.order_by('close'))[0] == threshold
+    assert len(scanner_server.requests) == 3
+    assert snapshot.stats == {'local': 11, 'remote': 0, 'refreshes': 1}
+
+
+def test_uncovered_queries_go_remote(scanner_server, snapshot: StubSnapshot):
+    def respond(payload: dict) -> dict:
+        if payload['columns'] == snapshot.columns:
+            return _universe(payload)
+        return {'totalCount': 1, 'data': [{'s': 'NASDAQ:AAPL', 'd': [1.0]}]}
+
+    scanner_server.response = respond
+    other_market = Query().select('close').order_by('close')
+    unknown_field = Query().set_markets('india').select('RSI').order_by('close')
+    for query in (other_market, unknown_field):
+        query.url = scanner_server.url
+        assert snapshot.get_scanner_data(query)[1]['ticker'].tolist() == ['NASDAQ:AAPL']
+    # neither of them needed the snapshot
+    assert snapshot.stats == {'local': 0, 'remote': 2, 'refreshes': 0}
+
+    remote_only = Query().set_markets('india').select('close').order_by('close')
+    remote_only.where(col('close').crosses('Value.Traded')).url = scanner_server.url
+    assert snapshot.get_scanner_data(remote_only)[1]['ticker'].tolist() == ['NASDAQ:AAPL']
+    assert snapshot.stats == {'local': 0, 'remote': 3, 'refreshes': 1}
+
+
+def test_stale_snapshot_is_refreshed_in_background(scanner_server, snapshot: StubSnapshot):
+    first = snapshot.frame()
+    assert len(scanner_server.requests) == 3
+
+    snapshot.clock.now += 30  # pyright: ignore
+    assert snapshot.frame() is first
+    assert len(scanner_server.requests) == 3
+
+    snapshot.clock.now += 60  # pyright: ignore
+    assert snapshot.frame() is first  # stale, served while it's being refreshed
+    for _ in range(100):
+        if snapshot.stats['refreshes'] == 2:
+            break
+        time.sleep(0.01)
+    assert snapshot.stats['refreshes'] == 2
+    assert snapshot.frame() is not first
+    assert len(scanner_server.requests) == 6
+
+
+def test_too_stale_snapshot_is_refreshed_in_foreground(scanner_server, snapshot: StubSnapshot):
+    first = snapshot.frame()
+    snapshot.clock.now += snapshot.ttl + snapshot.stale_ttl  # pyright: ignore
+    # not served anymore, downloaded again before answering
+    assert snapshot.frame() is not first
+    assert len(scanner_server.requests) == 6
+    assert snapshot.stats['refreshes'] == 2
+
+    # and when that fails too, the queries go to the scanner API
+    snapshot.clock.now += snapshot.ttl + snapshot.stale_ttl  # pyright: ignore
+
+    def respond(payload: dict):
+        if payload['columns'] == snapshot.columns:
+            return 400, {'error': 'down'}, {}
+        return {'totalCount': 1, 'data': [{'s': 'NSE:S7', 'd': [7.0]}]}
+
+    scanner_server.response = respond
+    query = Query().set_markets('india').select('close').where(col('close') == 7)
+    query.url = scanner_server.url
+    assert snapshot.get_scanner_data(query)[1]['ticker'].tolist() == ['NSE:S7']
+    assert snapshot.stats == {'local': 0, 'remote': 1, 'refreshes': 2}
+
+
+def test_schema(scanner_server):
+    scanner_server.response = _universe
+    snapshot = StubSnapshot(
+        'india',
+        columns=['name', 'sector', 'close', 'Value.Traded'],
+        page_size=100,
+        schema={'sector': 'category', 'close': 'float'},
+    )
+    snapshot.url = scanner_server.url
+    # the pages have different categories, the snapshot has all of them
+    sector = snapshot.frame()['sector']
+    assert isinstance(sector.dtype, pd.CategoricalDtype)
+    assert list(sector.cat.categories) == ['Energy', 'Finance', 'Tech']
+    assert sector.tolist() == [('Finance', 'Tech', 'Energy')[i // 100] for i in range(TOTAL)]
+
+    query = Query().set_markets('india').select('sector').where(col('sector') == 'Tech')
+    count, df = snapshot.get_scanner_data(query)
+    assert count == 100 and isinstance(df['sector'].dtype, pd.CategoricalDtype)
+
+    # the queries that go remote are decoded with the same schema
+    remote = Query().select('sector')
+    remote.url = scanner_server.url
+    assert isinstance(snapshot.get_scanner_data(remote)[1]['sector'].dtype, pd.CategoricalDtype)
+    assert remote.dtypes is None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tradingview_screener import Query, Transport
+from tradingview_screener.transport import get_default_transport, set_default_transport
+
+
+def test_connections_are_reused(scanner_server):
+    scanner_server.response = {'totalCount': 1, 'data': [{'s': 'NASDAQ:AAPL', 'd': [1, 2, 3, 4]}]}
+
+    with Transport() as transport:
+        query = Query(transport=transport)
+        query.url = scanner_server.url
+        for _ in range(10):
+            count, df = query.get_scanner_data()
+            assert count == 1
+            assert df['ticker'].tolist() == ['NASDAQ:AAPL']
+
+    assert len(scanner_server.requests) == 10
+    assert len(scanner_server.client_ports) == 1
+    assert 'gzip' in scanner_server.request_headers[0]['Accept-Encoding']
+
+
+def test_no_keep_alive(scanner_server):
+    with Transport(keep_alive=False) as transport:
+        query = Query(transport=transport)
+        query.url = scanner_server.url
+        for _ in range(3):
+            query.get_scanner_data_raw()
+
+    assert len(scanner_server.client_ports) == 3
+
+
+def test_threads_share_the_pool(scanner_server):
+    with Transport(pool_maxsize=4) as transport:
+        query = Query(transport=transport)
+        query.url = scanner_server.url
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # distinct offsets, so the requests aren't coalesced by the single-flight layer
+            list(executor.map(lambda i: query.copy().offset(i).get_scanner_data_raw(), range(40)))
+
+    assert len(scanner_server.requests) == 40
+    assert len(scanner_server.client_ports) <= 4
+
+
+def test_default_transport():
+    original = get_default_transport()
+    assert get_default_transport() is original
+    assert Query().transport is None
+    assert Query(transport=original).copy().transport is original
+
+    try:
+        custom = Transport()
+        set_default_transport(custom)
+        assert get_default_transport() is custom
+    finally:
+        set_default_transport(original)
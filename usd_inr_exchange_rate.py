@@ -1,9 +1,9 @@
 # This module fetches the latest USD to INR exchange rate using an open API
-import requests
+from tradingview_screener import get_default_transport
 
 def get_usd_inr_rate():
     try:
-        resp = requests.get("https://api.exchangerate.host/latest?base=USD&symbols=INR", timeout=10)
+        resp = get_default_transport().get("https://api.exchangerate.host/latest?base=USD&symbols=INR", timeout=10)
         resp.raise_for_status()
         data = resp.json()
         return float(data['rates']['INR'])
@@ -0,0 +1,231 @@
+import datetime
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from tradingview_screener.codec import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS announcements (
+    newsid TEXT PRIMARY KEY,
+    day TEXT,
+    dt_tm TEXT,
+    scrip_cd TEXT,
+    category TEXT,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS announcements_day ON announcements (day);
+CREATE INDEX IF NOT EXISTS announcements_scrip_day ON announcements (scrip_cd, day);
+CREATE INDEX IF NOT EXISTS announcements_category_day ON announcements (category, day);
+
+-- the announcements each API filter (category, scrip, subcategory) returned, by day
+CREATE TABLE IF NOT EXISTS matches (
+    filter_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    newsid TEXT NOT NULL,
+    PRIMARY KEY (filter_key, day, newsid)
+) WITHOUT ROWID;
+
+-- the days already fetched for each API filter, and when
+CREATE TABLE IF NOT EXISTS coverage (
+    filter_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (filter_key, day)
+) WITHOUT ROWID;
+"""
+
+
+def _json_default(obj):
+    """Serialize the values the JSON codec doesn't handle natively"""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class AnnouncementStore:
+    """
+    A persistent, indexed store of BSE announcements (SQLite), keyed by announcement ID.
+
+    The days of each API filter that were fetched are recorded, so a date range is only
+    fetched once: a day is final once it was fetched after its window closed (`open_days`
+    after the day itself, for the late filings), and only the days of the open, recent window
+    are fetched again, once their copy is older than `open_ttl` seconds.
+
+    :param path: the SQLite database file.
+    :param open_days: for how many days after a day its announcements may still change.
+    :param open_ttl: how long the copy of an open day is used before fetching it again.
+    """
+
+    def __init__(self, path: str, open_days: int = 1, open_ttl: float = 3600):
+        self.path = path
+        self.open_days = open_days
+        self.open_ttl = open_ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # a single connection, shared by the threads (of the Streamlit sessions) under a lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def filter_key(category="-1", scrip="", subcategory="-1") -> str:
+        return f"{category or ''}|{scrip or ''}|{subcategory or ''}"
+
+    # --- coverage
+
+    def _is_final(self, day: datetime.date, fetched_at: float) -> bool:
+        closes = datetime.datetime.combine(day, datetime.time())
+        closes += datetime.timedelta(days=1 + self.open_days)
+        return fetched_at >= closes.timestamp()
+
+    def missing_ranges(self, filter_key: str, start: datetime.date, end: datetime.date,
+                       now: Optional[float] = None) -> List[Tuple[datetime.date, datetime.date]]:
+        """The (contiguous) date ranges of `start`-`end` that have to be fetched for a filter"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, fetched_at FROM coverage WHERE filter_key = ? AND day BETWEEN ? AND ?",
+                (filter_key, start.isoformat(), end.isoformat())
+            ).fetchall()
+        fetched = {datetime.date.fromisoformat(day): fetched_at for day, fetched_at in rows}
+
+        ranges = []
+        day = start
+        while day <= end:
+            fetched_at = fetched.get(day)
+            stale = fetched_at is None or (
+                not self._is_final(day, fetched_at) and now - fetched_at >= self.open_ttl
+            )
+            if stale:
+                if ranges and ranges[-1][1] == day - datetime.timedelta(days=1):
+                    ranges[-1] = (ranges[-1][0], day)
+                else:
+                    ranges.append((day, day))
+            day += datetime.timedelta(days=1)
+        return ranges
+
+    # --- writes
+
+    def upsert(self, filter_key: str, start: datetime.date, end: datetime.date, df: pd.DataFrame,
+               fetched_at: Optional[float] = None) -> None:
+        """
+        Store the announcements a filter returned for `start`-`end` (the whole range, fetched
+        completely), replacing what the filter returned for these days before.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows, matches = [], []
+        if not df.empty:
+            dt_tm = pd.to_datetime(df['DT_TM'], errors='coerce') if 'DT_TM' in df.columns \
+                else pd.Series(pd.NaT, index=df.index)
+            # the rows without a (valid) date are kept with the last day of the range
+            days = dt_tm.dt.strftime('%Y-%m-%d').fillna(end.isoformat())
+            days = days.clip(start.isoformat(), end.isoformat())
+            for record, day, dt in zip(df.to_dict(orient='records'), days, dt_tm):
+                data = dumps(record, default=_json_default)
+                newsid = record.get('NEWSID')
+                if newsid is None or newsid != newsid:  # missing, or NaN
+                    newsid = f"sha1:{hashlib.sha1(data).hexdigest()}"
+                rows.append((
+                    str(newsid),
+                    day,
+                    None if pd.isna(dt) else dt.isoformat(),
+                    None if record.get('SCRIP_CD') is None else str(record['SCRIP_CD']),
+                    record.get('CATEGORYNAME'),
+                    data,
+                ))
+                matches.append((filter_key, day, str(newsid)))
+
+        n_days = (end - start).days + 1
+        coverage = [(filter_key, (start + datetime.timedelta(days=i)).isoformat(), fetched_at)
+                    for i in range(n_days)]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO announcements (newsid, day, dt_tm, scrip_cd, category, data) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (newsid) DO UPDATE SET "
+                "day = excluded.day, dt_tm = excluded.dt_tm, scrip_cd = excluded.scrip_cd, "
+                "category = excluded.category, data = excluded.data",
+                rows
+            )
+            self._conn.execute(
+                "DELETE FROM matches WHERE filter_key = ? AND day BETWEEN ? AND ?",
+                (filter_key, start.isoformat(), end.isoformat())
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO matches VALUES (?, ?, ?)", matches)
+            self._conn.executemany("INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)", coverage)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            for table in ('announcements', 'matches', 'coverage'):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    # --- reads
+
+    @staticmethod
+    def _to_frame(rows) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame([loads(data) for data, in rows])
+        # Normalize DT_TM to datetime, as `BSEAnnouncements.fetch_announcements_api()` does
+        if 'DT_TM' in df.columns:
+            df['DT_TM'] = pd.to_datetime(df['DT_TM'], errors='coerce')
+        return df
+
+    def query_filter(self, filter_key: str, start: datetime.date, end: datetime.date) -> pd.DataFrame:
+        """The announcements an API filter returned for `start`-`end`, the newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.data FROM matches m JOIN announcements a ON a.newsid = m.newsid "
+                "WHERE m.filter_key = ? AND m.day BETWEEN ? AND ? ORDER BY a.dt_tm DESC",
+                (filter_key, start.isoformat(), end.isoformat())
+            ).fetchall()
+        return self._to_frame(rows)
+
+    def query(self, start: Optional[datetime.date] = None, end: Optional[datetime.date] = None,
+              scrip: Optional[str] = None, category: Optional[str] = None) -> pd.DataFrame:
+        """
+        The stored announcements of a date range, scrip code and/or category (`CATEGORYNAME`),
+        the newest first, whatever the filter they were fetched with.
+        """
+        where, params = [], []
+        if start is not None:
+            where.append("day >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            where.append("day <= ?")
+            params.append(end.isoformat())
+        if scrip:
+            where.append("scrip_cd = ?")
+            params.append(str(scrip))
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        sql = "SELECT data FROM announcements"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY dt_tm DESC", params).fetchall()
+        return self._to_frame(rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM announcements").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
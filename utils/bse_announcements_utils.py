@@ -2,23 +2,59 @@ import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import logging
 import time
 import functools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import os
-import json
-import numpy as np
+from zoneinfo import ZoneInfo
+from tradingview_screener.codec import loads
+from tradingview_screener.ratelimit import request_with_backoff
+from utils.announcements_store import AnnouncementStore
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class EnhancedJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (pd.Timestamp, np.datetime64)):
-            return str(obj)
-        return super().default(obj)
+IST = ZoneInfo('Asia/Kolkata')
+
+class AnnouncementTail:
+    """
+    The high-water mark of a tail of the announcements (see `BSEAnnouncements.poll_new_announcements`):
+    the day being tailed, the IDs of its announcements already seen, and the newest `DT_TM`.
+    Keep one per viewer, i.e. in `st.session_state`.
+    """
+
+    def __init__(self, category="-1", scrip="", subcategory="-1"):
+        self.category = category
+        self.scrip = scrip
+        self.subcategory = subcategory
+        self.day = None
+        self.newest = None
+        self.seen = set()
+
+    def reset(self, day) -> None:
+        self.day = day
+        self.newest = None
+        self.seen = set()
+
+    def add(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Move the mark past the rows of `df`, and return those not seen before"""
+        if df.empty:
+            return df
+        if 'NEWSID' in df.columns:
+            ids = df['NEWSID'].astype(str)
+        else:
+            ids = df.astype(str).apply('|'.join, axis=1)
+        new = ~ids.isin(self.seen) & ~ids.duplicated()
+        self.seen.update(ids[new])
+        if 'DT_TM' in df.columns:
+            newest = pd.to_datetime(df['DT_TM'], errors='coerce').max()
+            if pd.notna(newest) and (self.newest is None or newest > self.newest):
+                self.newest = newest
+        return df[new.to_numpy()].reset_index(drop=True)
+
 
 class BSEAnnouncements:
     def __init__(self):
@@ -44,53 +80,13 @@ class BSEAnnouncements:
         # Initialize session once during class initialization
         self.session = requests.Session()
         self.session.headers.update(self.browser_headers)
-        # Cache directory
+        # Cache directory, with the store of the announcements already fetched
         self.cache_dir = "cache"
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        self.store = AnnouncementStore(os.path.join(self.cache_dir, "announcements.db"))
         logger.info("BSEAnnouncements initialized")
 
-    def _get_cache_key(self, from_date, to_date, category, scrip, subcategory, page):
-        """Generate a unique cache key for the API call parameters"""
-        return f"{from_date}_{to_date}_{category}_{scrip}_{subcategory}_{page}"
-
-    def _get_cache_path(self, cache_key):
-        """Get the cache file path for a given cache key"""
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
-
-    def _load_from_cache(self, cache_key):
-        """Load data from cache if available and not expired"""
-        cache_path = self._get_cache_path(cache_key)
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r') as f:
-                    data = json.load(f)
-                    cache_time = datetime.datetime.fromisoformat(data['timestamp'])
-                    if (datetime.datetime.now() - cache_time).total_seconds() < 3600:  # 1 hour cache
-                        return pd.DataFrame(data['data'])
-            except Exception as e:
-                logger.warning(f"Error loading from cache: {str(e)}")
-        return None
-
-    def _save_to_cache(self, cache_key, df):
-        """Save data to cache"""
-        try:
-            cache_path = self._get_cache_path(cache_key)
-            # Ensure the cache directory exists
-            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            # Convert all Timestamp objects to strings in DataFrame columns
-            df_serializable = df.copy()
-            for col in df_serializable.select_dtypes(include=['datetime', 'datetimetz']):
-                df_serializable[col] = df_serializable[col].astype(str)
-            data = {
-                'timestamp': datetime.datetime.now().isoformat(),
-                'data': df_serializable.to_dict(orient='records')
-            }
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, cls=EnhancedJSONEncoder)
-        except Exception as e:
-            logger.warning(f"Error saving to cache: {str(e)}")
-
     def fetch_announcements(self, 
                           from_date: Optional[str] = None,
                           to_date: Optional[str] = None,
@@ -125,7 +121,7 @@ class BSEAnnouncements:
             logger.info(f"Making request to BSE with params: {params}")
             
             # Make request
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=30)
+            response = request_with_backoff(None, 'GET', self.base_url, params=params, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             logger.info(f"Response status code: {response.status_code}")
@@ -182,7 +178,7 @@ class BSEAnnouncements:
         """
         try:
             logger.info(f"Fetching announcement details from: {announcement_url}")
-            response = requests.get(announcement_url, headers=self.headers, timeout=30)
+            response = request_with_backoff(None, 'GET', announcement_url, headers=self.headers, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.text, 'html.parser')
@@ -219,12 +215,7 @@ class BSEAnnouncements:
         max_retries: int = 3,
         timeout: int = 60
     ) -> pd.DataFrame:
-        """Fetch announcements from the BSE API with caching"""
-        cache_key = self._get_cache_key(from_date, to_date, category, scrip, subcategory, page)
-        cached_data = self._load_from_cache(cache_key)
-        if cached_data is not None:
-            return cached_data
-
+        """Fetch a page of announcements from the BSE API (not cached, see `fetch_all_announcements_api`)"""
         def to_bse_date(dt_str):
             if not dt_str:
                 return ""
@@ -253,143 +244,199 @@ class BSEAnnouncements:
             "subcategory": subcategory if subcategory else ""
         }
 
-        retry_count = 0
-        last_error = None
+        # Requests are paced by the shared per-host rate limiter, and 429/5xx responses,
+        # timeouts and connection errors are retried with jittered backoff (honoring Retry-After)
+        try:
+            response = request_with_backoff(
+                self.session,
+                'GET',
+                self.api_url,
+                max_retries=max(max_retries - 1, 0),
+                retry_timeouts=True,  # the BSE API is slow rather than down
+                params=params,
+                timeout=timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to fetch announcements after {max_retries} attempts. Last error: {str(e)}")
+
+        try:
+            data = loads(response.content)
+        except Exception as e:
+            logger.error(f"Failed to parse JSON response: {str(e)}")
+            logger.error(f"Raw response: {response.text[:500]}")
+            raise Exception(f"API did not return valid JSON. Raw response: {response.text[:500]}")
 
-        while retry_count < max_retries:
-            try:
-                # Add a small delay to avoid hitting rate limits
-                time.sleep(0.2) 
-                response = self.session.get(
-                    self.api_url, 
-                    params=params, 
-                    timeout=timeout
-                )
-                response.raise_for_status()
-                
-                try:
-                    data = response.json()
-                except Exception as e:
-                    logger.error(f"Failed to parse JSON response: {str(e)}")
-                    logger.error(f"Raw response: {response.text[:500]}")
-                    raise Exception(f"API did not return valid JSON. Raw response: {response.text[:500]}")
-                
-                df = pd.DataFrame(data.get("Table", []))
-                # Normalize DT_TM to datetime (preserve time if present)
-                if 'DT_TM' in df.columns:
-                    df['DT_TM'] = pd.to_datetime(df['DT_TM'], errors='coerce')
-                
-                # Save to cache before returning
-                self._save_to_cache(cache_key, df)
-                return df
-
-            except requests.exceptions.Timeout as e:
-                last_error = e
-                retry_count += 1
-                wait_time = min(2 ** retry_count, 10)  # Cap maximum wait time at 10 seconds
-                logger.warning(f"Request timed out. Retrying in {wait_time} seconds... (Attempt {retry_count}/{max_retries})")
-                time.sleep(wait_time)
-                
-            except requests.exceptions.RequestException as e:
-                last_error = e
-                retry_count += 1
-                wait_time = min(2 ** retry_count, 10)
-                logger.warning(f"Request failed: {str(e)}. Retrying in {wait_time} seconds... (Attempt {retry_count}/{max_retries})")
-                time.sleep(wait_time)
-                
-            except Exception as e:
-                logger.error(f"Unexpected error: {str(e)}")
-                raise
+        df = pd.DataFrame(data.get("Table", []))
+        # Normalize DT_TM to datetime (preserve time if present)
+        if 'DT_TM' in df.columns:
+            df['DT_TM'] = pd.to_datetime(df['DT_TM'], errors='coerce')
+        return df
 
-        if last_error:
-            raise Exception(f"Failed to fetch announcements after {max_retries} attempts. Last error: {str(last_error)}")
-        return pd.DataFrame()
+    @staticmethod
+    def _date_chunks(from_date, to_date) -> List[tuple]:
+        """Split a DD/MM/YYYY date range into the 30-day chunks the API accepts"""
+        start_date = datetime.datetime.strptime(from_date, "%d/%m/%Y")
+        end_date = datetime.datetime.strptime(to_date, "%d/%m/%Y")
+
+        # Only split into chunks if date range is longer than 30 days
+        if (end_date - start_date).days <= 30:
+            return [(start_date, end_date)]
+        date_chunks = []
+        current_start = start_date
+        while current_start < end_date:
+            current_end = min(current_start + datetime.timedelta(days=29), end_date)
+            date_chunks.append((current_start, current_end))
+            current_start = current_end + datetime.timedelta(days=1)
+        return date_chunks
+
+    def iter_announcement_pages(self, from_date, to_date, category="-1", scrip="", subcategory="-1",
+                                max_workers: int = 4) -> Iterator[tuple]:
+        """
+        Fetch the pages of every 30-day chunk of the date range concurrently, yielding
+        `(chunk, page, df)` as each page completes (in no particular order).
+
+        Page 1 of all the chunks is requested first; once it gives the chunk's `TotalPageCnt`,
+        the remaining pages of the chunk are all requested at once (without it, the next page is
+        requested after each full page). The requests are still paced by the shared per-host rate
+        limiter, so `max_workers` only bounds the number of requests in flight.
+        """
+        def format_date(date):
+            return date.strftime("%d/%m/%Y")
+
+        date_chunks = self._date_chunks(from_date, to_date)
+        logger.info(f"Fetching {len(date_chunks)} chunk(s): {from_date} to {to_date}")
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bse_pages')
+        pending = {}
+
+        def submit(chunk, page):
+            chunk_start, chunk_end = date_chunks[chunk]
+            future = executor.submit(
+                self.fetch_announcements_api,
+                from_date=format_date(chunk_start),
+                to_date=format_date(chunk_end),
+                category=category,
+                page=page,
+                scrip=scrip,
+                subcategory=subcategory
+            )
+            pending[future] = (chunk, page)
+
+        try:
+            for chunk in range(len(date_chunks)):
+                submit(chunk, 1)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, page = pending.pop(future)
+                    df = future.result()
+                    if df.empty:
+                        continue
+                    if 'TotalPageCnt' in df.columns:
+                        if page == 1:
+                            for next_page in range(2, int(df['TotalPageCnt'].iloc[0]) + 1):
+                                submit(chunk, next_page)
+                    elif len(df) >= 20:  # API default page size is 20
+                        submit(chunk, page + 1)
+                    yield chunk, page, df
+        finally:
+            # don't block if the caller stopped early (or a page failed) with requests in flight
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    def fetch_all_announcements_api(self, from_date, to_date, category="-1", scrip="", subcategory="-1") -> pd.DataFrame:
+    def fetch_all_announcements_api(self, from_date, to_date, category="-1", scrip="", subcategory="-1",
+                                    max_workers: int = 4, on_page=None) -> pd.DataFrame:
         """
         Fetch all announcements from the BSE API endpoint, aggregating results from all pages.
         Handles date ranges longer than 30 days by making multiple API calls in chunks.
+
+        Only the days not in the announcements store yet (or in its open, recent window) are
+        fetched, and the result is then read from the store, the newest first. The chunks and
+        pages are fetched concurrently (see `iter_announcement_pages`), and `on_page(df)` is
+        called with each fetched page as soon as it completes, i.e. to show partial results.
         """
         def parse_date(date_str):
-            return datetime.datetime.strptime(date_str, "%d/%m/%Y")
-        
+            return datetime.datetime.strptime(date_str, "%d/%m/%Y").date()
+
         def format_date(date):
             return date.strftime("%d/%m/%Y")
-        
-        # Parse dates
-        start_date = parse_date(from_date)
-        end_date = parse_date(to_date)
-        
-        # Calculate date range in days
-        date_range = (end_date - start_date).days
-        
-        # Only split into chunks if date range is longer than 30 days
-        if date_range <= 30:
-            date_chunks = [(start_date, end_date)]
-        else:
-            # Calculate number of 30-day chunks needed
-            date_chunks = []
-            current_start = start_date
-            while current_start < end_date:
-                current_end = min(current_start + datetime.timedelta(days=29), end_date)
-                date_chunks.append((current_start, current_end))
-                current_start = current_end + datetime.timedelta(days=1)
-        
-        all_results = []
-        total_chunks = len(date_chunks)
-        
-        for i, (chunk_start, chunk_end) in enumerate(date_chunks, 1):
-            logger.info(f"Fetching chunk {i}/{total_chunks}: {format_date(chunk_start)} to {format_date(chunk_end)}")
-            
-            chunk_results = []
-            page = 1
-            total_pages = None
-            
-            while True:
-                # Check if we have cached data for this chunk and page
-                cache_key = self._get_cache_key(
-                    format_date(chunk_start),
-                    format_date(chunk_end),
-                    category,
-                    scrip,
-                    subcategory,
-                    page
-                )
-                cached_data = self._load_from_cache(cache_key)
-                
-                if cached_data is not None:
-                    df = cached_data
-                else:
-                    df = self.fetch_announcements_api(
-                        from_date=format_date(chunk_start),
-                        to_date=format_date(chunk_end),
-                        category=category,
-                        page=page,
-                        scrip=scrip,
-                        subcategory=subcategory
-                    )
-                
-                if df.empty:
-                    break
-                    
-                chunk_results.append(df)
-                
-                # Get total pages from the first row if available
-                if total_pages is None and 'TotalPageCnt' in df.columns:
-                    total_pages = df['TotalPageCnt'].iloc[0]
-                if total_pages is not None and page >= total_pages:
-                    break
-                if len(df) < 20:  # API default page size is 20
-                    break
-                page += 1
-            
-            if chunk_results:
-                all_results.extend(chunk_results)
-        
-        if all_results:
-            return pd.concat(all_results, ignore_index=True)
-        else:
-            return pd.DataFrame()
+
+        start_date, end_date = parse_date(from_date), parse_date(to_date)
+        filter_key = self.store.filter_key(category, scrip, subcategory)
+        for run_start, run_end in self.store.missing_ranges(filter_key, start_date, end_date):
+            pages = {}
+            for chunk, page, df in self.iter_announcement_pages(
+                format_date(run_start), format_date(run_end), category, scrip, subcategory,
+                max_workers=max_workers
+            ):
+                pages[(chunk, page)] = df
+                if on_page is not None:
+                    on_page(df)
+            # only a range fetched completely is stored (a failed page raises above)
+            df = pd.concat([pages[key] for key in sorted(pages)], ignore_index=True) if pages else pd.DataFrame()
+            self.store.upsert(filter_key, run_start, run_end, df)
+
+        return self.store.query_filter(filter_key, start_date, end_date)
+
+    def poll_new_announcements(self, tail: AnnouncementTail, max_pages: Optional[int] = None) -> pd.DataFrame:
+        """
+        Fetch the announcements of today (IST) not seen yet by `tail`, the newest first.
+
+        The first poll of a day returns the whole day (from the announcements store); the next
+        ones only request page 1, and the following pages while they are all new, so a poll
+        costs one request plus one per page of new filings, instead of refetching the day.
+        """
+        day = datetime.datetime.now(IST).date()
+        day_str = day.strftime("%d/%m/%Y")
+        if tail.day != day:
+            tail.reset(day)
+            return tail.add(self.fetch_all_announcements_api(
+                day_str, day_str, tail.category, tail.scrip, tail.subcategory
+            ))
+
+        new = []
+        page = 1
+        while max_pages is None or page <= max_pages:
+            df = self.fetch_announcements_api(
+                from_date=day_str,
+                to_date=day_str,
+                category=tail.category,
+                page=page,
+                scrip=tail.scrip,
+                subcategory=tail.subcategory
+            )
+            fresh = tail.add(df)
+            if not fresh.empty:
+                new.append(fresh)
+            # the pages are the newest first: stop at the first page with rows already seen
+            if df.empty or len(fresh) < len(df):
+                break
+            if 'TotalPageCnt' in df.columns and page >= int(df['TotalPageCnt'].iloc[0]):
+                break
+            page += 1
+        if new:
+            logger.info(f"{sum(len(df) for df in new)} new announcement(s) in {page} page(s)")
+            return pd.concat(new, ignore_index=True)
+        return pd.DataFrame()
+
+    def tail_announcements(self, category="-1", scrip="", subcategory="-1", interval: float = 10.0,
+                           on_new=None) -> Iterator[pd.DataFrame]:
+        """
+        Poll for new announcements every `interval` seconds (paced by the per-host rate limiter
+        too), yielding (and passing to `on_new(df)`) each batch of new ones, starting with the
+        whole of today. Meant to be consumed by a background thread; runs until closed.
+        """
+        tail = AnnouncementTail(category, scrip, subcategory)
+        while True:
+            try:
+                new = self.poll_new_announcements(tail)
+            except Exception as e:
+                logger.warning(f"Error polling announcements: {str(e)}")
+                new = pd.DataFrame()
+            if not new.empty:
+                if on_new is not None:
+                    on_new(new)
+                yield new
+            time.sleep(interval)
 
     @staticmethod
     def parse_datetime_column(df, col_name):
@@ -0,0 +1,237 @@
+import glob
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from tradingview_screener.codec import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = "eod2/src/eod2_data/daily"
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _key(symbol) -> str:
+    return str(symbol).strip().replace(' ', '').lower()
+
+
+@dataclass(frozen=True)
+class OhlcvSeries:
+    """The daily bars of a symbol, sorted by date: read-only views into the store's memmaps"""
+    symbol: str
+    date: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    def to_frame(self) -> pd.DataFrame:
+        """As the CSV would be read: `Date` (datetime64[ns]), `Open`, `High`, `Low`, `Close`, `Volume`"""
+        return pd.DataFrame({
+            'Date': self.date.astype('datetime64[ns]'),
+            'Open': self.open,
+            'High': self.high,
+            'Low': self.low,
+            'Close': self.close,
+            'Volume': self.volume,
+        })
+
+
+@dataclass(frozen=True)
+class _Generation:
+    """One generation of the cache: the index and the column files that go with it"""
+    number: int
+    index: Dict[str, dict]
+    arrays: Dict[str, np.ndarray]
+
+
+class OhlcvStore:
+    """
+    The eod2 daily CSVs (one `<symbol>.csv` per symbol) converted once into a columnar cache:
+    one memory-mapped `.npy` file per column, with the rows of all the symbols back to back
+    (each sorted by date), and a symbol -> (offset, length) index.
+
+    `refresh()` only re-parses the CSVs whose mtime or size changed (and drops the removed
+    ones), then swaps in a new generation of the column files, so the readers of the previous
+    one are never affected. `get()` returns zero-copy views of a symbol's rows.
+
+    :param data_dir: the folder of the daily CSVs.
+    :param cache_dir: where the column files and the index are kept (`cache/ohlcv/<hash>`, by
+        default, one per data folder).
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, cache_dir: Optional[str] = None):
+        self.data_dir = os.path.abspath(data_dir)
+        if cache_dir is None:
+            digest = hashlib.sha1(self.data_dir.encode()).hexdigest()[:12]
+            cache_dir = os.path.join("cache", "ohlcv", digest)
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # swapped as a whole, so a reader never pairs the offsets of one generation with the
+        # arrays of another
+        self._state = _Generation(0, {}, {})
+        self._load()
+
+    # --- the cache files
+
+    def _path(self, name: str, generation: int) -> str:
+        return os.path.join(self.cache_dir, f"{name}.{generation}.npy")
+
+    def _map(self, name: str, generation: int) -> np.ndarray:
+        # a plain (read-only) view of the memmap: slicing an `np.memmap` is ~10x slower
+        return np.asarray(np.load(self._path(name, generation), mmap_mode='r'))
+
+    def _load(self) -> None:
+        index_path = os.path.join(self.cache_dir, "index.json")
+        try:
+            with open(index_path, 'rb') as f:
+                meta = loads(f.read())
+            generation = meta['generation']
+            arrays = {name: self._map(name, generation) for name in ('Date',) + COLUMNS}
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring the OHLCV cache in {self.cache_dir}: {str(e)}")
+            return
+        self._state = _Generation(generation, meta['symbols'], arrays)
+
+    @staticmethod
+    def _read_csv(path: str) -> Dict[str, np.ndarray]:
+        df = pd.read_csv(path)
+        dates = pd.to_datetime(df['Date'].astype(str).str.strip(), errors='coerce')
+        df = df.assign(Date=dates).dropna(subset=['Date']).sort_values('Date', kind='stable')
+        columns = {'Date': df['Date'].to_numpy(dtype='datetime64[D]')}
+        for name in COLUMNS:
+            if name in df.columns:
+                columns[name] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                columns[name] = np.full(len(df), np.nan)
+        return columns
+
+    def refresh(self) -> bool:
+        """Bring the cache up to date with the CSVs; return whether anything changed"""
+        with self._lock:
+            state = self._state
+            files = {}
+            for path in glob.glob(os.path.join(self.data_dir, "*.csv")):
+                stat = os.stat(path)
+                files[_key(os.path.basename(path)[:-4])] = (path, stat.st_mtime_ns, stat.st_size)
+
+            changed = [key for key, (_, mtime, size) in files.items()
+                       if key not in state.index
+                       or (state.index[key]['mtime'], state.index[key]['size']) != (mtime, size)]
+            removed = [key for key in state.index if key not in files]
+            if not changed and not removed:
+                return False
+
+            parts: Dict[str, List[np.ndarray]] = {name: [] for name in ('Date',) + COLUMNS}
+            index = {}
+            offset = 0
+            for key in sorted(files):
+                path, mtime, size = files[key]
+                if key in changed:
+                    try:
+                        columns = self._read_csv(path)
+                    except Exception as e:
+                        logger.warning(f"Skipping {path}: {str(e)}")
+                        continue
+                else:  # unchanged: copied over from the current generation
+                    entry = state.index[key]
+                    window = slice(entry['offset'], entry['offset'] + entry['length'])
+                    columns = {name: state.arrays[name][window] for name in parts}
+                length = len(columns['Date'])
+                for name in parts:
+                    parts[name].append(columns[name])
+                index[key] = {'symbol': os.path.basename(path)[:-4], 'offset': offset,
+                              'length': length, 'mtime': mtime, 'size': size}
+                offset += length
+
+            generation = state.number + 1
+            arrays = {}
+            for name, chunks in parts.items():
+                dtype = 'datetime64[D]' if name == 'Date' else np.float64
+                array = np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+                np.save(self._path(name, generation), array)
+                arrays[name] = self._map(name, generation)
+            tmp_path = os.path.join(self.cache_dir, "index.json.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps({'generation': generation, 'symbols': index}))
+            os.replace(tmp_path, os.path.join(self.cache_dir, "index.json"))
+
+            previous = state.number
+            self._state = _Generation(generation, index, arrays)
+        logger.info(f"OHLCV cache: {len(changed)} CSV(s) parsed, {len(removed)} removed, {len(index)} symbols")
+        for name in ('Date',) + COLUMNS:
+            try:
+                os.remove(self._path(name, previous))
+            except OSError:  # i.e. still mapped on Windows, or the first generation
+                pass
+        return True
+
+    # --- reads
+
+    def __len__(self) -> int:
+        return len(self._state.index)
+
+    def __contains__(self, symbol) -> bool:
+        return _key(symbol) in self._state.index
+
+    @property
+    def symbols(self) -> List[str]:
+        """The symbols, as the names of their CSV files"""
+        return [entry['symbol'] for entry in self._state.index.values()]
+
+    def get(self, *candidates) -> Optional[OhlcvSeries]:
+        """
+        The daily bars of the first of `candidates` (symbols, or scrip codes) in the store,
+        matched case-insensitively and ignoring spaces, or None.
+        """
+        state = self._state  # a single read: a consistent generation during a refresh
+        index, arrays = state.index, state.arrays
+        for candidate in candidates:
+            if candidate is None or (isinstance(candidate, float) and np.isnan(candidate)):
+                continue
+            entry = index.get(_key(candidate))
+            if entry is not None:
+                window = slice(entry['offset'], entry['offset'] + entry['length'])
+                return OhlcvSeries(entry['symbol'], *(arrays[name][window] for name in ('Date',) + COLUMNS))
+        return None
+
+    def frame(self, *candidates) -> Optional[pd.DataFrame]:
+        series = self.get(*candidates)
+        return series.to_frame() if series is not None else None
+
+
+_stores: Dict[str, OhlcvStore] = {}
+_stores_checked: Dict[str, float] = {}
+_stores_lock = threading.Lock()
+
+
+def get_ohlcv_store(data_dir: str = DEFAULT_DATA_DIR, check_interval: float = 60) -> OhlcvStore:
+    """
+    The process-wide `OhlcvStore` of a data folder, checked for changed CSVs at most once every
+    `check_interval` seconds.
+    """
+    key = os.path.abspath(data_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = OhlcvStore(data_dir)
+        now = time.monotonic()
+        due = now - _stores_checked.get(key, -np.inf) >= check_interval
+        if due:
+            _stores_checked[key] = now
+    if due and os.path.isdir(key):
+        store.refresh()
+    return store
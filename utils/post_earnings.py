@@ -0,0 +1,131 @@
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+MOVE_COLUMNS = [
+    'Symbol', 'Trading Day', 'Day 0', 'Pre 10d %', 'Pre 20d %', 'Move 30d %', 'Days 30',
+    'Move 60d %', 'Days 60', 'Peak Move %', 'Volume', 'Close', 'Next Open', 'Gap %',
+]
+
+
+def compute_post_earnings_moves(store, candidates: Sequence[Sequence], dates,
+                                after: Union[bool, Sequence[bool]] = False) -> pd.DataFrame:
+    """
+    The pre/post-announcement moves of many announcements at once, one row per announcement
+    (in the same order), NaN where they can't be computed.
+
+    The announcements are grouped by symbol, and day 0 of all of them is located with a single
+    `searchsorted` over the (symbol, date) keys of the symbols' bars; the moves are then array
+    lookups, instead of filtering the bars of a symbol once per announcement and value.
+
+    :param store: the daily bars (an `OhlcvStore`, or anything with the same `get()`).
+    :param candidates: for each announcement, the symbols to look its bars up with, in order
+        (i.e. `(security_id, scrip_code)`).
+    :param dates: the announcement dates.
+    :param after: whether day 0 is the first trading day strictly after the announcement date
+        (weekend announcements), rather than the first one on or after it. Per announcement, or
+        for all of them.
+    :return: a DataFrame with:
+        - `Symbol`: the symbol the bars were found under (None if none).
+        - `Trading Day`: whether the announcement date itself is a trading day.
+        - `Day 0`: the date of day 0.
+        - `Pre 10d %`/`Pre 20d %`: the move from 10/20 trading days before day 0 to day 0.
+        - `Move 30d %`/`Move 60d %`: the move from day 0 to 30/60 trading days after it (or to
+          the last available day, `Days 30`/`Days 60` being the number of days used).
+        - `Peak Move %`: the largest move from day 0 to any day after it.
+        - `Volume`/`Close`: of the announcement date, or of the last trading day before it.
+        - `Next Open`/`Gap %`: the open of the next trading day, and the gap from `Close` to it.
+    """
+    n_events = len(candidates)
+    dates = pd.to_datetime(pd.Series(list(dates), dtype=object), errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    has_date = dates.notna().to_numpy()
+    after = np.broadcast_to(np.asarray(after, dtype=bool), (n_events,))
+
+    # --- group by symbol: each distinct set of candidates is looked up once
+    symbol_ids = np.full(n_events, -1, dtype=np.int64)
+    resolved = {}
+    ids = {}
+    series = []
+    for i, names in enumerate(candidates):
+        names = tuple(names)
+        if names not in resolved:
+            bars = store.get(*names)
+            if bars is None:
+                resolved[names] = -1
+            else:
+                if bars.symbol not in ids:
+                    series.append(bars)
+                    ids[bars.symbol] = len(series) - 1
+                resolved[names] = ids[bars.symbol]
+        symbol_ids[i] = resolved[names]
+
+    out = pd.DataFrame(np.nan, index=range(n_events), columns=MOVE_COLUMNS)
+    out['Symbol'] = pd.Series([series[k].symbol if k >= 0 else None for k in symbol_ids], dtype=object)
+    out['Trading Day'] = False
+    out['Day 0'] = pd.NaT
+    if not series:
+        return out
+
+    # --- the bars of all these symbols, back to back
+    lengths = np.array([len(s) for s in series])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    ends = starts + lengths
+    bar_days = np.concatenate([s.date.astype(np.int64) for s in series])
+    close = np.concatenate([s.close for s in series])
+    open_ = np.concatenate([s.open for s in series])
+    volume = np.concatenate([s.volume for s in series])
+    # the highest close from each bar to the end of its symbol (NaN closes skipped)
+    peak = np.concatenate([np.fmax.accumulate(s.close[::-1])[::-1] for s in series])
+    bar_symbols = np.repeat(np.arange(len(series)), lengths)
+    n_bars = len(bar_days)
+
+    # (symbol, day) keys, sorted since the bars of each symbol are
+    keys = (bar_symbols << 32) + bar_days + 2**31
+    ok = (symbol_ids >= 0) & has_date
+    event_keys = (np.maximum(symbol_ids, 0) << 32) + days + 2**31
+    left = np.searchsorted(keys, event_keys, 'left')  # the first bar on or after the date
+    right = np.searchsorted(keys, event_keys, 'right')  # the first bar after the date
+    start = starts[np.maximum(symbol_ids, 0)]
+    end = ends[np.maximum(symbol_ids, 0)]
+
+    def at(values, index, valid):
+        # values[index] where valid (and index in range), else NaN
+        return np.where(valid, values[np.clip(index, 0, n_bars - 1)], np.nan)
+
+    trading_day = ok & (right > left)
+    day0 = np.where(after, right, left)
+    has_day0 = ok & (day0 < end)
+    close0 = at(close, day0, has_day0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for n in (10, 20):
+            before = day0 - n
+            pre = at(close, before, has_day0 & (before >= start))
+            out[f'Pre {n}d %'] = (close0 - pre) / pre * 100
+
+        n_future = end - day0
+        valid0 = has_day0 & (close0 != 0)
+        for n in (30, 60):
+            offset = np.minimum(n, n_future - 1)
+            value = at(close, day0 + offset, has_day0 & (n_future > 1))
+            found = ~np.isnan(value)
+            out[f'Days {n}'] = np.where(found, offset, np.nan)
+            out[f'Move {n}d %'] = np.where(found & valid0, (value - close0) / close0 * 100, np.nan)
+
+        out['Peak Move %'] = np.where(valid0, (at(peak, day0, has_day0) - close0) / close0 * 100, np.nan)
+
+        # volume and close of the announcement date (or the last trading day before it)
+        ref = np.where(trading_day, left, right - 1)
+        has_ref = ok & (ref >= start)
+        out['Volume'] = at(volume, ref, has_ref)
+        out['Close'] = at(close, ref, has_ref)
+        out['Next Open'] = at(open_, right, ok & (right < end))
+        gap = (out['Next Open'] - out['Close']) / out['Close'] * 100
+        out['Gap %'] = gap.where(out['Close'] != 0)
+
+    out['Trading Day'] = trading_day
+    day0_dates = np.where(has_day0, bar_days[np.clip(day0, 0, n_bars - 1)], np.iinfo(np.int64).min)
+    out['Day 0'] = day0_dates.astype('datetime64[D]').astype('datetime64[ns]')  # int64 min is NaT
+    return out